@@ -1,7 +1,21 @@
 """Agent implementations (initial stubs)."""
 
-from .miniagent import MiniAgent
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .miniagent import MiniAgent
 
 __all__ = [
     "MiniAgent",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # MiniAgent drags in langchain; import it on first access so that
+    # report-only tooling (e.g. ReportBuilder) stays fast to import.
+    if name == "MiniAgent":
+        from .miniagent import MiniAgent
+        return MiniAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,22 +5,37 @@ import time
 import uuid
 import json
 from datetime import datetime
-from typing import List, Set, cast, Any
+from typing import List, Optional, Set, cast, Any
 from rich import print
 
 from aoc_agent.core.aoc_client import AocClient
-from .context import AgentContext
+from aoc_agent.core.llm_routing import RoutingPolicy
+from .context import AgentContext, Budget
+from .history import HISTORY_FILE, append_step
 from .tools import Lang
 from .miniagent import MiniAgent
+from .sweep_planner import SweepPlanner, print_plan
+from .workspace import create_scratch_workspace, flush_workspace, persistent_dir
+
+RUNS_DIR = os.path.join("data", "run")
+CONTEXT_FILE = "context.json"
 
 class AgentRunner:
-    def __init__(self, year: int, days_region: str, languages: List[str], models: List[str], n_repeats: int, no_report: bool = False):
+    def __init__(self, year: int, days_region: str, languages: List[str], models: List[str], n_repeats: int, no_report: bool = False,
+                 routing: Optional[RoutingPolicy] = None, dry_run: bool = False,
+                 run_budget: Optional[Budget] = None, part_budget: Optional[Budget] = None,
+                 scratch_dir: Optional[str] = None):
         self.year = year
         self.days = self._parse_days(days_region)
         self.languages = languages
         self.models = models
         self.n_repeats = n_repeats
         self.no_report = no_report
+        self.routing = routing or RoutingPolicy()
+        self.dry_run = dry_run
+        self.run_budget = run_budget or Budget()
+        self.part_budget = part_budget or Budget()
+        self.scratch_dir = scratch_dir
 
     def _parse_days(self, region: str) -> List[int]:
         days: Set[int] = set()
@@ -37,30 +52,59 @@ class AgentRunner:
         return sorted(list(days))
 
     def run(self) -> None:
-        agent_def = MiniAgent()
-        total_runs = len(self.days) * len(self.languages) * len(self.models) * self.n_repeats
-        current_run = 0
+        requested = len(self.days) * len(self.languages) * len(self.models) * self.n_repeats
+        plan = SweepPlanner(RUNS_DIR).plan(self.year, self.days, self.languages, self.models, self.n_repeats)
+        print_plan(self.year, plan, requested)
+        if self.dry_run:
+            return
+
+        agent_def = MiniAgent(routing=self.routing)
+        total_runs = len(plan)
 
         print(f"[bold green]Starting AgentRunner for {total_runs} runs...[/bold green]")
-        
-        for day in self.days:
-            for lang in self.languages:
-                for model in self.models:
-                    for i in range(self.n_repeats):
-                        current_run += 1
-                        print(f"\n[bold cyan]Run {current_run}/{total_runs}[/bold cyan]: Day {day}, {lang}, {model}, Repeat {i+1}")
-                        self._run_single_case(agent_def, self.year, day, cast(Lang, lang), model)
+
+        for current_run, case in enumerate(plan, start=1):
+            print(f"\n[bold cyan]Run {current_run}/{total_runs}[/bold cyan]: Day {case.day}, {case.lang}, {case.model}, Repeat {case.repeat}")
+            self._run_single_case(agent_def, self.year, case.day, cast(Lang, case.lang), case.model)
+
+    def resume(self, run_ids: List[str]) -> None:
+        agent_def = MiniAgent(routing=self.routing)
+        print(f"[bold green]Resuming {len(run_ids)} runs...[/bold green]")
+        for i, run_id in enumerate(run_ids):
+            print(f"\n[bold cyan]Resume {i+1}/{len(run_ids)}[/bold cyan]: {run_id}")
+            run_dir = os.path.join(RUNS_DIR, run_id)
+            context_file = os.path.join(run_dir, CONTEXT_FILE)
+            if not os.path.exists(context_file):
+                print(f"[red]Run {run_id} has no checkpoint ({context_file}), cannot resume.[/red]")
+                continue
+            if os.path.exists(os.path.join(run_dir, "metadata.json")):
+                print(f"[yellow]Run {run_id} is already complete. Skipping.[/yellow]")
+                continue
+            context = AgentContext.load(context_file)
+            if not os.path.isdir(context.working_dir):
+                print(f"[red]Run {run_id} worked in {context.working_dir}, which is gone (scratch storage cleared?), cannot resume.[/red]")
+                continue
+            self._execute_case(agent_def, context, resume=True)
+
+    @staticmethod
+    def find_incomplete_runs() -> List[str]:
+        """Runs that have a checkpoint but never wrote metadata.json."""
+        if not os.path.exists(RUNS_DIR):
+            return []
+        return sorted(
+            entry for entry in os.listdir(RUNS_DIR)
+            if os.path.exists(os.path.join(RUNS_DIR, entry, CONTEXT_FILE))
+            and not os.path.exists(os.path.join(RUNS_DIR, entry, "metadata.json"))
+        )
 
     def _run_single_case(self, agent_def: MiniAgent, year: int, day: int, lang: Lang, model_name: str):
         
         start_time_friendly = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         run_id = f"{start_time_friendly}_{year}_{day}_{lang}_{model_name.replace(':','-')}_{str(uuid.uuid4())[:8]}"
-        run_dir = os.path.join("data", "run", run_id)
+        run_dir = os.path.join(RUNS_DIR, run_id)
         os.makedirs(run_dir, exist_ok=True)
-        
-        print(f"[bold green]AoC Agent starting[/bold green]: year={year}, day={day}, lang={lang}, run_id={run_id} model={model_name}")
+        working_dir = create_scratch_workspace(self.scratch_dir, run_id) if self.scratch_dir else run_dir
 
-        client = AocClient()
         context = AgentContext(
             run_id=run_id, 
             start_time=(time.time()), 
@@ -68,33 +112,62 @@ class AgentRunner:
             day=day, 
             language=lang, 
             model_name=model_name,
-            working_dir=run_dir
+            working_dir=working_dir,
+            run_dir=run_dir if self.scratch_dir else None
         )
-        
-        history_file = os.path.join(run_dir, "history.json")
-        history = []
-        
+        self._execute_case(agent_def, context, resume=False)
+
+    def _execute_case(self, agent_def: MiniAgent, context: AgentContext, resume: bool):
+        run_id, working_dir = context.run_id, context.working_dir
+        run_dir = persistent_dir(working_dir, context.run_dir)
+        year, day, lang, model_name = context.year, context.day, context.language, context.model_name
+        verb = "resuming" if resume else "starting"
+        print(f"[bold green]AoC Agent {verb}[/bold green]: year={year}, day={day}, lang={lang}, run_id={run_id} model={model_name}")
+
+        client = AocClient()
+        context_file = os.path.join(run_dir, CONTEXT_FILE)
+        context.save(context_file)
+
+        # The run log grows on every step, so it stays in the (scratch) workspace until the end.
+        # It is append-only: a resumed run continues the same file (legacy runs keep their history.json).
+        history_file = os.path.join(working_dir, HISTORY_FILE)
+
         no_report_flag = self.no_report
         if lang != "python":
             no_report_flag = True
 
         try:
-            for chunk in agent_def.execute(client, context):
-                history.append(chunk)
-                with open(history_file, "w") as f:
-                    json.dump(history, f, indent=2, default=str)
+            for chunk in agent_def.execute(client, context, resume=resume):
+                context.record_step()
+                append_step(history_file, context.steps, context.elapsed(), context.output_tokens, context.input_tokens, chunk)
+                context.save(context_file)
 
                 if context.final_report_written:
                     print("[green]Final report written. Stopping agent.[/green]")
+                    context.termination_reason = "final_report_written"
                     break
 
                 if no_report_flag and (context.part2_finished or (day == 25 and context.part1_finished)):
                     print("[green]All parts solved. Skipping final report and stopping agent.[/green]")
+                    context.termination_reason = "all_parts_solved"
                     break
+
+                budget_reason = context.check_budgets(self.run_budget, self.part_budget)
+                if budget_reason:
+                    print(f"[yellow]Budget exhausted ({budget_reason}). Stopping agent.[/yellow]")
+                    context.termination_reason = budget_reason
+                    break
+            else:
+                context.termination_reason = "agent_finished"
+            # metadata.json marks the run as complete, so it is written only once the artifacts are safe
+            if context.run_dir:
+                flushed = flush_workspace(working_dir, run_dir)
+                print(f"Flushed {len(flushed)} artifacts from the scratch workspace to {run_dir}")
             print("Writing metadata.json...")
             self._write_metadata(context, run_dir, model_name, lang, year, day, run_id)
         except Exception as e:
             print(f"[red]Unexpected error running agent. Ignore metadata!:\n{e}[/red]")
+            print(f"[yellow]Continue it later with: aoc-agent resume {run_id}[/yellow]")
 
     def _write_metadata(self, context: AgentContext, run_dir: str, model_name: str, lang: str, year: int, day: int, run_id: str):
          metadata = {
@@ -112,12 +185,23 @@ class AgentRunner:
             "part12_output_tokens": context.part2_output_tokens,
             "part12_duration": context.part2_duration,
             "report_output_tokens": context.output_tokens - context.part1_output_tokens,
+            "input_tokens": context.input_tokens,
+            "cache_read_tokens": context.cache_read_tokens,
+            "cache_creation_tokens": context.cache_creation_tokens,
             "part1_incorrect": context.part1_incorrect,
             "part2_incorrect": context.part2_incorrect,
             "part1_run_code_errors": context.part1_run_code_errors,
             "part2_run_code_errors": context.part2_run_code_errors,
             "part1_run_code_success": context.part1_run_code_success,
             "part2_run_code_success": context.part2_run_code_success,
+            "steps": context.steps,
+            "run_code_executions": context.run_code_executions,
+            "code_executions": context.code_executions,
+            "patch_edits": context.patch_edits,
+            "patch_saved_chars": context.patch_saved_chars,
+            "termination_reason": context.termination_reason,
+            "part1_interpreter": context.part1_interpreter,
+            "part2_interpreter": context.part2_interpreter,
             "final_report_path": context.final_report_path,
             "final_report_images": context.final_report_images
         }
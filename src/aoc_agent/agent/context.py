@@ -1,10 +1,33 @@
 from __future__ import annotations
 
+import json
 import time
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from typing import List, Optional
 
 
+@dataclass
+class Budget:
+    """Limits on a run or on a single part of it. None means unlimited."""
+    max_duration: Optional[float] = None
+    max_output_tokens: Optional[int] = None
+    max_steps: Optional[int] = None
+    # Calls of the tools that execute code: run_code, run_examples, profile_code, estimate_complexity, run_python_cell
+    max_run_code: Optional[int] = None
+
+    def exceeded(self, duration: float, output_tokens: int, steps: int, run_code: int) -> Optional[str]:
+        """Returns the name of the first exceeded limit, if any."""
+        if self.max_duration is not None and duration >= self.max_duration:
+            return "duration"
+        if self.max_output_tokens is not None and output_tokens >= self.max_output_tokens:
+            return "output_tokens"
+        if self.max_steps is not None and steps >= self.max_steps:
+            return "steps"
+        if self.max_run_code is not None and run_code >= self.max_run_code:
+            return "run_code"
+        return None
+
+
 @dataclass
 class AgentContext:
     run_id: str
@@ -14,7 +37,14 @@ class AgentContext:
     language: str
     model_name: str
     working_dir: str
+    # Persistent run directory when working_dir is a scratch workspace
+    run_dir: Optional[str] = None
     output_tokens: int = 0
+    input_tokens: int = 0
+
+    # Provider-side prompt caching
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
     
     # Part 1 stats
     part1_output_tokens: int = 0
@@ -33,21 +63,90 @@ class AgentContext:
     part2_run_code_errors: int = 0
     part1_run_code_success: int = 0
     part2_run_code_success: int = 0
+
+    # Interpreter of the last successful run_code (Python backends) and of the runs that solved each part
+    last_interpreter: Optional[str] = None
+    part1_interpreter: Optional[str] = None
+    part2_interpreter: Optional[str] = None
     
+    # Edits made with replace_in_file and the characters not re-emitted compared to rewriting whole files
+    patch_edits: int = 0
+    patch_saved_chars: int = 0
+
     # Report
     final_report_written: bool = False
     final_report_path: Optional[str] = None
     final_report_images: List[str] = field(default_factory=list)
+
+    # Budget tracking: totals for the run and where the current part started
+    steps: int = 0
+    run_code_executions: int = 0
+    # run_code plus the other tools that execute code; this is what the run_code budget caps
+    code_executions: int = 0
+    part_start_duration: float = 0
+    part_start_output_tokens: int = 0
+    part_start_steps: int = 0
+    # code_executions when the current part started (the name predates the other code tools)
+    part_start_run_code: int = 0
+    termination_reason: Optional[str] = None
+
+    # Resume bookkeeping: time the run spent dead between a checkpoint and its resume is not counted.
+    paused_duration: float = 0
+    checkpoint_time: float = 0
+
+    def elapsed(self) -> float:
+        return time.time() - self.start_time - self.paused_duration
+
+    def save(self, path: str):
+        self.checkpoint_time = time.time()
+        with open(path, "w") as f:
+            json.dump(asdict(self), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> AgentContext:
+        with open(path, "r") as f:
+            context = cls(**json.load(f))
+        context.paused_duration += time.time() - context.checkpoint_time
+        return context
     
+    def record_step(self):
+        self.steps += 1
+
+    def check_budgets(self, run_budget: Budget, part_budget: Budget) -> Optional[str]:
+        """Returns a termination reason like 'budget:part:steps' if a budget is exhausted."""
+        elapsed = self.elapsed()
+        exceeded = run_budget.exceeded(elapsed, self.output_tokens, self.steps, self.code_executions)
+        if exceeded:
+            return f"budget:run:{exceeded}"
+        exceeded = part_budget.exceeded(
+            elapsed - self.part_start_duration,
+            self.output_tokens - self.part_start_output_tokens,
+            self.steps - self.part_start_steps,
+            self.code_executions - self.part_start_run_code,
+        )
+        if exceeded:
+            return f"budget:part:{exceeded}"
+        return None
+
+    def _start_next_part(self):
+        self.part_start_duration = self.elapsed()
+        self.part_start_output_tokens = self.output_tokens
+        self.part_start_steps = self.steps
+        self.part_start_run_code = self.code_executions
+
     def record_success(self, part: int):
+        if (part == 1 and not self.part1_finished) or (part == 2 and not self.part2_finished):
+            self._start_next_part()
         if part == 1:
             self.part1_finished = True
-            self.part1_duration = time.time() - self.start_time
+            self.part1_duration = self.elapsed()
             self.part1_output_tokens = self.output_tokens
+            self.part1_interpreter = self.last_interpreter
         elif part == 2:
             self.part2_finished = True
-            self.part2_duration = time.time() - self.start_time
+            self.part2_duration = self.elapsed()
             self.part2_output_tokens = self.output_tokens
+            self.part2_interpreter = self.last_interpreter
 
     def record_incorrect_submission(self, part: int):
         if part == 1:
@@ -55,7 +154,16 @@ class AgentContext:
         elif part == 2:
             self.part2_incorrect += 1
 
+    def record_patch_edit(self, file_size: int, emitted_chars: int):
+        self.patch_edits += 1
+        self.patch_saved_chars += max(0, file_size - emitted_chars)
+
+    def record_code_execution(self):
+        self.code_executions += 1
+
     def record_run_code_error(self):
+        self.run_code_executions += 1
+        self.record_code_execution()
         if self.part2_finished:
             return
         if not self.part1_finished:
@@ -63,7 +171,10 @@ class AgentContext:
         else:
             self.part2_run_code_errors += 1
 
-    def record_run_code_success(self):
+    def record_run_code_success(self, interpreter: Optional[str] = None):
+        self.run_code_executions += 1
+        self.record_code_execution()
+        self.last_interpreter = interpreter
         if self.part2_finished:
             return
         if not self.part1_finished:
@@ -0,0 +1,225 @@
+"""
+Run history: written as JSON lines during a run, read back as a stream.
+
+history.jsonl has one line per agent step: {"step", "elapsed", "output_tokens", "input_tokens", "chunk"},
+where chunk is the LangGraph update ({node: {"messages": [...]}}) with messages dumped as dicts.
+Older runs have history.json, a JSON array of chunks whose messages are repr strings;
+it is parsed element by element, so neither format is ever loaded whole.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Iterator, List, Optional, Tuple
+
+HISTORY_FILE = "history.jsonl"
+LEGACY_HISTORY_FILE = "history.json"
+
+READ_SIZE = 1 << 16
+_LEGACY_TOOL_CALL_RE = re.compile(r"\{'name': '(\w+)', 'args': (\{.*?\}), 'id'")
+_LEGACY_TOOL_NAME_RE = re.compile(r"\bname='(\w+)'")
+_LEGACY_CONTENT_RE = re.compile(r"^content=(['\"])(.*?)\1 ", re.S)
+
+
+def serialize(obj: Any) -> Any:
+    """json.dump default for history chunks: messages become dicts, anything else its str()."""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return str(obj)
+
+
+def append_step(path: str, step: int, elapsed: float, output_tokens: int, input_tokens: int, chunk: Any):
+    record = {"step": step, "elapsed": round(elapsed, 3), "output_tokens": output_tokens, "input_tokens": input_tokens, "chunk": chunk}
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, default=serialize) + "\n")
+
+
+@dataclass
+class Message:
+    kind: str  # "ai", "tool", "human", ...
+    text: str
+    tool_calls: List[Tuple[str, Any]] = field(default_factory=list)
+    tool_name: Optional[str] = None
+
+    @property
+    def run_code_failed(self) -> bool:
+        # Successful run_code results start with "stdout:"; errors, timeouts and exceptions do not
+        return self.kind == "tool" and self.tool_name == "run_code" and not self.text.startswith("stdout:")
+
+
+@dataclass
+class Step:
+    step: int
+    node: str
+    messages: List[Message]
+    elapsed: Optional[float] = None
+    output_tokens: Optional[int] = None
+    input_tokens: Optional[int] = None
+
+
+def _message(raw: Any) -> Message:
+    if isinstance(raw, dict):
+        content = raw.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+        calls = [(c.get("name", "?"), c.get("args", {})) for c in raw.get("tool_calls") or []]
+        return Message(raw.get("type", "?"), str(content), calls, raw.get("name"))
+
+    # Legacy repr string, e.g. "content='...' name='run_code' tool_call_id='...'"
+    text = str(raw)
+    match = _LEGACY_CONTENT_RE.match(text)
+    content = match.group(2) if match else text
+    calls = _LEGACY_TOOL_CALL_RE.findall(text)
+    name_match = _LEGACY_TOOL_NAME_RE.search(text)
+    kind = "tool" if "tool_call_id=" in text else "ai"
+    return Message(kind, content, calls, name_match.group(1) if kind == "tool" and name_match else None)
+
+
+def _step(step: int, chunk: Any, **timing: Any) -> Step:
+    node, messages = "?", []
+    if isinstance(chunk, dict):
+        for node, update in chunk.items():
+            if isinstance(update, dict):
+                messages.extend(_message(m) for m in update.get("messages") or [])
+    return Step(step, node, messages, **timing)
+
+
+def iter_json_array(path: str) -> Iterator[Any]:
+    """Yields the elements of a top-level JSON array one by one, reading the file in chunks."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer, pos, eof = "", 0, False
+
+        def fill() -> bool:
+            nonlocal buffer, pos, eof
+            data = f.read(READ_SIZE)
+            if not data:
+                eof = True
+                return False
+            buffer = buffer[pos:] + data
+            pos = 0
+            return True
+
+        def skip(chars: str):
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in chars:
+                    pos += 1
+                if pos < len(buffer) or not fill():
+                    return
+
+        skip(" \t\r\n")
+        if pos >= len(buffer) or buffer[pos] != "[":
+            raise ValueError(f"{path} is not a JSON array")
+        pos += 1
+        while True:
+            skip(" \t\r\n,")
+            if pos >= len(buffer) or buffer[pos] == "]":
+                return
+            while True:
+                try:
+                    element, end = decoder.raw_decode(buffer, pos)
+                    break
+                except json.JSONDecodeError:
+                    # Most likely the element continues beyond the buffer
+                    if eof or not fill():
+                        raise
+            pos = end
+            yield element
+
+
+def iter_history(run_dir: str) -> Iterator[Step]:
+    """Steps of a run: the legacy history.json first (if any), then history.jsonl."""
+    step = 0
+    legacy = os.path.join(run_dir, LEGACY_HISTORY_FILE)
+    if os.path.exists(legacy):
+        for chunk in iter_json_array(legacy):
+            step += 1
+            yield _step(step, chunk)
+    path = os.path.join(run_dir, HISTORY_FILE)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                step = record.get("step", step + 1)
+                yield _step(step, record.get("chunk"), elapsed=record.get("elapsed"),
+                            output_tokens=record.get("output_tokens"), input_tokens=record.get("input_tokens"))
+
+
+def _short(text: str, width: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+
+def _format_args(args: Any, width: int = 80) -> str:
+    if not isinstance(args, dict):
+        return _short(str(args).strip("{}"), width)
+    return _short(", ".join(f"{k}={v!r}" for k, v in args.items()), width)
+
+
+def render_timeline(steps: Iterator[Step], step_range: Optional[Tuple[int, int]] = None,
+                    tools_only: bool = False, run_code_failures: bool = False, width: int = 120) -> Iterator[str]:
+    """Yields one compact line per message: step, time spent, output tokens spent, node and a summary."""
+    prev_elapsed, prev_tokens = 0.0, 0
+    for step in steps:
+        dt = f"+{step.elapsed - prev_elapsed:6.1f}s" if step.elapsed is not None else "      -"
+        dtok = f"out+{step.output_tokens - prev_tokens:<6}" if step.output_tokens is not None else "out -     "
+        if step.elapsed is not None:
+            prev_elapsed = step.elapsed
+        if step.output_tokens is not None:
+            prev_tokens = step.output_tokens
+
+        if step_range and step.step > step_range[1]:
+            break
+        if step_range and step.step < step_range[0]:
+            continue
+        for message in step.messages:
+            if run_code_failures and not message.run_code_failed:
+                continue
+            if tools_only and not (message.tool_calls or message.kind == "tool"):
+                continue
+            prefix = f"#{step.step:<4} {dt} {dtok} {step.node:<6}"
+            if message.tool_calls:
+                for name, args in message.tool_calls:
+                    yield f"{prefix} -> {name}({_format_args(args)})"
+            elif message.kind == "tool":
+                status = " FAIL" if message.run_code_failed else ""
+                yield f"{prefix} <- {message.tool_name}{status}: {_short(message.text, width - len(prefix) - 20)}"
+            else:
+                yield f"{prefix}    {message.kind}: {_short(message.text, width - len(prefix) - 10)}"
+
+
+def parse_step_range(value: str) -> Tuple[int, int]:
+    """'10..20', '10..' or '..20' or '15'."""
+    if ".." in value:
+        start, end = value.split("..", 1)
+        return int(start or 1), int(end) if end else 10 ** 9
+    return int(value), int(value)
+
+
+def _find_run(run_root: str, run_id: str) -> Optional[str]:
+    """The directory holding the run's history: a path, a run in run_root, or an archived run extracted on demand."""
+    for candidate in (run_id, os.path.join(run_root, run_id)):
+        if any(os.path.exists(os.path.join(candidate, name)) for name in (HISTORY_FILE, LEGACY_HISTORY_FILE)):
+            return candidate
+    from .run_archive import RunArchive
+    archive = RunArchive()
+    if archive.is_archived(run_id):
+        return archive.materialize(run_id, exclude=(), include=(HISTORY_FILE, LEGACY_HISTORY_FILE))
+    return None
+
+
+def inspect_command(run_root: str, run_id: str, steps: Optional[str] = None,
+                    tools_only: bool = False, run_code_failures: bool = False) -> int:
+    path = _find_run(run_root, run_id)
+    if path is None:
+        print(f"No history found for run {run_id}")
+        return 1
+    step_range = parse_step_range(steps) if steps else None
+    for line in render_timeline(iter_history(path), step_range, tools_only, run_code_failures):
+        print(line)
+    return 0
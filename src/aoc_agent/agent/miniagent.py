@@ -1,13 +1,17 @@
 from __future__ import annotations
-from dataclasses import dataclass
+import os
+import sqlite3
+from dataclasses import dataclass, field
 from typing import Any, Iterator, cast
 
 from langchain.agents import create_agent
 from langchain_core.runnables import RunnableConfig
 from langchain_community.agent_toolkits import FileManagementToolkit
+from langgraph.checkpoint.sqlite import SqliteSaver
 
 from ..core.aoc_client import AocClient
 from ..core.llm import create_llm, TokenCollector
+from ..core.llm_routing import RoutingPolicy
 from .context import AgentContext
 from .tools import Lang, AocToolbox
 from langchain_core.prompts import ChatPromptTemplate
@@ -28,9 +32,14 @@ system_prompt = ChatPromptTemplate.from_messages(
             First of all brainstorm ideas and approaches to solve the task. 
             Write the most viable ideas_part1.md into ideas.md and ideas_part2.md files.
               
-            You can write small programs to analyze input data, if you need to choose between several approaches.
+            Use tool 'get_input_profile' to get an overview of the input data (sizes, grids, number ranges, separators).
+            If the profile is not enough to choose between several approaches, explore the input with 'run_python_cell':
+            the kernel keeps its state, so parse input.txt once and reuse it in the following cells.
                         
             Use tools 'run_code' and 'submit_result' to solve the tasks.
+            Check your solution with 'run_examples' before submitting: every wrong answer costs a cooldown.
+            If a solution is too slow, call 'profile_code' to find the hotspots before optimizing.
+            To change an existing file use 'replace_in_file' instead of rewriting the whole file with 'write_file'.
             
             ## Report
             
@@ -69,6 +78,8 @@ system_prompt = ChatPromptTemplate.from_messages(
     ]
 )
 
+CHECKPOINT_FILE = "checkpoints.sqlite"
+
 task_prompt_template = ChatPromptTemplate.from_template(
     "Solve the task of year {year}, day {day} with programming language {lang}. Submit answers and write a report!"
 )
@@ -77,16 +88,25 @@ task_prompt_template = ChatPromptTemplate.from_template(
 @dataclass
 class MiniAgent:
     """A minimal agent with tools."""
+    routing: RoutingPolicy = field(default_factory=RoutingPolicy)
 
-    def execute(self, client: AocClient, context: AgentContext) -> Iterator[Any]:
+    def execute(self, client: AocClient, context: AgentContext, resume: bool = False) -> Iterator[Any]:
+        """
+        Streams the agent graph. The graph state is checkpointed to the run directory after every step,
+        so with resume=True the stream continues from the last checkpoint instead of starting over.
+        """
         toolbox = AocToolbox(client, context)
         fs_toolkit = FileManagementToolkit(root_dir=context.working_dir)
         tools = fs_toolkit.get_tools() + toolbox.make_tools()
-        llm = create_llm(context.model_name, tools)
+        # Runs of the same task and language share the system prompt, tool schemas and statement.
+        prompt_cache_key = f"aoc-agent-{context.language}-{context.year}-{context.day}"
+        llm = create_llm(context.model_name, tools, self.routing, prompt_cache_key)
+        conn = sqlite3.connect(os.path.join(context.working_dir, CHECKPOINT_FILE), check_same_thread=False)
         agent_runnable = create_agent(
             model=llm,
             tools=tools,
-            system_prompt=system_prompt.format_messages()[0].content
+            system_prompt=system_prompt.format_messages()[0].content,
+            checkpointer=SqliteSaver(conn),
         )
         lang = cast(Lang, context.language)
         initial_state : dict[str, Any] = {
@@ -98,10 +118,14 @@ class MiniAgent:
             ]
         }
 
-        return agent_runnable.stream(
-            cast(Any, initial_state),
-            config=cast(RunnableConfig, {
-                "configurable": {"run_id": context.run_id},
-                "callbacks": [TokenCollector(context)]
-            }),
-        )
+        try:
+            yield from agent_runnable.stream(
+                None if resume else cast(Any, initial_state),
+                config=cast(RunnableConfig, {
+                    "configurable": {"run_id": context.run_id, "thread_id": context.run_id},
+                    "callbacks": [TokenCollector(context)]
+                }),
+            )
+        finally:
+            toolbox.close()
+            conn.close()
@@ -3,12 +3,117 @@ from __future__ import annotations
 import json
 import math
 import os
-from collections import defaultdict
+import shutil
+from collections import Counter, defaultdict
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, TextIO
 
 from rich import print
 
+from .run_metadata import collect_run_metadata
+
+REPORT_FILE = "report.html"
+# Stylesheet, chart data and per-year pages, loaded by the report page on demand.
+ASSETS_DIR = "report_files"
+WRITE_BUFFER = 1 << 16
+
+STYLESHEET = """
+body { font-family: sans-serif; margin: 20px; }
+h1, h2, h3 { color: #333; }
+table { border-collapse: collapse; width: 100%; margin-bottom: 20px; }
+th, td { border: 1px solid #ddd; padding: 8px; text-align: center; }
+th { background-color: #f2f2f2; }
+tr:nth-child(even) { background-color: #f9f9f9; }
+tr:hover { background-color: #f1f1f1; }
+.summary { font-weight: bold; margin-bottom: 10px; color: #555; }
+.success { color: green; font-weight: bold; }
+.failure { color: red; font-weight: bold; }
+.year-section { margin-top: 40px; border-top: 2px solid #eee; padding-top: 20px; }
+.matrix-header { font-weight: bold; background-color: #e0e0e0; }
+.self-cell { background-color: #eee; color: #aaa; }
+.pairwise-table td { text-align: center; }
+.pairwise-table th { min-width: 80px; }
+.pairwise-table { width: auto; }
+.better { color: green; font-weight: bold; }
+.worse { color: red; font-weight: bold; }
+.metric-good { color: green; font-weight: bold; }
+.metric-bad { color: red; font-weight: bold; }
+.metric-neutral { color: #777; }
+.sub-label { font-size: 0.8em; color: #888; display: block; }
+.charts { display: flex; flex-wrap: wrap; gap: 20px; }
+.chart { width: 45%; min-width: 500px; max-width: 500px; }
+details.year-section > summary { cursor: pointer; }
+details.year-section > summary h2 { display: inline; }
+iframe.year-page { width: 100%; border: none; }
+"""
+
+# Chart.js and the chart data are only fetched when a chart section scrolls into view, and a year page only
+# when its section is opened. Data files are scripts rather than fetched JSON, so the report also works from file://.
+LOADER_SCRIPT = """
+const AocReport = {
+    chartJs: null,
+    loadScript(src) {
+        return new Promise((resolve, reject) => {
+            const script = document.createElement('script');
+            script.src = src;
+            script.onload = resolve;
+            script.onerror = reject;
+            document.head.appendChild(script);
+        });
+    },
+    charts(specs) {
+        for (const spec of specs) {
+            new Chart(document.getElementById(spec.id), {
+                type: 'scatter',
+                data: { datasets: spec.datasets },
+                options: {
+                    responsive: true,
+                    aspectRatio: 1,
+                    plugins: {
+                        title: { display: true, text: spec.title },
+                        tooltip: {
+                            callbacks: {
+                                label: function(context) {
+                                    let pt = context.raw;
+                                    return context.dataset.label + ': (' + pt.x.toFixed(1) + ', ' + pt.y.toFixed(1) + ') [' + pt.year + ' Day ' + pt.day + ']';
+                                }
+                            }
+                        }
+                    },
+                    scales: {
+                        x: { type: 'linear', position: 'bottom', title: { display: true, text: spec.x } },
+                        y: { title: { display: true, text: spec.y } }
+                    }
+                }
+            });
+        }
+    }
+};
+const chartObserver = new IntersectionObserver((entries) => {
+    for (const entry of entries) {
+        if (!entry.isIntersecting) continue;
+        chartObserver.unobserve(entry.target);
+        AocReport.chartJs = AocReport.chartJs || AocReport.loadScript('https://cdn.jsdelivr.net/npm/chart.js');
+        AocReport.chartJs.then(() => AocReport.loadScript(entry.target.dataset.src));
+    }
+}, { rootMargin: '200px' });
+document.querySelectorAll('[data-src]').forEach((el) => chartObserver.observe(el));
+document.querySelectorAll('details[data-page]').forEach((details) => {
+    details.addEventListener('toggle', () => {
+        if (!details.open || details.querySelector('iframe')) return;
+        const frame = document.createElement('iframe');
+        frame.className = 'year-page';
+        frame.src = details.dataset.page;
+        details.appendChild(frame);
+    });
+});
+window.addEventListener('message', (event) => {
+    const data = event.data || {};
+    const details = document.querySelector(`details[data-year="${data.aocReportYear}"]`);
+    if (details && details.querySelector('iframe')) details.querySelector('iframe').style.height = (data.height + 20) + 'px';
+});
+"""
+
 
 class ReportBuilder:
     def __init__(self, run_dir: str = "data/run", reports_dir: str = "data/reports"):
@@ -18,7 +123,8 @@ class ReportBuilder:
     def build_report(self) -> str:
         """
         Scans the run directory for metadata.json files, aggregates them,
-        and generates an HTML report.
+        and generates an HTML report: a small report.html with the summary matrices,
+        plus chart data and one page per year in report_files/.
         Returns the path to the generated report.
         """
         all_metadata = self._collect_metadata()
@@ -28,38 +134,41 @@ class ReportBuilder:
 
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         os.makedirs(self.reports_dir, exist_ok=True)
-        report_path = os.path.join(self.reports_dir, f"report_all_{timestamp}.html")
-        report_path_default = os.path.join(self.reports_dir, f"report.html")
-
-        html_content = self._generate_html(all_metadata, timestamp)
-        
-        with open(report_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
-
-        with open(report_path_default, "w", encoding="utf-8") as f:
-            f.write(html_content)
-
+        report_path = os.path.join(self.reports_dir, REPORT_FILE)
+        assets_dir = os.path.join(self.reports_dir, ASSETS_DIR)
+
+        # Everything is written next to the live report and swapped in at the end,
+        # so a browser never sees a half-written report.
+        staging_dir = assets_dir + ".tmp"
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        os.makedirs(staging_dir)
+        with open(os.path.join(staging_dir, "report.css"), "w", encoding="utf-8") as f:
+            f.write(STYLESHEET)
+
+        by_year: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
+        for r in all_metadata:
+            by_year[r.get('year', 'Unknown')].append(r)
+        for year, runs in by_year.items():
+            with open(os.path.join(staging_dir, f"year-{year}.html"), "w", encoding="utf-8", buffering=WRITE_BUFFER) as out:
+                self._write_year_page(out, year, runs, timestamp)
+
+        with open(report_path + ".tmp", "w", encoding="utf-8", buffering=WRITE_BUFFER) as out:
+            chart_data = self._write_report_page(out, all_metadata, sorted(by_year.keys(), key=str, reverse=True), timestamp)
+        for name, specs in chart_data.items():
+            with open(os.path.join(staging_dir, f"{name}.js"), "w", encoding="utf-8", buffering=WRITE_BUFFER) as out:
+                out.write("AocReport.charts(")
+                json.dump(specs, out)
+                out.write(");\n")
+
+        shutil.rmtree(assets_dir, ignore_errors=True)
+        os.replace(staging_dir, assets_dir)
+        os.replace(report_path + ".tmp", report_path)
 
         print(f"[bold green]Report generated successfully:[/bold green] {report_path}")
         return report_path
 
     def _collect_metadata(self) -> List[Dict[str, Any]]:
-        results = []
-        if not os.path.exists(self.run_dir):
-            return results
-
-        for entry in os.listdir(self.run_dir):
-            full_path = os.path.join(self.run_dir, entry)
-            if os.path.isdir(full_path):
-                meta_file = os.path.join(full_path, "metadata.json")
-                if os.path.exists(meta_file):
-                    try:
-                        with open(meta_file, "r", encoding="utf-8") as f:
-                            data = json.load(f)
-                            results.append(data)
-                    except Exception as e:
-                        print(f"[red]Error reading {meta_file}: {e}[/red]")
-        return results
+        return collect_run_metadata(self.run_dir)
 
     def _get_color_style(self, value: float, min_val: float, max_val: float, low_is_good: bool = True) -> str:
         if max_val <= min_val:
@@ -93,183 +202,166 @@ class ReportBuilder:
         
         return f'style="background-color: rgb({r}, {g}, {b})"'
 
-    def _generate_html(self, results: List[Dict[str, Any]], timestamp: str) -> str:
-        # --- New: Pairwise Comparison Section ---
-        pairwise_html = self._generate_pairwise_section(results)
-        charts_html = self._generate_charts_section(results)
-        model_charts_html = self._generate_model_comparison_charts(results)
-        model_pairwise_html = self._generate_model_pairwise_section(results)
-        token_comparison_html = self._generate_token_comparison_table(results)
-
-        # Group by Year -> Day -> Lang -> Model
-        # Structure: grouped[year][(day, lang, model)] = list of runs
-        grouped: Dict[int, Dict[tuple, List[Dict]]] = defaultdict(lambda: defaultdict(list))
-        
-        for r in results:
-            year = r.get('year', 'Unknown')
+    def _write_page_head(self, out: TextIO, title: str, stylesheet: str):
+        out.write("<!DOCTYPE html>\n<html>\n<head>\n<meta charset='utf-8'>\n")
+        out.write(f"<title>{title}</title>\n<link rel='stylesheet' href='{stylesheet}'>\n</head>\n<body>\n")
+
+    def _write_report_page(self, out: TextIO, results: List[Dict[str, Any]], years: List[Any], timestamp: str) -> Dict[str, List[Dict]]:
+        """Writes the report page and returns the chart data files to write: name -> chart specs."""
+        self._write_page_head(out, "AoC Agent Report (All Runs)", f"{ASSETS_DIR}/report.css")
+        out.write(f"<h1>AoC Agent Report</h1>\n<p>Generated at: {timestamp}</p>\n")
+
+        self._generate_pairwise_section(results, out)
+        self._generate_model_pairwise_section(results, out)
+        chart_data = {
+            "charts": self._generate_charts_section(results, out, f"{ASSETS_DIR}/charts.js"),
+            "model-charts": self._generate_model_comparison_charts(results, out, f"{ASSETS_DIR}/model-charts.js"),
+        }
+
+        runs_per_year = Counter(r.get('year', 'Unknown') for r in results)
+        for year in years:
+            n_runs = runs_per_year[year]
+            page = f"{ASSETS_DIR}/year-{year}.html"
+            out.write(f"<details class='year-section' data-year='{year}' data-page='{page}'>")
+            out.write(f"<summary><h2>Year {year}</h2> ({n_runs} runs, <a href='{page}'>open</a>)</summary></details>\n")
+
+        out.write(f"<script>{LOADER_SCRIPT}</script>\n</body></html>\n")
+        return {name: specs for name, specs in chart_data.items() if specs}
+
+    def _write_year_page(self, out: TextIO, year: Any, runs: List[Dict[str, Any]], timestamp: str):
+        """A standalone page with the detailed tables of one year, shown inside the report on demand."""
+        self._write_page_head(out, f"AoC Agent Report - Year {year}", "report.css")
+        out.write(f"<h1>AoC Agent Report - Year {year}</h1>\n<p>Generated at: {timestamp}</p>\n")
+        self._generate_year_stats_table(out, year, runs)
+        self._generate_token_comparison_table(out, year, runs)
+        # Lets the report page size its frame to the content (works across file:// origins too)
+        out.write("<script>window.addEventListener('load', () => parent.postMessage("
+                  f"{{aocReportYear: {json.dumps(str(year))}, height: document.documentElement.scrollHeight}}, '*'));</script>\n")
+        out.write("</body></html>\n")
+
+    def _generate_year_stats_table(self, out: TextIO, year: Any, year_runs: List[Dict[str, Any]]):
+        # Group by Day -> Lang -> Model
+        # Structure: grouped[(day, lang, model)] = list of runs
+        grouped: Dict[tuple, List[Dict]] = defaultdict(list)
+        for r in year_runs:
             key = (r.get('day', 0), r.get('lang', 'unknown'), r.get('model', 'unknown'))
-            grouped[year][key].append(r)
-
-        years = sorted(grouped.keys())
-
-        html = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-        <title>AoC Agent Report (All Runs)</title>
-        <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-        <style>
-            body { font-family: sans-serif; margin: 20px; }
-            h1, h2, h3 { color: #333; }
-            table { border-collapse: collapse; width: 100%; margin-bottom: 20px; }
-            th, td { border: 1px solid #ddd; padding: 8px; text-align: center; }
-            th { background-color: #f2f2f2; }
-            tr:nth-child(even) { background-color: #f9f9f9; }
-            tr:hover { background-color: #f1f1f1; }
-            .summary { font-weight: bold; margin-bottom: 10px; color: #555; }
-            .success { color: green; font-weight: bold; }
-            .failure { color: red; font-weight: bold; }
-            .year-section { margin-top: 40px; border-top: 2px solid #eee; padding-top: 20px; }
-            .matrix-header { font-weight: bold; background-color: #e0e0e0; }
-            .self-cell { background-color: #eee; color: #aaa; }
-            .pairwise-table td { text-align: center; }
-            .pairwise-table th { min-width: 80px; }
-            .pairwise-table { width: auto; }
-            .better { color: green; font-weight: bold; }
-            .worse { color: red; font-weight: bold; }
-            .metric-good { color: green; font-weight: bold; }
-            .metric-bad { color: red; font-weight: bold; }
-            .metric-neutral { color: #777; }
-            .sub-label { font-size: 0.8em; color: #888; display: block; }
-        </style>
-        </head>
-        <body>
-        <h1>AoC Agent Report</h1>
-        <p>Generated at: """ + timestamp + """</p>
-        
-        """ + pairwise_html + """
-        
-        """ + model_pairwise_html + """
-        
-        """ + token_comparison_html + """
+            grouped[key].append(r)
 
-        """ + charts_html + """
+        out.write(f"<div class='year-section'><h2>Year {year}</h2>")
         
-        """ + model_charts_html + """
+        # Stats for year
+        # ... (we could add yearly aggregation here) ...
         
+        out.write("<table><thead><tr>")
+        out.write("<th>Day</th><th>Lang</th><th>Model</th><th>N Runs</th>")
+        out.write("<th>P1 Solved</th><th>P2 Solved</th>")
+        out.write("<th>Avg Dur (s)</th><th>Min Dur (s)</th>")
+        out.write("<th>Avg Tok</th><th>Min Tok</th>")
+        out.write("<th>Avg Fric</th><th>Min Fric</th>")
+        out.write("<th>Interpreter</th>")
+        out.write("</tr></thead><tbody>")
         
-        """
+        # Sort keys by day desc
+        year_keys = sorted(grouped.keys(), key=lambda x: (x[0], x[1], x[2]), reverse=True)
         
-        for year in years:
-            html += f"<div class='year-section'><h2>Year {year}</h2>"
+        # Prepare rows for coloring
+        rows_stats = []
+        vals_min_tokens = []
+        vals_avg_friction = []
+        vals_min_friction = []
+        
+        for day, lang, model in year_keys:
+            runs = grouped[(day, lang, model)]
+            n = len(runs)
             
-            # Stats for year
-            # ... (we could add yearly aggregation here) ...
+            p1_solved_count = sum(1 for r in runs if r.get('part1_solved'))
+            p2_solved_count = sum(1 for r in runs if r.get('part2_solved'))
             
-            html += "<table><thead><tr>"
-            html += "<th>Day</th><th>Lang</th><th>Model</th><th>N Runs</th>"
-            html += "<th>P1 Solved</th><th>P2 Solved</th>"
-            html += "<th>Avg Dur (s)</th><th>Min Dur (s)</th>"
-            html += "<th>Avg Tok</th><th>Min Tok</th>"
-            html += "<th>Avg Fric</th><th>Min Fric</th>"
-            html += "</tr></thead><tbody>"
+            # Calculate stats
+            durs = [r.get('part12_duration', 0) for r in runs]
+            avg_dur = sum(durs) / n
+            min_dur = min(durs)
             
-            # Sort keys by day desc
-            year_keys = sorted(grouped[year].keys(), key=lambda x: (x[0], x[1], x[2]), reverse=True)
+            toks = [r.get('part12_output_tokens', 0) for r in runs]
+            avg_tok = sum(toks) / n
+            min_tok = min(toks)
             
-            # Prepare rows for coloring
-            rows_stats = []
-            vals_min_tokens = []
-            vals_avg_friction = []
-            vals_min_friction = []
+            # Friction: Incorrect attempts + run code errors
+            frictions = [
+                r.get('part1_incorrect', 0) + 
+                r.get('part2_incorrect', 0) + 
+                r.get('part1_run_code_errors', 0) + 
+                r.get('part2_run_code_errors', 0)
+                for r in runs
+            ]
+            avg_fric = sum(frictions) / n
+            min_fric = min(frictions)
             
-            for day, lang, model in year_keys:
-                runs = grouped[year][(day, lang, model)]
-                n = len(runs)
-                
-                p1_solved_count = sum(1 for r in runs if r.get('part1_solved'))
-                p2_solved_count = sum(1 for r in runs if r.get('part2_solved'))
-                
-                # Calculate stats
-                durs = [r.get('part12_duration', 0) for r in runs]
-                avg_dur = sum(durs) / n
-                min_dur = min(durs)
-                
-                toks = [r.get('part12_output_tokens', 0) for r in runs]
-                avg_tok = sum(toks) / n
-                min_tok = min(toks)
-                
-                # Friction: Incorrect attempts + run code errors
-                frictions = [
-                    r.get('part1_incorrect', 0) + 
-                    r.get('part2_incorrect', 0) + 
-                    r.get('part1_run_code_errors', 0) + 
-                    r.get('part2_run_code_errors', 0)
-                    for r in runs
-                ]
-                avg_fric = sum(frictions) / n
-                min_fric = min(frictions)
-                
-                n_success = sum(1 for r in runs if r.get('part2_solved'))
-                
-                rows_stats.append({
-                    'day': day,
-                    'lang': lang,
-                    'model': model,
-                    'n': n,
-                    'p1_solved_count': p1_solved_count,
-                    'p2_solved_count': p2_solved_count,
-                    'p1_class': 'success' if p1_solved_count == n else ('failure' if p1_solved_count == 0 else ''),
-                    'p2_class': 'success' if p2_solved_count == n else ('failure' if p2_solved_count == 0 else ''),
-                    'avg_dur': avg_dur,
-                    'min_dur': min_dur,
-                    'avg_tokens': avg_tok,
-                    'min_tokens': min_tok,
-                    'avg_friction': avg_fric,
-                    'min_friction': min_fric,
-                    'n_success': n_success
-                })
-                
-                if n_success > 0:
-                    vals_min_tokens.append(min_tok)
-                    vals_avg_friction.append(avg_fric)
-                    vals_min_friction.append(min_fric)
-
-            # Determine ranges for coloring
-            range_min_tokens = (min(vals_min_tokens, default=0), max(vals_min_tokens, default=0))
-            range_avg_friction = (min(vals_avg_friction, default=0), max(vals_avg_friction, default=0))
-            range_min_friction = (min(vals_min_friction, default=0), max(vals_min_friction, default=0))
-
-            # 3. Render Rows
-            for rs in rows_stats:
-                style_min_tokens = self._get_color_style(rs['min_tokens'], *range_min_tokens)
-                style_avg_friction = self._get_color_style(rs['avg_friction'], *range_avg_friction) if rs['n_success'] > 0 else ""
-                style_min_friction = self._get_color_style(rs['min_friction'], *range_min_friction) if rs['n_success'] > 0 else ""
-
-                html += f"<tr>"
-                html += f"<td>{rs['day']}</td>"
-                html += f"<td>{rs['lang']}</td>"
-                html += f"<td>{rs['model']}</td>"
-                html += f"<td>{rs['n']}</td>"
-                html += f"<td class='{rs['p1_class']}'>{rs['p1_solved_count']}/{rs['n']} ({rs['p1_solved_count']/rs['n']*100:.0f}%)</td>"
-                html += f"<td class='{rs['p2_class']}'>{rs['p2_solved_count']}/{rs['n']} ({rs['p2_solved_count']/rs['n']*100:.0f}%)</td>"
-                html += f"<td>{rs['avg_dur']:.2f}</td>"
-                html += f"<td>{rs['min_dur']:.2f}</td>"
-                html += f"<td>{rs['avg_tokens']:.0f}</td>"
-                html += f"<td {style_min_tokens}>{rs['min_tokens']:.0f}</td>"
-                
-                if rs['n_success'] > 0:
-                    html += f"<td {style_avg_friction}>{rs['avg_friction']:.1f}</td>"
-                    html += f"<td {style_min_friction}>{rs['min_friction']:.1f}</td>"
-                else:
-                    html += "<td>-</td><td>-</td>"
-                
-                html += f"</tr>"
-            
-            html += "</tbody></table></div>"
+            n_success = sum(1 for r in runs if r.get('part2_solved'))
 
-        html += "</body></html>"
-        return html
+            # Which Python implementation (CPython/PyPy) produced the final answer
+            interpreters = Counter(
+                (r.get('part2_interpreter') or r.get('part1_interpreter')).split()[0]
+                for r in runs if r.get('part2_interpreter') or r.get('part1_interpreter')
+            )
+            
+            rows_stats.append({
+                'day': day,
+                'lang': lang,
+                'model': model,
+                'n': n,
+                'p1_solved_count': p1_solved_count,
+                'p2_solved_count': p2_solved_count,
+                'p1_class': 'success' if p1_solved_count == n else ('failure' if p1_solved_count == 0 else ''),
+                'p2_class': 'success' if p2_solved_count == n else ('failure' if p2_solved_count == 0 else ''),
+                'avg_dur': avg_dur,
+                'min_dur': min_dur,
+                'avg_tokens': avg_tok,
+                'min_tokens': min_tok,
+                'avg_friction': avg_fric,
+                'min_friction': min_fric,
+                'n_success': n_success,
+                'interpreters': ", ".join(f"{name} {count}" for name, count in sorted(interpreters.items())) or "-"
+            })
+            
+            if n_success > 0:
+                vals_min_tokens.append(min_tok)
+                vals_avg_friction.append(avg_fric)
+                vals_min_friction.append(min_fric)
+
+        # Determine ranges for coloring
+        range_min_tokens = (min(vals_min_tokens, default=0), max(vals_min_tokens, default=0))
+        range_avg_friction = (min(vals_avg_friction, default=0), max(vals_avg_friction, default=0))
+        range_min_friction = (min(vals_min_friction, default=0), max(vals_min_friction, default=0))
+
+        # 3. Render Rows
+        for rs in rows_stats:
+            style_min_tokens = self._get_color_style(rs['min_tokens'], *range_min_tokens)
+            style_avg_friction = self._get_color_style(rs['avg_friction'], *range_avg_friction) if rs['n_success'] > 0 else ""
+            style_min_friction = self._get_color_style(rs['min_friction'], *range_min_friction) if rs['n_success'] > 0 else ""
+
+            out.write(f"<tr>")
+            out.write(f"<td>{rs['day']}</td>")
+            out.write(f"<td>{rs['lang']}</td>")
+            out.write(f"<td>{rs['model']}</td>")
+            out.write(f"<td>{rs['n']}</td>")
+            out.write(f"<td class='{rs['p1_class']}'>{rs['p1_solved_count']}/{rs['n']} ({rs['p1_solved_count']/rs['n']*100:.0f}%)</td>")
+            out.write(f"<td class='{rs['p2_class']}'>{rs['p2_solved_count']}/{rs['n']} ({rs['p2_solved_count']/rs['n']*100:.0f}%)</td>")
+            out.write(f"<td>{rs['avg_dur']:.2f}</td>")
+            out.write(f"<td>{rs['min_dur']:.2f}</td>")
+            out.write(f"<td>{rs['avg_tokens']:.0f}</td>")
+            out.write(f"<td {style_min_tokens}>{rs['min_tokens']:.0f}</td>")
+            
+            if rs['n_success'] > 0:
+                out.write(f"<td {style_avg_friction}>{rs['avg_friction']:.1f}</td>")
+                out.write(f"<td {style_min_friction}>{rs['min_friction']:.1f}</td>")
+            else:
+                out.write("<td>-</td><td>-</td>")
+
+            out.write(f"<td>{rs['interpreters']}</td>")
+            out.write(f"</tr>")
+        
+        out.write("</tbody></table></div>")
 
     def _aggregate_stats(self, results: List[Dict[str, Any]]) -> tuple[Dict[tuple, Dict[str, Dict[str, float]]], set]:
         task_map: Dict[tuple, Dict[str, Dict[str, float]]] = defaultdict(dict)
@@ -307,23 +399,22 @@ class ReportBuilder:
                 
         return task_map, all_langs
 
-    def _generate_charts_section(self, results: List[Dict[str, Any]]) -> str:
+    def _generate_charts_section(self, results: List[Dict[str, Any]], out: TextIO, data_src: str) -> List[Dict]:
+        """Writes the chart placeholders; returns the chart specs that data_src must provide."""
         task_map, all_langs = self._aggregate_stats(results)
         sorted_langs = sorted(list(all_langs))
         if len(sorted_langs) < 2:
-            return ""
+            return []
             
-        html = "<div class='year-section'><h2>Token Usage Comparison (XY Charts)</h2>"
-        html += "<p class='summary'>X-axis: Language 1 Avg Tokens, Y-axis: Language 2 Avg Tokens. Each point is a task (Year, Day). Colors represent models.</p>"
+        out.write("<div class='year-section'><h2>Token Usage Comparison (XY Charts)</h2>")
+        out.write("<p class='summary'>X-axis: Language 1 Avg Tokens, Y-axis: Language 2 Avg Tokens. Each point is a task (Year, Day). Colors represent models.</p>")
         
         pairs = []
         for i in range(len(sorted_langs)):
             for j in range(i + 1, len(sorted_langs)):
                 pairs.append((sorted_langs[i], sorted_langs[j]))
         
-        html += "<div style='display: flex; flex-wrap: wrap; gap: 20px;'>"
-        
-        chart_js_code = ""
+        charts = []
         # Palette
         colors = [
             'rgba(255, 99, 132, 0.7)',
@@ -359,7 +450,6 @@ class ReportBuilder:
                 continue
             
             has_charts = True
-            html += f"<div style='width: 45%; min-width: 500px; max-width: 500px;'><canvas id='{chart_id}'></canvas></div>"
             
             chart_data_sets = []
             
@@ -386,59 +476,31 @@ class ReportBuilder:
                 }
                 chart_data_sets.append(ds)
             
-            chart_js_code += f"""
-            new Chart(document.getElementById('{chart_id}'), {{
-                type: 'scatter',
-                data: {{
-                    datasets: {json.dumps(chart_data_sets)}
-                }},
-                options: {{
-                    responsive: true,
-                    aspectRatio: 1,
-                    plugins: {{
-                        title: {{
-                            display: true,
-                            text: '{lang1} vs {lang2} (Tokens)'
-                        }},
-                        tooltip: {{
-                            callbacks: {{
-                                label: function(context) {{
-                                    let pt = context.raw;
-                                    return context.dataset.label + ': (' + pt.x.toFixed(1) + ', ' + pt.y.toFixed(1) + ') [' + pt.year + ' Day ' + pt.day + ']';
-                                }}
-                            }}
-                        }}
-                    }},
-                    scales: {{
-                        x: {{
-                            type: 'linear',
-                            position: 'bottom',
-                            title: {{
-                                display: true,
-                                text: '{lang1} Avg Tokens'
-                            }}
-                        }},
-                        y: {{
-                            title: {{
-                                display: true,
-                                text: '{lang2} Avg Tokens'
-                            }}
-                        }}
-                    }}
-                }}
-            }});
-            """
+            charts.append({
+                'id': chart_id,
+                'title': f'{lang1} vs {lang2} (Tokens)',
+                'x': f'{lang1} Avg Tokens',
+                'y': f'{lang2} Avg Tokens',
+                'datasets': chart_data_sets,
+            })
             
-        html += "</div>"
-        if has_charts:
-            html += f"<script>{chart_js_code}</script>"
-        else:
-            html += "<p>No overlapping data for charts.</p>"
+        self._write_chart_grid(out, charts, data_src)
+        if not has_charts:
+            out.write("<p>No overlapping data for charts.</p>")
             
-        html += "</div>"
-        return html
-
-    def _generate_model_comparison_charts(self, results: List[Dict[str, Any]]) -> str:
+        out.write("</div>")
+        return charts
+
+    def _write_chart_grid(self, out: TextIO, charts: List[Dict], data_src: str):
+        # Only a grid with charts points at a data file: empty sections have no file to load.
+        loader = f" data-src='{data_src}'" if charts else ""
+        out.write(f"<div class='charts'{loader}>")
+        for chart in charts:
+            out.write(f"<div class='chart'><canvas id='{chart['id']}'></canvas></div>")
+        out.write("</div>")
+
+    def _generate_model_comparison_charts(self, results: List[Dict[str, Any]], out: TextIO, data_src: str) -> List[Dict]:
+        """Writes the chart placeholders; returns the chart specs that data_src must provide."""
         # 1. Aggregate data by (Year, Day, Lang) -> {model: stats}
         grouped_data = defaultdict(lambda: defaultdict(list))
         
@@ -475,11 +537,9 @@ class ReportBuilder:
             for j in range(i + 1, len(target_models)):
                 pairs.append((target_models[i], target_models[j]))
 
-        html = "<div class='year-section'><h2>Model Token Usage Comparison (XY Charts)</h2>"
-        html += "<p class='summary'>X-axis: Model 1 Avg Tokens, Y-axis: Model 2 Avg Tokens. Each point is a task (Year, Day) per Language. Colors represent Languages.</p>"
-        html += "<div style='display: flex; flex-wrap: wrap; gap: 20px;'>"
-
-        chart_js_code = ""
+        out.write("<div class='year-section'><h2>Model Token Usage Comparison (XY Charts)</h2>")
+        out.write("<p class='summary'>X-axis: Model 1 Avg Tokens, Y-axis: Model 2 Avg Tokens. Each point is a task (Year, Day) per Language. Colors represent Languages.</p>")
+        charts = []
         
         sorted_langs = sorted(list(all_langs))
         base_colors = [
@@ -520,8 +580,6 @@ class ReportBuilder:
              has_charts = True
              chart_id = f"chart_model_{m1}_{m2}".replace("-", "_").replace(".", "_")
              
-             html += f"<div style='width: 45%; min-width: 500px; max-width: 500px;'><canvas id='{chart_id}'></canvas></div>"
-             
              chart_data_sets = []
              # Diagonal line
              chart_data_sets.append({
@@ -546,58 +604,22 @@ class ReportBuilder:
                  }
                  chart_data_sets.append(ds)
             
-             chart_js_code += f"""
-            new Chart(document.getElementById('{chart_id}'), {{
-                type: 'scatter',
-                data: {{
-                    datasets: {json.dumps(chart_data_sets)}
-                }},
-                options: {{
-                    responsive: true,
-                    aspectRatio: 1,
-                    plugins: {{
-                        title: {{
-                            display: true,
-                            text: '{m1} vs {m2} (Tokens)'
-                        }},
-                        tooltip: {{
-                            callbacks: {{
-                                label: function(context) {{
-                                    let pt = context.raw;
-                                    return context.dataset.label + ': (' + pt.x.toFixed(1) + ', ' + pt.y.toFixed(1) + ') [' + pt.year + ' Day ' + pt.day + ']';
-                                }}
-                            }}
-                        }}
-                    }},
-                    scales: {{
-                        x: {{
-                            type: 'linear',
-                            position: 'bottom',
-                            title: {{
-                                display: true,
-                                text: '{m1} Avg Tokens'
-                            }}
-                        }},
-                        y: {{
-                            title: {{
-                                display: true,
-                                text: '{m2} Avg Tokens'
-                            }}
-                        }}
-                    }}
-                }}
-            }});
-            """
-
-        html += "</div>"
-        if has_charts:
-             html += f"<script>{chart_js_code}</script>"
-        else:
-             html += "<p>No overlapping data for selected models.</p>"
-
-        return html
-
-    def _generate_pairwise_section(self, results: List[Dict[str, Any]]) -> str:
+             charts.append({
+                'id': chart_id,
+                'title': f'{m1} vs {m2} (Tokens)',
+                'x': f'{m1} Avg Tokens',
+                'y': f'{m2} Avg Tokens',
+                'datasets': chart_data_sets,
+             })
+
+        self._write_chart_grid(out, charts, data_src)
+        if not has_charts:
+             out.write("<p>No overlapping data for selected models.</p>")
+
+        out.write("</div>")
+        return charts
+
+    def _generate_pairwise_section(self, results: List[Dict[str, Any]], out: TextIO):
         """
         Generates a pairwise comparison matrix for languages based on overlapping tasks.
         Methodology:
@@ -611,21 +633,21 @@ class ReportBuilder:
 
         sorted_langs = sorted(list(all_langs))
         if len(sorted_langs) < 2:
-            return ""
+            return
 
         # 2. Build Matrix
-        html = "<div class='year-section'><h2>Language Head-to-Head Comparison</h2>"
-        html += "<p class='summary'>Comparison on overlapping tasks (where both languages solved Part 2).</p>"
-        html += "<table class='pairwise-table'><thead><tr><th class='matrix-header'>Row vs Col</th>"
+        out.write("<div class='year-section'><h2>Language Head-to-Head Comparison</h2>")
+        out.write("<p class='summary'>Comparison on overlapping tasks (where both languages solved Part 2).</p>")
+        out.write("<table class='pairwise-table'><thead><tr><th class='matrix-header'>Row vs Col</th>")
         for l in sorted_langs:
-            html += f"<th class='matrix-header'>{l}</th>"
-        html += "</tr></thead><tbody>"
+            out.write(f"<th class='matrix-header'>{l}</th>")
+        out.write("</tr></thead><tbody>")
 
         for lang_a in sorted_langs:
-            html += f"<tr><td class='matrix-header'>{lang_a}</td>"
+            out.write(f"<tr><td class='matrix-header'>{lang_a}</td>")
             for lang_b in sorted_langs:
                 if lang_a == lang_b:
-                    html += "<td class='self-cell'>—</td>"
+                    out.write("<td class='self-cell'>—</td>")
                     continue
 
                 # Compare A vs B
@@ -651,7 +673,7 @@ class ReportBuilder:
                         common_count += 1
 
                 if common_count == 0:
-                    html += "<td><span class='metric-neutral'>N/A</span></td>"
+                    out.write("<td><span class='metric-neutral'>N/A</span></td>")
                 else:
                     # Geometric Mean for Ratios
                     geo_dur = math.exp(sum(math.log(x) for x in ratios_dur) / len(ratios_dur)) if ratios_dur else 1.0
@@ -670,22 +692,21 @@ class ReportBuilder:
                         if val > 0.1: return "metric-bad"
                         return "metric-neutral"
 
-                    html += "<td class='matrix-cell'>"
-                    html += f"<div class='{fmt_cls(geo_dur)}'>Time: {geo_dur:.2f}x</div>"
-                    html += f"<div class='{fmt_cls(geo_tok)}'>Tokens: {geo_tok:.2f}x</div>"
+                    out.write("<td class='matrix-cell'>")
+                    out.write(f"<div class='{fmt_cls(geo_dur)}'>Time: {geo_dur:.2f}x</div>")
+                    out.write(f"<div class='{fmt_cls(geo_tok)}'>Tokens: {geo_tok:.2f}x</div>")
                     
                     sign = "+" if avg_diff_fric > 0 else ""
-                    html += f"<div class='{fmt_fric(avg_diff_fric)}'>Friction: {sign}{avg_diff_fric:.1f}</div>"
+                    out.write(f"<div class='{fmt_fric(avg_diff_fric)}'>Friction: {sign}{avg_diff_fric:.1f}</div>")
                     
-                    html += f"<span class='sub-label'>({common_count} tasks)</span>"
-                    html += "</td>"
+                    out.write(f"<span class='sub-label'>({common_count} tasks)</span>")
+                    out.write("</td>")
 
-            html += "</tr>"
+            out.write("</tr>")
         
-        html += "</tbody></table></div>"
-        return html
+        out.write("</tbody></table></div>")
 
-    def _generate_model_pairwise_section(self, results: List[Dict[str, Any]]) -> str:
+    def _generate_model_pairwise_section(self, results: List[Dict[str, Any]], out: TextIO):
         """
         Generates a pairwise comparison matrix for models based on overlapping tasks (Same Year, Day, Lang).
         """
@@ -727,21 +748,21 @@ class ReportBuilder:
                 task_map[key][m] = {'dur': avg_dur, 'tok': avg_tok, 'fric': avg_fric}
 
         if not task_map:
-            return ""
+            return
 
         # 2. Build Matrix
-        html = "<div class='year-section'><h2>Model Head-to-Head Comparison</h2>"
-        html += "<p class='summary'>Comparison on overlapping tasks (Same Year, Day, Language) where both models solved Part 2.</p>"
-        html += "<table class='pairwise-table'><thead><tr><th class='matrix-header'>Row vs Col</th>"
+        out.write("<div class='year-section'><h2>Model Head-to-Head Comparison</h2>")
+        out.write("<p class='summary'>Comparison on overlapping tasks (Same Year, Day, Language) where both models solved Part 2.</p>")
+        out.write("<table class='pairwise-table'><thead><tr><th class='matrix-header'>Row vs Col</th>")
         for m in target_models:
-            html += f"<th class='matrix-header'>{m}</th>"
-        html += "</tr></thead><tbody>"
+            out.write(f"<th class='matrix-header'>{m}</th>")
+        out.write("</tr></thead><tbody>")
 
         for m_a in target_models:
-            html += f"<tr><td class='matrix-header'>{m_a}</td>"
+            out.write(f"<tr><td class='matrix-header'>{m_a}</td>")
             for m_b in target_models:
                 if m_a == m_b:
-                    html += "<td class='self-cell'>—</td>"
+                    out.write("<td class='self-cell'>—</td>")
                     continue
 
                 # Compare A vs B
@@ -766,7 +787,7 @@ class ReportBuilder:
                         common_count += 1
 
                 if common_count == 0:
-                    html += "<td><span class='metric-neutral'>N/A</span></td>"
+                    out.write("<td><span class='metric-neutral'>N/A</span></td>")
                 else:
                     # Geometric Mean for Ratios
                     geo_dur = math.exp(sum(math.log(x) for x in ratios_dur) / len(ratios_dur)) if ratios_dur else 1.0
@@ -785,90 +806,78 @@ class ReportBuilder:
                         if val > 0.1: return "metric-bad"
                         return "metric-neutral"
 
-                    html += "<td class='matrix-cell'>"
-                    html += f"<div class='{fmt_cls(geo_dur)}'>Time: {geo_dur:.2f}x</div>"
-                    html += f"<div class='{fmt_cls(geo_tok)}'>Tokens: {geo_tok:.2f}x</div>"
+                    out.write("<td class='matrix-cell'>")
+                    out.write(f"<div class='{fmt_cls(geo_dur)}'>Time: {geo_dur:.2f}x</div>")
+                    out.write(f"<div class='{fmt_cls(geo_tok)}'>Tokens: {geo_tok:.2f}x</div>")
                     
                     sign = "+" if avg_diff_fric > 0 else ""
-                    html += f"<div class='{fmt_fric(avg_diff_fric)}'>Friction: {sign}{avg_diff_fric:.1f}</div>"
+                    out.write(f"<div class='{fmt_fric(avg_diff_fric)}'>Friction: {sign}{avg_diff_fric:.1f}</div>")
                     
-                    html += f"<span class='sub-label'>({common_count} tasks)</span>"
-                    html += "</td>"
+                    out.write(f"<span class='sub-label'>({common_count} tasks)</span>")
+                    out.write("</td>")
 
-            html += "</tr>"
+            out.write("</tr>")
         
-        html += "</tbody></table></div>"
-        return html
+        out.write("</tbody></table></div>")
 
-    def _generate_token_comparison_table(self, results: List[Dict[str, Any]]) -> str:
-        by_year = defaultdict(list)
-        for r in results:
-            by_year[r.get('year', 'Unknown')].append(r)
+    def _generate_token_comparison_table(self, out: TextIO, year: Any, runs: List[Dict[str, Any]]):
+        # 1. Collect data and calculate model stats
+        # data structure: day -> model -> list of token counts
+        raw_data = defaultdict(lambda: defaultdict(list))
         
-        html = ""
+        for r in runs:
+            if r.get('part1_solved') and r.get('part2_solved') and r.get('lang') == 'python':
+                day = r.get('day', 0)
+                model = r.get('model', 'unknown')
+                tokens = r.get('part12_output_tokens', 0)
+                raw_data[day][model].append(tokens)
+
+        # Calculate averages
+        data = defaultdict(dict) # day -> model -> average tokens
+        model_values = defaultdict(list) # model -> [average tokens]
         
-        for year in sorted(by_year.keys(), reverse=True):
-            runs = by_year[year]
-            
-            # 1. Collect data and calculate model stats
-            # data structure: day -> model -> list of token counts
-            raw_data = defaultdict(lambda: defaultdict(list))
-            
-            for r in runs:
-                if r.get('part1_solved') and r.get('part2_solved') and r.get('lang') == 'python':
-                    day = r.get('day', 0)
-                    model = r.get('model', 'unknown')
-                    tokens = r.get('part12_output_tokens', 0)
-                    raw_data[day][model].append(tokens)
-
-            # Calculate averages
-            data = defaultdict(dict) # day -> model -> average tokens
-            model_values = defaultdict(list) # model -> [average tokens]
+        for day, models_data in raw_data.items():
+            for model, tokens_list in models_data.items():
+                avg_tokens = sum(tokens_list) / len(tokens_list)
+                data[day][model] = avg_tokens
+                model_values[model].append(avg_tokens)
+
+        # 2. Sort models: columns with more cells (values) to the left
+        # Count how many days each model has data for
+        models = sorted(model_values.keys(), key=lambda m: len(model_values[m]), reverse=True)
+        
+        # 3. Calculate min/max per model for coloring
+        model_stats = {}
+        for m in models:
+            vals = model_values[m]
+            if vals:
+                model_stats[m] = {'min': min(vals), 'max': max(vals)}
+            else:
+                model_stats[m] = {'min': 0, 'max': 0}
+
+        out.write(f"<div class='year-section'><h2>Year {year} - Token Usage Comparison (Python only, Both Parts Solved)</h2>")
+        out.write("<p>Average output tokens used to solve both parts (Python runs only). Color scale is relative to each model's range (column-wise).</p>")
+        out.write("<div style='overflow-x: auto;'>")
+        out.write("<table style='width: auto;'><thead><tr><th>Day</th>")
+        for m in models:
+            out.write(f"<th>{m}</th>")
+        out.write("</tr></thead><tbody>")
+        
+        for day in range(1, 26):
+            if day not in data: 
+                 continue
             
-            for day, models_data in raw_data.items():
-                for model, tokens_list in models_data.items():
-                    avg_tokens = sum(tokens_list) / len(tokens_list)
-                    data[day][model] = avg_tokens
-                    model_values[model].append(avg_tokens)
-
-            # 2. Sort models: columns with more cells (values) to the left
-            # Count how many days each model has data for
-            models = sorted(model_values.keys(), key=lambda m: len(model_values[m]), reverse=True)
+            out.write(f"<tr><td>{day}</td>")
             
-            # 3. Calculate min/max per model for coloring
-            model_stats = {}
-            for m in models:
-                vals = model_values[m]
-                if vals:
-                    model_stats[m] = {'min': min(vals), 'max': max(vals)}
+            for model in models:
+                val = data[day].get(model)
+                if val is None:
+                    out.write("<td>-</td>")
                 else:
-                    model_stats[m] = {'min': 0, 'max': 0}
-
-            html += f"<div class='year-section'><h2>Year {year} - Token Usage Comparison (Python only, Both Parts Solved)</h2>"
-            html += "<p>Average output tokens used to solve both parts (Python runs only). Color scale is relative to each model's range (column-wise).</p>"
-            html += "<div style='overflow-x: auto;'>"
-            html += "<table style='width: auto;'><thead><tr><th>Day</th>"
-            for m in models:
-                html += f"<th>{m}</th>"
-            html += "</tr></thead><tbody>"
-            
-            for day in range(1, 26):
-                if day not in data: 
-                     continue
-                
-                html += f"<tr><td>{day}</td>"
-                
-                for model in models:
-                    val = data[day].get(model)
-                    if val is None:
-                        html += "<td>-</td>"
-                    else:
-                        # Use model-specific min/max
-                        m_min = model_stats[model]['min']
-                        m_max = model_stats[model]['max']
-                        style = self._get_color_style(val, m_min, m_max, low_is_good=True)
-                        html += f"<td {style}>{int(val)}</td>"
-                html += "</tr>"
-            html += "</tbody></table></div></div>"
-            
-        return html
+                    # Use model-specific min/max
+                    m_min = model_stats[model]['min']
+                    m_max = model_stats[model]['max']
+                    style = self._get_color_style(val, m_min, m_max, low_is_good=True)
+                    out.write(f"<td {style}>{int(val)}</td>")
+            out.write("</tr>")
+        out.write("</tbody></table></div></div>")
@@ -0,0 +1,219 @@
+"""
+Archival of completed runs into compressed packs with a random-access index.
+
+Every file of an archived run is compressed as an independent frame and appended to a pack
+in data/archive; index.json maps run_id -> relative path -> (offset, length, size) in its pack,
+so a single file can be read without decompressing anything else. The run directory keeps
+only metadata.json, which is all the report and the sweep planner need.
+"""
+from __future__ import annotations
+
+import fnmatch
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from rich import print
+
+ARCHIVE_DIR = os.path.join("data", "archive")
+INDEX_FILE = "index.json"
+MATERIALIZE_DIR = os.path.join("data", "cache", "archive")
+# Packs roll over at this size, so no single file grows without bound.
+MAX_PACK_BYTES = 256 * 1024 * 1024
+# Build leftovers and checkpoints of completed runs are dropped instead of archived.
+DROP_PATTERNS = ["*.jar", "bin", "obj", "__pycache__", "example-*", "checkpoints.sqlite*"]
+HOT_FILES = ["metadata.json"]
+
+Codec = Tuple[str, Callable[[bytes], bytes], Callable[[bytes], bytes]]
+
+
+def _codec(name: Optional[str] = None) -> Codec:
+    """
+    Returns (name, compress, decompress). zstd comes from the standard library (Python 3.14+)
+    or the optional zstandard package; without either, new packs fall back to lzma.
+    """
+    if name in (None, "zstd"):
+        try:
+            from compression import zstd  # type: ignore[import-not-found]
+            return "zstd", lambda data: zstd.compress(data, level=10), zstd.decompress
+        except ImportError:
+            pass
+        try:
+            import zstandard  # type: ignore[import-not-found]
+            return ("zstd", zstandard.ZstdCompressor(level=10).compress,
+                    lambda data: zstandard.ZstdDecompressor().decompress(data))
+        except ImportError:
+            if name == "zstd":
+                raise RuntimeError("Reading zstd packs needs Python 3.14+ or the zstandard package (pip install 'aoc-agent[archive]')")
+    import lzma
+    return "xz", lzma.compress, lzma.decompress
+
+
+def _dropped(name: str) -> bool:
+    return any(fnmatch.fnmatch(name, pattern) for pattern in DROP_PATTERNS)
+
+
+def _run_files(run_path: str) -> List[str]:
+    """Relative paths of the files to archive, in a stable order."""
+    files = []
+    for root, dirs, names in os.walk(run_path):
+        dirs[:] = sorted(d for d in dirs if not _dropped(d))
+        for name in sorted(names):
+            rel = os.path.relpath(os.path.join(root, name), run_path).replace(os.sep, "/")
+            if rel not in HOT_FILES and not _dropped(name):
+                files.append(rel)
+    return files
+
+
+class RunArchive:
+    def __init__(self, archive_dir: str = ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+        self._index: Optional[dict] = None
+
+    @property
+    def index(self) -> dict:
+        if self._index is None:
+            path = os.path.join(self.archive_dir, INDEX_FILE)
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    self._index = json.load(f)
+            else:
+                self._index = {"version": 1, "packs": {}, "runs": {}}
+        return self._index
+
+    def _save_index(self):
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = os.path.join(self.archive_dir, INDEX_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(path + ".tmp", path)
+
+    # --- Reading -------------------------------------------------------------------------------
+
+    def is_archived(self, run_id: str) -> bool:
+        return run_id in self.index["runs"]
+
+    def files(self, run_id: str) -> List[str]:
+        return list(self.index["runs"].get(run_id, {}).get("files", {}))
+
+    def read(self, run_id: str, rel_path: str) -> bytes:
+        """Reads one archived file: a seek and the decompression of its own frame only."""
+        entry = self.index["runs"][run_id]
+        offset, length, _ = entry["files"][rel_path]
+        pack = entry["pack"]
+        _, _, decompress = _codec(self.index["packs"][pack]["codec"])
+        with open(os.path.join(self.archive_dir, pack), "rb") as f:
+            f.seek(offset)
+            return decompress(f.read(length))
+
+    def materialize(self, run_id: str, exclude: Iterable[str] = ("history.json", "history.jsonl"),
+                    target_root: str = MATERIALIZE_DIR, include: Optional[Iterable[str]] = None) -> str:
+        """
+        Extracts an archived run (only the included and without the excluded patterns) into a cache directory
+        and returns its path, for tools that work on run directories. Files already extracted are not read again.
+        """
+        target = os.path.join(target_root, run_id)
+        exclude = list(exclude)
+        include = list(include) if include is not None else None
+        for rel_path in self.files(run_id):
+            if any(fnmatch.fnmatch(rel_path, pattern) for pattern in exclude):
+                continue
+            if include is not None and not any(fnmatch.fnmatch(rel_path, pattern) for pattern in include):
+                continue
+            dest = os.path.join(target, *rel_path.split("/"))
+            if os.path.exists(dest):
+                continue
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            with open(dest + ".tmp", "wb") as f:
+                f.write(self.read(run_id, rel_path))
+            os.replace(dest + ".tmp", dest)
+        return target
+
+    # --- Writing -------------------------------------------------------------------------------
+
+    def archive_runs(self, run_dir: str, older_than_days: float) -> List[str]:
+        """Archives completed runs whose start_time is older than the threshold. Returns the archived run ids."""
+        cutoff = datetime.now() - timedelta(days=older_than_days)
+        candidates = []
+        for run_id in sorted(os.listdir(run_dir)) if os.path.isdir(run_dir) else []:
+            run_path = os.path.join(run_dir, run_id)
+            meta_file = os.path.join(run_path, "metadata.json")
+            if self.is_archived(run_id) or not os.path.exists(meta_file):
+                continue
+            try:
+                with open(meta_file, "r", encoding="utf-8") as f:
+                    started = datetime.fromisoformat(json.load(f)["start_time"])
+            except (OSError, ValueError, KeyError):
+                started = datetime.fromtimestamp(os.path.getmtime(meta_file))
+            if started < cutoff:
+                candidates.append(run_id)
+
+        if not candidates:
+            return []
+        codec_name, compress, _ = _codec()
+        pack, pack_file = None, None
+        archived = []
+        try:
+            for run_id in candidates:
+                if pack_file is None or pack_file.tell() >= MAX_PACK_BYTES:
+                    if pack_file is not None:
+                        pack_file.close()
+                    pack = f"runs-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{len(self.index['packs']):04d}.pack"
+                    self.index["packs"][pack] = {"codec": codec_name, "created": datetime.now().isoformat()}
+                    os.makedirs(self.archive_dir, exist_ok=True)
+                    pack_file = open(os.path.join(self.archive_dir, pack), "ab")
+
+                run_path = os.path.join(run_dir, run_id)
+                files: Dict[str, List[int]] = {}
+                for rel_path in _run_files(run_path):
+                    with open(os.path.join(run_path, *rel_path.split("/")), "rb") as f:
+                        data = f.read()
+                    frame = compress(data)
+                    files[rel_path] = [pack_file.tell(), len(frame), len(data)]
+                    pack_file.write(frame)
+                pack_file.flush()
+                os.fsync(pack_file.fileno())
+
+                # The index is committed before anything is deleted, so a crash never loses a run.
+                self.index["runs"][run_id] = {"pack": pack, "archived_at": datetime.now().isoformat(), "files": files}
+                self._save_index()
+                self._prune(run_path)
+                archived.append(run_id)
+        finally:
+            if pack_file is not None:
+                pack_file.close()
+        return archived
+
+    @staticmethod
+    def _prune(run_path: str):
+        for name in os.listdir(run_path):
+            if name in HOT_FILES:
+                continue
+            path = os.path.join(run_path, name)
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+
+
+def _tree_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def archive_command(run_dir: str, older_than_days: float) -> int:
+    archive = RunArchive()
+    before = _tree_size(run_dir) if os.path.isdir(run_dir) else 0
+    start = time.time()
+    archived = archive.archive_runs(run_dir, older_than_days)
+    if not archived:
+        print(f"No completed runs older than {older_than_days:g} days left to archive.")
+        return 0
+    after = _tree_size(run_dir)
+    packs = {archive.index["runs"][run_id]["pack"] for run_id in archived}
+    packed = sum(os.path.getsize(os.path.join(archive.archive_dir, p)) for p in packs)
+    print(f"[green]Archived {len(archived)} runs[/green] in {time.time() - start:.1f}s: "
+          f"{run_dir} {before / 2**20:.1f} MB -> {after / 2**20:.1f} MB, packs {', '.join(sorted(packs))} ({packed / 2**20:.1f} MB)")
+    return 0
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Dict, List
+
+from rich import print
+
+
+def collect_run_metadata(run_dir: str = "data/run") -> List[Dict[str, Any]]:
+    """Reads metadata.json of every completed run in run_dir."""
+    results: List[Dict[str, Any]] = []
+    if not os.path.exists(run_dir):
+        return results
+
+    for entry in os.listdir(run_dir):
+        full_path = os.path.join(run_dir, entry)
+        if os.path.isdir(full_path):
+            meta_file = os.path.join(full_path, "metadata.json")
+            if os.path.exists(meta_file):
+                try:
+                    with open(meta_file, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                        results.append(data)
+                except Exception as e:
+                    print(f"[red]Error reading {meta_file}: {e}[/red]")
+    return results
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from rich import print
+
+from .run_metadata import collect_run_metadata
+
+# Expected duration of a case nothing is known about.
+DEFAULT_DURATION = 600.0
+
+
+@dataclass
+class PlannedCase:
+    day: int
+    lang: str
+    model: str
+    repeat: int
+    expected_duration: float
+
+
+class SweepPlanner:
+    """
+    Turns a sweep request (days x languages x models x repeats) into the list of runs still missing.
+
+    Completed runs already in run_dir count towards the requested repeats of their cell: runs that
+    solved the day, and unsolved runs the agent ended itself. Unsolved runs stopped by a budget
+    (termination_reason "budget:...") are planned again.
+    The remaining cases are ordered longest-expected-first (LPT), which keeps the makespan
+    low when cases are executed in parallel and surfaces the expensive cells early otherwise.
+    """
+
+    def __init__(self, run_dir: str = "data/run"):
+        self.run_dir = run_dir
+
+    def plan(self, year: int, days: List[int], languages: List[str], models: List[str], n_repeats: int) -> List[PlannedCase]:
+        runs = [r for r in collect_run_metadata(self.run_dir) if r.get('year') == year]
+
+        done: Dict[tuple, int] = defaultdict(int)
+        for r in runs:
+            if self._completed(r):
+                done[(r.get('day'), r.get('lang'), r.get('model'))] += 1
+
+        cases = []
+        for day in days:
+            for lang in languages:
+                for model in models:
+                    n_done = done[(day, lang, model)]
+                    expected = self._expected_duration(runs, day, lang, model)
+                    for repeat in range(n_done, n_repeats):
+                        cases.append(PlannedCase(day, lang, model, repeat + 1, expected))
+
+        cases.sort(key=lambda c: (-c.expected_duration, c.day, c.lang, c.model, c.repeat))
+        return cases
+
+    @staticmethod
+    def _completed(run: Dict[str, Any]) -> bool:
+        # The part budget keeps counting after part 2 is accepted, e.g. while the report is written
+        solved = run.get('part1_solved') if run.get('day') == 25 else run.get('part2_solved')
+        if solved:
+            return True
+        # Runs written before termination_reason existed have none and count as completed.
+        return not (run.get('termination_reason') or "").startswith("budget:")
+
+    def _expected_duration(self, runs: List[Dict[str, Any]], day: int, lang: str, model: str) -> float:
+        # From the most specific history to the least specific one.
+        matchers = [
+            lambda r: (r.get('day'), r.get('lang'), r.get('model')) == (day, lang, model),
+            lambda r: r.get('day') == day and r.get('model') == model,
+            lambda r: r.get('day') == day,
+            lambda r: r.get('model') == model,
+        ]
+        for matcher in matchers:
+            avg = self._average_duration([r for r in runs if matcher(r)])
+            if avg is not None:
+                return avg
+        return DEFAULT_DURATION
+
+    @staticmethod
+    def _average_duration(runs: List[Dict[str, Any]]) -> Optional[float]:
+        # Unsolved runs have part12_duration == 0 and say nothing about the cost of the task.
+        durations = [r.get('part12_duration', 0) for r in runs if r.get('part12_duration', 0) > 0]
+        if not durations:
+            return None
+        return sum(durations) / len(durations)
+
+
+def print_plan(year: int, cases: List[PlannedCase], requested: int) -> None:
+    print(f"[bold green]Sweep plan for {year}[/bold green]: {len(cases)} runs to do, {requested - len(cases)} already satisfied")
+    total = 0.0
+    for i, c in enumerate(cases, start=1):
+        total += c.expected_duration
+        print(f"  {i:>3}. Day {c.day:>2}, {c.lang}, {c.model}, Repeat {c.repeat}: ~{c.expected_duration:.0f}s")
+    print(f"Expected total duration: ~{total / 60:.1f} min")
@@ -7,6 +7,8 @@ import sys
 import time
 import shutil
 import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Literal, Optional, List, Callable, Any
@@ -14,12 +16,23 @@ from langchain_core.runnables import RunnableConfig
 from rich import print
 
 from .context import AgentContext
+from .workspace import provision_input, store_input
 from ..core.aoc_client import AocClient
-from ..core.html_parsing import extract_task_articles, extract_puzzle_answers, parse_submission_message
+from ..core.answer_ledger import AnswerLedger
+from ..core.complexity import FRACTIONS, RUN_BUDGET, TOTAL_BUDGET, ShrinkStrategy, detect_strategy, estimate_growth, input_size, shrink_input
+from ..core.input_profile import profile_input
+from ..core.python_kernel import KernelTimeout, PythonKernel
+from ..core.html_parsing import extract_task_articles, extract_puzzle_answers, parse_submission_message, html_to_markdown, extract_example_tests, parse_answer_hint
 from ..core.runners import get_runner
+from ..core.runners.base import CodeRunner
+from ..core.runners.process import EarlyTermination, ProgressWatchdog
+from ..core.runners.python import PythonRunner
 
 Lang = Literal["python", "kotlin", "csharp", "lean4"]
 
+# Seconds a profiled run may take
+PROFILE_BUDGET = 20
+
 
 def log_success(text: str):
     print(f"[green]{text}[/green]")
@@ -64,13 +77,14 @@ class AocToolbox:
     def __init__(self, client: AocClient, context: AgentContext):
         self.client = client
         self.context = context
+        self._kernel: Optional[PythonKernel] = None
 
         runner = get_runner(self.context.language)
         if runner and self.run_code.__doc__ and "Environment version" not in self.run_code.__doc__:
              version_info = runner.get_version_info()
              self.run_code.__func__.__doc__ += f"\n\n        Environment version: {version_info}"
 
-    def get_task_statement(self, year: int, day: int, part: int) -> str:
+    def get_task_statement(self, year: int, day: int, part: int, raw_html: bool = False) -> str:
         """
         Retrieves the task statement for the given year, day, and part.
 
@@ -78,9 +92,10 @@ class AocToolbox:
             year: The year of the puzzle.
             day: The day of the puzzle.
             part: The part number (1 or 2).
+            raw_html: Return the original HTML instead of Markdown. Rarely needed.
 
         Returns:
-            The HTML content of the task statement.
+            The task statement as Markdown (example inputs are kept verbatim in code blocks).
 
         Note:
             Part 2 is typically only available after Part 1 is successfully solved.
@@ -93,7 +108,7 @@ class AocToolbox:
         task_path = data_path(year, day, f"task_{part}.html")
         if os.path.exists(task_path):
             with open(task_path, "r", encoding="utf-8") as f:
-                return f.read()
+                return self._render_statement(year, day, part, f.read(), raw_html)
 
         # Use client to get HTML
         try:
@@ -123,10 +138,22 @@ class AocToolbox:
                 f.write(answer)
 
         if part <= len(articles):
-            return articles[part - 1]
+            return self._render_statement(year, day, part, articles[part - 1], raw_html)
         else:
             return log_error(f"Error: Part 2 is not available yet. Solve Part 1 first, and query part 2 statement again.")
 
+    def _render_statement(self, year: int, day: int, part: int, html: str, raw_html: bool) -> str:
+        if raw_html:
+            return html
+        md_path = data_path(year, day, f"task_{part}.md")
+        if os.path.exists(md_path) and os.path.getmtime(md_path) >= os.path.getmtime(data_path(year, day, f"task_{part}.html")):
+            with open(md_path, "r", encoding="utf-8") as f:
+                return f.read()
+        md = html_to_markdown(html)
+        with open(md_path, "w", encoding="utf-8") as f:
+            f.write(md)
+        return md
+
     def download_puzzle_input(self, year: int, day: int) -> str:
         """
         Downloads the puzzle input for the specified year and day.
@@ -139,23 +166,54 @@ class AocToolbox:
         Returns:
             A log message indicating whether the download was successful or if the file already existed.
         """
-        file_path = data_path(year, day, "input.txt")
-        
-        if not os.path.exists(file_path):
-            try:
-                text = self.client.get_input(year, day)
-                with open(file_path, "w") as f:
-                    f.write(text)
-            except Exception as e:
-                return log_error(f"Error downloading input: {e}")
+        try:
+            file_path = self._ensure_input(year, day)
+        except Exception as e:
+            return log_error(f"Error downloading input: {e}")
         
-        # Copy to working directory
-        working_dir = self.context.working_dir
-        dest_path = os.path.join(working_dir, "input.txt")
-        shutil.copy(file_path, dest_path)
+        # Link (or copy, across filesystems) to the working directory
+        provision_input(file_path, self.context.working_dir, scratch=self.context.run_dir is not None)
 
         return log_info(f"puzzle input is downloaded to input.txt.")
 
+    def _ensure_input(self, year: int, day: int) -> str:
+        """Returns the path of the shared cached input, downloading it first if needed."""
+        file_path = data_path(year, day, "input.txt")
+        if not os.path.exists(file_path):
+            store_input(file_path, self.client.get_input(year, day))
+        return file_path
+
+    def get_input_profile(self, year: int, day: int) -> str:
+        """
+        Returns a precomputed profile of the puzzle input: line count, line length distribution,
+        grid dimensions and character histogram, numeric ranges and counts, separators and sections.
+
+        Use it to get an overview of the input instead of writing throwaway analysis programs.
+
+        Args:
+            year: The year of the puzzle.
+            day: The day of the puzzle.
+
+        Returns:
+            A short text profile of input.txt.
+        """
+        print(f"Get input profile year={year} day={day}")
+        profile_path = data_path(year, day, "input_profile.txt")
+        if os.path.exists(profile_path):
+            with open(profile_path, "r", encoding="utf-8") as f:
+                return f.read()
+
+        try:
+            input_path = self._ensure_input(year, day)
+        except Exception as e:
+            return log_error(f"Error downloading input: {e}")
+
+        with open(input_path, "r") as f:
+            profile = profile_input(f.read())
+        with open(profile_path, "w", encoding="utf-8") as f:
+            f.write(profile)
+        return profile
+
     def _get_next_run_number(self, working_dir: str) -> int:
         """Finds the next available run number."""
         if not os.path.exists(working_dir):
@@ -177,7 +235,8 @@ class AocToolbox:
 
     def _save_run_info(self, working_dir: str, code_filename: str, 
                        stdout: str, stderr: str, duration: float, 
-                       exit_code: int | str, error: Optional[str] = None):
+                       exit_code: int | str, error: Optional[str] = None,
+                       timings: Optional[dict] = None, interpreter: Optional[str] = None):
         
         run_number = self._get_next_run_number(working_dir)
         run_dir_name = f"coderun-{run_number}"
@@ -193,6 +252,10 @@ class AocToolbox:
             "exit_code": exit_code,
             "original_filename": code_filename
         }
+        if timings:
+            run_info["timings"] = timings
+        if interpreter:
+            run_info["interpreter"] = interpreter
         
         with open(os.path.join(run_dir_path, "result.json"), "w") as f:
             json.dump(run_info, f, indent=2)
@@ -210,7 +273,8 @@ class AocToolbox:
         code_filename.err.txt — full error output of the execution.
 
         Constraints:
-            - Execution time limit: 60 seconds.
+            - Execution time limit: 60 seconds. A run whose progress output ("42%" or "420/1000")
+              projects a finish beyond the limit, or whose progress stops advancing before 100%, is stopped early.
             - No network access.
             - Output (stdout/stderr) is truncated to 3000 characters.
             - No command line arguments provided to your program
@@ -233,7 +297,18 @@ class AocToolbox:
                 return log_error(f"Error: Unsupported language {language}")
 
             start_time = time.time()
-            result = runner.run(working_dir, code_filename)
+            # The solution's output is mirrored to the console while it runs
+            watchdog = ProgressWatchdog(time_limit=60, on_output=lambda stream, text: sys.stdout.write(text))
+            try:
+                result = runner.run(working_dir, code_filename, watchdog)
+            except EarlyTermination:
+                # The watchdog judged the run hopeless; a rerun is not attempted
+                raise
+            except subprocess.TimeoutExpired:
+                rerun = runner.rerun_after_timeout(working_dir, code_filename)
+                if rerun is None:
+                    raise
+                result = rerun
             duration = time.time() - start_time
 
             if result.returncode != 0:
@@ -241,29 +316,294 @@ class AocToolbox:
                 stderr = truncate_output(result.stderr)
                 stdout = truncate_output(result.stdout)
                 
-                self._save_run_info(working_dir, code_filename, result.stdout, result.stderr, duration, result.returncode, "Non-zero exit code")
+                self._save_run_info(working_dir, code_filename, result.stdout, result.stderr, duration, result.returncode, "Non-zero exit code",
+                                    getattr(result, "timings", None), getattr(result, "interpreter", None))
 
                 return log_error(f"stderr:\n{stderr}\nstdout:\n{stdout}\n\nEnvironment:\n{runner.get_version_info()}")
             
-            self.context.record_run_code_success()
+            interpreter = getattr(result, "interpreter", None)
+            self.context.record_run_code_success(interpreter)
             log_output = f"stdout: {truncate_output(result.stdout)}"
+            if getattr(result, "fallback", False):
+                log_output += f"\n(timed out under the default interpreter, this output is from the rerun under {interpreter})"
             
             # Save run info
-            self._save_run_info(working_dir, code_filename, result.stdout, result.stderr, duration, result.returncode)
+            self._save_run_info(working_dir, code_filename, result.stdout, result.stderr, duration, result.returncode,
+                                timings=getattr(result, "timings", None), interpreter=interpreter)
                 
             return log_info(log_output)
 
+        except EarlyTermination as e:
+            self.context.record_run_code_error()
+            stdout = truncate_output(e.stdout) if e.stdout else ""
+
+            self._save_run_info(working_dir, code_filename, e.stdout or "", e.stderr or "", e.timeout, "early_kill", f"EarlyTermination: {e.reason}")
+
+            return log_error(f"Error: Execution was stopped after {e.timeout:.0f} seconds because {e.reason}. stdout:\n{stdout}\n\n"
+                             f"Use profile_code to find out where the time goes.")
         except subprocess.TimeoutExpired as e:
             self.context.record_run_code_error()
             stdout = truncate_output(e.stdout) if e.stdout else ""
             
             self._save_run_info(working_dir, code_filename, e.stdout if e.stdout else "", e.stderr if e.stderr else "", 60.0, "timeout", "TimeoutExpired")
 
-            return log_error(f"Error: Execution was interrupted because it ran longer than 60 seconds. stdout:\n{stdout}")
+            complexity = self._complexity_report(code_filename, "auto")
+            return log_error(f"Error: Execution was interrupted because it ran longer than 60 seconds. stdout:\n{stdout}\n\n"
+                             f"{complexity}\n\nUse profile_code to find out where the time goes.")
         except Exception as e:
             self._save_run_info(working_dir, code_filename, "", "", 0.0, "exception", str(e))
             return log_error(f"Exception: {str(e)}")
 
+    def profile_code(self, code_filename: str) -> str:
+        """
+        Runs the solution under a profiler for up to 20 seconds and returns the hotspots:
+        the functions and lines where most of the time was spent.
+
+        Use it when run_code times out or is too slow, to optimize the right loop instead of guessing.
+
+        Args:
+            code_filename: Filename in the working directory to profile.
+
+        Returns:
+            The top hotspots with their share of the samples or self time.
+        """
+        print(f"Profile code: {code_filename}")
+        self.context.record_code_execution()
+        runner = get_runner(self.context.language)
+        if not runner:
+            return log_error(f"Error: Unsupported language {self.context.language}")
+        try:
+            report = runner.profile(self.context.working_dir, code_filename, PROFILE_BUDGET)
+        except Exception as e:
+            return log_error(f"Exception: {str(e)}")
+        if report is None:
+            return log_error(f"Error: Profiling is not supported for {self.context.language}")
+        return log_info(truncate_output(report))
+
+    def estimate_complexity(self, code_filename: str, shrink: ShrinkStrategy = "auto") -> str:
+        """
+        Runs the solution on scaled-down copies of input.txt (1/32 to 1/4 of it) in parallel,
+        fits the growth of the run time and projects the run time on the full input.
+        Each run gets at most 5 seconds and all of them 15 seconds together.
+
+        Use it to check whether an algorithm is fast enough before running it on the full input,
+        or after a timeout, to see how far from the time limit it is.
+
+        Args:
+            code_filename: Filename in the working directory to execute.
+            shrink: How to cut the input: "lines" keeps a prefix of the lines, "grid" a top-left
+                sub-grid, "records" the first blank-line separated records; "auto" picks by input shape.
+
+        Returns:
+            The measured times per size, the estimated complexity and the projected full-input run time.
+        """
+        print(f"Estimate complexity: {code_filename}, shrink={shrink}")
+        self.context.record_code_execution()
+        return log_info(self._complexity_report(code_filename, shrink))
+
+    def _complexity_report(self, code_filename: str, shrink: str) -> str:
+        runner = get_runner(self.context.language)
+        input_path = os.path.join(self.context.working_dir, "input.txt")
+        if not runner or not os.path.exists(input_path):
+            return "Complexity estimate is not available: no runner or no input.txt."
+        with open(input_path, "r") as f:
+            text = f.read()
+        strategy = detect_strategy(text) if shrink == "auto" else shrink
+        full_size = input_size(text, strategy)
+        deadline = time.time() + TOTAL_BUDGET
+
+        def measure(fraction: float) -> tuple:
+            shrunk = shrink_input(text, strategy, fraction)
+            size = input_size(shrunk, strategy)
+            budget = min(RUN_BUDGET, deadline - time.time())
+            if budget <= 0:
+                return size, None, "skipped, out of time"
+            start = time.time()
+            try:
+                result = self._run_example(runner, code_filename, shrunk, ProgressWatchdog(budget=budget))
+            except subprocess.TimeoutExpired:
+                return size, None, f"over the {budget:.1f}s budget"
+            # Compiled runners report compute time without compilation and JVM startup
+            elapsed = (getattr(result, "timings", None) or {}).get("compute", time.time() - start)
+            return size, elapsed, "ok" if result.returncode == 0 else f"exit code {result.returncode}"
+
+        with ThreadPoolExecutor(max_workers=min(len(FRACTIONS), os.cpu_count() or 1)) as executor:
+            measurements = list(executor.map(measure, FRACTIONS))
+
+        lines = [f"Complexity estimate (input cut by {strategy}, full size {full_size}):"]
+        for size, elapsed, status in measurements:
+            lines.append(f"  size {size}: " + (f"{elapsed:.3f}s" if elapsed is not None else "-") + f" ({status})")
+        growth = estimate_growth([(size, elapsed) for size, elapsed, _ in measurements if elapsed is not None], full_size)
+        if growth is None:
+            lines.append("Not enough runs above the noise floor to fit a growth curve.")
+        else:
+            description, projected = growth
+            lines.append(f"Growth: {description}. Projected run time on the full input: {projected:.1f}s (limit 60s).")
+        return "\n".join(lines)
+
+    def run_python_cell(self, code: str) -> str:
+        """
+        Executes a Python cell in a persistent kernel started in your working directory (like a Jupyter notebook).
+        Variables, functions and imports survive between calls, so parse input.txt once and explore it
+        with follow-up cells instead of re-running whole programs. The value of a trailing expression is printed.
+
+        Use it for exploring the input and testing ideas; the solution itself still goes through run_code.
+
+        Constraints:
+            - Execution time limit: 30 seconds per cell. On timeout the kernel is restarted and its state is lost.
+            - Memory limit: 2 GB.
+            - Output is truncated to 3000 characters.
+
+        Args:
+            code: Python source of the cell.
+
+        Returns:
+            The truncated output of the cell and the traceback if it raised.
+        """
+        print(f"Run python cell:\n{truncate_output(code, 500)}")
+        self.context.record_code_execution()
+        if self._kernel is None:
+            # Same import environment as run_code, so the aoclib helper library is importable
+            self._kernel = PythonKernel(self.context.working_dir, env=PythonRunner.solution_env())
+        try:
+            response = self._kernel.execute(code, timeout=30)
+        except KernelTimeout as e:
+            return log_error(f"Error: Cell ran longer than 30 seconds; the kernel was restarted and all state is lost. output:\n{truncate_output(str(e))}")
+
+        output = response["stdout"]
+        if response["stderr"]:
+            output += f"\nstderr:\n{response['stderr']}"
+        if response["error"]:
+            return log_error(f"{truncate_output(output)}\n{truncate_output(response['error'])}")
+        return log_info(truncate_output(output) if output else "(no output)")
+
+    def close(self):
+        """Stops the Python kernel if it was started."""
+        if self._kernel is not None:
+            self._kernel.shutdown()
+            self._kernel = None
+
+    def _load_example_tests(self, year: int, day: int) -> List[dict]:
+        """Example tests extracted from the cached statements, cached in examples.json."""
+        articles = []
+        for part in (1, 2):
+            task_path = data_path(year, day, f"task_{part}.html")
+            if not os.path.exists(task_path):
+                break
+            with open(task_path, "r", encoding="utf-8") as f:
+                articles.append(f.read())
+
+        examples_path = data_path(year, day, "examples.json")
+        if os.path.exists(examples_path):
+            with open(examples_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("parts") == len(articles):
+                return cached["tests"]
+
+        tests = extract_example_tests(articles)
+        with open(examples_path, "w", encoding="utf-8") as f:
+            json.dump({"parts": len(articles), "tests": tests}, f, indent=2)
+        return tests
+
+    def _run_example(self, runner: CodeRunner, code_filename: str, example_input: str,
+                     watchdog: Optional[ProgressWatchdog] = None) -> subprocess.CompletedProcess:
+        working_dir = self.context.working_dir
+        example_dir = tempfile.mkdtemp(prefix="example-", dir=working_dir)
+        try:
+            suffix = Path(code_filename).suffix
+            for name in os.listdir(working_dir):
+                if name.endswith(suffix) and os.path.isfile(os.path.join(working_dir, name)):
+                    shutil.copy(os.path.join(working_dir, name), os.path.join(example_dir, name))
+            with open(os.path.join(example_dir, "input.txt"), "w") as f:
+                f.write(example_input)
+            return runner.run(example_dir, code_filename, watchdog)
+        finally:
+            shutil.rmtree(example_dir, ignore_errors=True)
+
+    def run_examples(self, code_filename: str) -> str:
+        """
+        Runs your solution against the examples from the task statement, in parallel, and checks
+        that the expected example answers appear in its output. Use it before submit_result:
+        a wrong submission costs a cooldown of a minute or more.
+
+        For every example the solution is run in a separate directory where input.txt contains the example input.
+
+        Args:
+            code_filename: Filename in the working directory to execute.
+
+        Returns:
+            PASS/FAIL per example with the expected answer and the truncated output.
+        """
+        print(f"Run examples: {code_filename}")
+        self.context.record_code_execution()
+        runner = get_runner(self.context.language)
+        if not runner:
+            return log_error(f"Error: Unsupported language {self.context.language}")
+
+        tests = self._load_example_tests(self.context.year, self.context.day)
+        if not tests:
+            return log_error("No examples with expected answers found in the statement. Fetch the statement first or check examples manually.")
+
+        def check(test: dict) -> str:
+            try:
+                result = self._run_example(runner, code_filename, test["input"])
+            except subprocess.TimeoutExpired:
+                return f"Part {test['part']}: FAIL (timeout), expected {test['expected']}"
+            output = result.stdout + "\n" + result.stderr
+            # Solutions print lines like "Part 1: 42": the answer is the last token of a line
+            line_answers = [line.split()[-1].strip(".,;:") for line in result.stdout.splitlines() if line.strip()]
+            status = "PASS" if result.returncode == 0 and test["expected"] in line_answers else "FAIL"
+            return f"Part {test['part']}: {status}, expected {test['expected']}, exit code {result.returncode}\n{truncate_output(output, 1000)}"
+
+        with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+            reports = list(executor.map(check, tests))
+        return log_info("\n\n".join(reports))
+
+    def replace_in_file(self, file_path: str, old_text: str, new_text: str, replace_all: bool = False) -> str:
+        """
+        Edits a file in the working directory by replacing an exact fragment of its text.
+        Prefer it over rewriting the whole file with write_file when fixing or changing code.
+
+        Args:
+            file_path: Filename in the working directory.
+            old_text: Exact text to replace, including indentation. Add surrounding lines if it is not unique.
+            new_text: Replacement text.
+            replace_all: Replace every occurrence instead of requiring a unique one.
+
+        Returns:
+            A confirmation, or an error explaining why nothing was changed.
+        """
+        print(f"Replace in file: {file_path}")
+        working_dir = os.path.realpath(self.context.working_dir)
+        path = os.path.realpath(os.path.join(working_dir, file_path))
+        if os.path.commonpath([working_dir, path]) != working_dir:
+            return log_error(f"Error: {file_path} is outside of the working directory.")
+        if not os.path.isfile(path):
+            return log_error(f"Error: File '{file_path}' not found. Create it with write_file first.")
+        if not old_text:
+            return log_error("Error: old_text must not be empty.")
+
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+
+        count = content.count(old_text)
+        if count == 0:
+            hint = ""
+            first_line = next((line.strip() for line in old_text.splitlines() if line.strip()), "")
+            matches = [i + 1 for i, line in enumerate(content.splitlines()) if first_line and first_line in line]
+            if matches:
+                hint = f" The first line of old_text occurs at line(s) {matches[:5]}; check indentation and the following lines."
+            return log_error(f"Error: old_text not found in '{file_path}'. Nothing was changed.{hint}")
+        if count > 1 and not replace_all:
+            return log_error(f"Error: old_text occurs {count} times in '{file_path}'. Add surrounding lines to make it unique or set replace_all. Nothing was changed.")
+
+        new_content = content.replace(old_text, new_text) if replace_all else content.replace(old_text, new_text, 1)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(new_content)
+
+        self.context.record_patch_edit(len(new_content), len(old_text) + len(new_text))
+        return log_info(f"Replaced {count if replace_all else 1} occurrence(s) in {file_path}.")
+
     def complain(self, what_is_wrong: str) -> None:
         """
         Reports a critical issue or an unrecoverable error.
@@ -297,6 +637,9 @@ class AocToolbox:
             part: The part number (1 or 2).
             answer: The calculated answer to submit.
 
+        Answers already known to be wrong, or outside the bounds learned from earlier
+        "too high"/"too low" responses, are rejected locally without a submission cooldown.
+
         Returns:
             The server's response message, or a success/failure log message.
             Common responses include "That's the right answer", "That's not the right answer".
@@ -313,6 +656,12 @@ class AocToolbox:
                 self.context.record_incorrect_submission(part)
                 return log_error(f"  Incorrect! Answer {answer} does not match the saved answer.")
 
+        ledger = AnswerLedger(data_path(year, day, f"part_{part}.ledger.json"))
+        known_wrong = ledger.check(str(answer))
+        if known_wrong:
+            self.context.record_incorrect_submission(part)
+            return log_error(f"  Incorrect! Rejected locally without submitting: {known_wrong}. {ledger.describe()}")
+
         try:
             response_text = self.client.submit_answer(year, day, part, answer)
         except Exception as e:
@@ -326,6 +675,11 @@ class AocToolbox:
                     f.write(str(answer).strip())
                 self.context.record_success(part)
                 log_success(f"  Success: Answer {answer} saved and marked as correct.")
+            elif "That's not the right answer" in text:
+                ledger.record_rejection(str(answer), parse_answer_hint(text))
+                self.context.record_incorrect_submission(part)
+                log_error(f"  Incorrect! Response: {text.strip()}")
+                return f"{text}\n{ledger.describe()}"
             else:
                 self.context.record_incorrect_submission(part)
                 log_error(f"  Incorrect! Response: {text.strip()}")
@@ -368,7 +722,13 @@ class AocToolbox:
         tools = [
             self.get_task_statement,
             self.download_puzzle_input,
+            self.get_input_profile,
             self.run_code,
+            self.run_examples,
+            self.profile_code,
+            self.estimate_complexity,
+            self.run_python_cell,
+            self.replace_in_file,
             self.submit_result,
             self.complain,
             self.submit_report
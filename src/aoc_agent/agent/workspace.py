@@ -0,0 +1,131 @@
+"""
+Run workspaces on scratch storage (e.g. tmpfs at /dev/shm) and copy-free input provisioning.
+
+With a scratch root the agent works in <scratch>/<run_id>: compilation output, example and
+coderun directories never touch the persistent disk. The persistent run directory receives
+context.json checkpoints during the run and the artifacts matching KEEP_PATTERNS at the end.
+"""
+import errno
+import fnmatch
+import os
+import shutil
+import stat
+import sys
+import tempfile
+from typing import Callable, List, Optional
+
+# Top-level entries of a workspace that are kept: reports, images, metadata, run log, code and coderun snapshots.
+KEEP_PATTERNS = ["*.md", "*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.webp", "*.json", "*.jsonl",
+                 "*.py", "*.kt", "*.cs", "*.lean", "coderun-*"]
+# Shared input files are staged here once per scratch root and then linked into the workspaces.
+INPUTS_DIR = ".inputs"
+
+FICLONE = 0x40049409
+READ_ONLY = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+WRITE_BITS = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
+
+
+def _reflink(src: str, dst: str) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return True
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+
+def provision_file(src: str, dst: str) -> str:
+    """
+    Makes src available at dst without copying the data when the filesystem allows it.
+
+    Tries a reflink (copy-on-write clone), then a hardlink, then falls back to a copy.
+    A hardlink shares the permissions of src, so it is only used when src is already read-only:
+    a write to dst then cannot corrupt the shared file, and src is never chmodded here.
+    Returns the method used: "reflink", "hardlink" or "copy".
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)
+    if _reflink(src, dst):
+        return "reflink"
+    if not os.stat(src).st_mode & WRITE_BITS:
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+    shutil.copy(src, dst)
+    return "copy"
+
+
+def _publish_read_only(path: str, write: Callable[[str], None]):
+    """
+    Creates a read-only file at path: write(tmp_path) fills a temporary file with a unique name,
+    which is then renamed, so concurrent runs never see a partial file or clash on the temporary one.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".tmp-")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.chmod(tmp_path, READ_ONLY)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def store_input(path: str, text: str):
+    """Stores a downloaded input read-only, so provision_file can hardlink it into the workspaces."""
+    def write(tmp_path: str):
+        with open(tmp_path, "w") as f:
+            f.write(text)
+    _publish_read_only(path, write)
+
+
+def provision_input(src: str, working_dir: str, scratch: bool, name: str = "input.txt") -> str:
+    """
+    Provisions a shared input into a workspace. Links across filesystems are impossible, so a scratch
+    workspace links from a per-scratch-root staged copy that is made once, read-only.
+    """
+    if scratch:
+        staged_dir = os.path.join(os.path.dirname(os.path.abspath(working_dir)), INPUTS_DIR)
+        os.makedirs(staged_dir, exist_ok=True)
+        staged = os.path.join(staged_dir, os.path.abspath(src).replace(os.sep, "_").replace(":", "_"))
+        if not os.path.exists(staged) or os.path.getmtime(staged) < os.path.getmtime(src):
+            # Runs sharing the scratch root may stage the same input at once: each copies to its own temporary file
+            _publish_read_only(staged, lambda tmp_path: shutil.copyfile(src, tmp_path))
+        src = staged
+    return provision_file(src, os.path.join(working_dir, name))
+
+
+def create_scratch_workspace(scratch_root: str, run_id: str) -> str:
+    path = os.path.join(os.path.abspath(scratch_root), run_id)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def flush_workspace(working_dir: str, run_dir: str) -> List[str]:
+    """Copies the kept artifacts from a scratch workspace to the persistent run directory and removes the workspace."""
+    flushed = []
+    for name in sorted(os.listdir(working_dir)):
+        if not any(fnmatch.fnmatch(name, pattern) for pattern in KEEP_PATTERNS):
+            continue
+        src, dst = os.path.join(working_dir, name), os.path.join(run_dir, name)
+        if os.path.isdir(src):
+            shutil.copytree(src, dst, dirs_exist_ok=True)
+        else:
+            shutil.copy2(src, dst)
+        flushed.append(name)
+    shutil.rmtree(working_dir, ignore_errors=True)
+    return flushed
+
+
+def persistent_dir(working_dir: str, run_dir: Optional[str]) -> str:
+    """The directory that outlives the run: run_dir for scratch workspaces, the working dir otherwise."""
+    return run_dir or working_dir
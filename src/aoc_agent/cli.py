@@ -11,8 +11,7 @@ from typing import Literal
 
 from dotenv import load_dotenv
 
-from aoc_agent.agent.report_builder import ReportBuilder
-from .agent.agent_runner import AgentRunner
+from .core.runners import available_languages
 
 print(os.environ.get("AOC_SESSION"))
 load_dotenv()
@@ -43,7 +42,7 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         nargs="+",
         required=False,
         default=["python"],
-        choices=["python", "kotlin", "csharp", "lean4"],
+        choices=available_languages(),
         help="Languages to use for generated solutions",
     )
     parser.add_argument(
@@ -57,7 +56,86 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         "--repeats",
         type=int,
         default=1,
-        help="Number of repeats for each combination",
+        help="Number of completed runs wanted for each combination (runs stopped by a budget do not count)",
+    )
+    parser.add_argument(
+        "--fallback-models",
+        type=str,
+        nargs="+",
+        default=[],
+        help="Models to fall back to, in order, when the requested model keeps failing",
+    )
+    parser.add_argument(
+        "--llm-timeout",
+        type=float,
+        default=300.0,
+        help="Timeout in seconds for a single LLM call (default: 300)",
+    )
+    parser.add_argument(
+        "--llm-retries",
+        type=int,
+        default=4,
+        help="Retries with exponential backoff on rate limits (429) and server errors (5xx) (default: 4)",
+    )
+    parser.add_argument(
+        "--hedge-after",
+        type=float,
+        required=False,
+        help="Send a duplicate LLM request if the first one has not answered after this many seconds",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=4,
+        help="Max concurrent LLM requests per model (default: 4)",
+    )
+    parser.add_argument(
+        "--max-run-time",
+        type=float,
+        required=False,
+        help="Wall-clock budget in seconds for a whole run",
+    )
+    parser.add_argument(
+        "--max-run-tokens",
+        type=int,
+        required=False,
+        help="Output token budget for a whole run",
+    )
+    parser.add_argument(
+        "--max-run-steps",
+        type=int,
+        required=False,
+        help="Agent step budget for a whole run",
+    )
+    parser.add_argument(
+        "--max-run-run-code",
+        type=int,
+        required=False,
+        help="Code execution budget for a whole run (calls of run_code, run_examples, profile_code, estimate_complexity and run_python_cell)",
+    )
+    parser.add_argument(
+        "--max-part-time",
+        type=float,
+        required=False,
+        help="Wall-clock budget in seconds for each part of a run",
+    )
+    parser.add_argument(
+        "--max-part-tokens",
+        type=int,
+        required=False,
+        help="Output token budget for each part of a run",
+    )
+    parser.add_argument(
+        "--max-part-steps",
+        type=int,
+        required=False,
+        help="Agent step budget for each part of a run",
+    )
+    parser.add_argument(
+        "--max-part-run-code",
+        type=int,
+        required=False,
+        help="Code execution budget for each part of a run (same tools as --max-run-run-code)",
     )
     parser.add_argument(
         "--no-report",
@@ -77,6 +155,53 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         default=False,
         help="Publish the website after the run is finished",
     )
+    parser.add_argument(
+        "--scratch-dir",
+        type=str,
+        default=os.environ.get("AOC_SCRATCH_DIR"),
+        help="Run each case in a workspace under this directory (e.g. tmpfs at /dev/shm/aoc-agent) and copy only "
+             "reports, images, metadata, the run log and code snapshots to data/run at the end",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        default=False,
+        help="Print the sweep plan (runs still missing, longest expected first) and exit",
+    )
+    parser.add_argument(
+        "--resume-incomplete",
+        action="store_true",
+        default=False,
+        help="Resume every run in data/run that has a checkpoint but no metadata.json",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    resume_parser = subparsers.add_parser("resume", help="Continue interrupted runs from their last checkpoint")
+    resume_parser.add_argument("run_ids", type=str, nargs="+", help="Run ids (directory names in data/run)")
+    archive_parser = subparsers.add_parser(
+        "archive", help="Pack completed runs into compressed archives, keeping only metadata.json in data/run"
+    )
+    archive_parser.add_argument(
+        "--older-than",
+        type=float,
+        default=30,
+        help="Archive completed runs started more than this many days ago (default: 30)",
+    )
+    inspect_parser = subparsers.add_parser("inspect", help="Print a compact timeline of a run's history")
+    inspect_parser.add_argument("run_id", type=str, help="Run id (directory name in data/run, archived runs too) or a run directory")
+    inspect_parser.add_argument("--steps", type=str, default=None, help="Only steps N..M (also N.., ..M or N)")
+    inspect_parser.add_argument(
+        "--tool-calls", action="store_true", default=False, help="Only tool calls and their results"
+    )
+    inspect_parser.add_argument(
+        "--run-code-failures", action="store_true", default=False, help="Only failed run_code results"
+    )
+    runners_parser = subparsers.add_parser("runners", help="List the available language runners")
+    runners_parser.add_argument(
+        "--check",
+        action="store_true",
+        default=False,
+        help="Re-probe toolchain versions and check that the required executables are installed",
+    )
     return parser.parse_args(argv)
 
 
@@ -100,22 +225,84 @@ def wait_for_start_time(start_time_str: str) -> None:
     time.sleep(wait_seconds)
 
 
+def list_runners(check: bool) -> int:
+    from .core.runners import get_runner
+    from .core.runners.base import clear_probe_cache
+
+    if check:
+        clear_probe_cache()
+    status = 0
+    for lang in available_languages():
+        try:
+            runner = get_runner(lang)
+        except ValueError as e:
+            print(f"{lang}: {e}")
+            status = 1
+            continue
+        if runner is None:
+            continue
+        print(f"{lang}: {type(runner).__name__}")
+        if not check:
+            continue
+        print(f"  version: {runner.get_version_info()}")
+        for exe, path in runner.check().items():
+            print(f"  {exe}: {path or 'NOT FOUND'}")
+            if path is None:
+                status = 1
+    return status
+
+
 def main(argv: list[str] | None = None) -> int:
     ns = parse_args(argv)
+    if ns.command == "runners":
+        return list_runners(ns.check)
+    if ns.command == "archive":
+        from .agent.run_archive import archive_command
+        return archive_command(os.path.join("data", "run"), ns.older_than)
+    if ns.command == "inspect":
+        from .agent.history import inspect_command
+        return inspect_command(os.path.join("data", "run"), ns.run_id, ns.steps, ns.tool_calls, ns.run_code_failures)
     if ns.start_time:
         wait_for_start_time(ns.start_time)
 
-    if ns.days:
+    resume = ns.command == "resume" or ns.resume_incomplete
+    if ns.days or resume:
+        # The agent stack pulls in langchain and every provider SDK; only pay for it when runs are requested.
+        from .agent.agent_runner import AgentRunner
+        from .agent.context import Budget
+        from .core.llm_routing import RoutingPolicy
+
         models = [MODEL_ALIASES.get(m, m) for m in ns.models]
+        routing = RoutingPolicy(
+            timeout=ns.llm_timeout,
+            max_retries=ns.llm_retries,
+            hedge_after=ns.hedge_after,
+            max_concurrency=ns.max_concurrency,
+            fallback_models=[MODEL_ALIASES.get(m, m) for m in ns.fallback_models],
+        )
         runner = AgentRunner(
             year=ns.year,
-            days_region=ns.days,
+            days_region=ns.days or "",
             languages=ns.langs,
             models=models,
             n_repeats=ns.repeats,
             no_report=ns.no_report,
+            routing=routing,
+            dry_run=ns.dry_run,
+            run_budget=Budget(ns.max_run_time, ns.max_run_tokens, ns.max_run_steps, ns.max_run_run_code),
+            part_budget=Budget(ns.max_part_time, ns.max_part_tokens, ns.max_part_steps, ns.max_part_run_code),
+            scratch_dir=ns.scratch_dir,
         )
-        runner.run()
+        if ns.dry_run:
+            runner.run()
+            return 0
+        if resume:
+            run_ids = ns.run_ids if ns.command == "resume" else AgentRunner.find_incomplete_runs()
+            runner.resume(run_ids)
+        if ns.days:
+            runner.run()
+
+    from .agent.report_builder import ReportBuilder
     ReportBuilder().build_report()
 
     if ns.publish:
@@ -0,0 +1,87 @@
+import json
+import os
+from typing import Optional
+
+from .runners.base import cache_lock
+
+
+def _as_int(answer: str) -> Optional[int]:
+    try:
+        return int(answer)
+    except ValueError:
+        return None
+
+
+class AnswerLedger:
+    """
+    Rejected answers of one (year, day, part), shared by all runs through a JSON file.
+
+    Besides the rejected answers themselves, keeps the bounds inferred from
+    "your answer is too high/too low" responses: a correct answer is > lower and < upper.
+    Concurrent runs on the same day record their rejections into the file under a lock,
+    merged with whatever the others recorded meanwhile.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rejected: list[str] = []
+        self.lower: Optional[int] = None
+        self.upper: Optional[int] = None
+        self._load()
+
+    def _load(self):
+        """Merges the file into this ledger: union of rejected answers, tightest bounds."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for answer in data.get("rejected", []):
+            if answer not in self.rejected:
+                self.rejected.append(answer)
+        self._narrow(data.get("lower"), "low")
+        self._narrow(data.get("upper"), "high")
+
+    def _narrow(self, value: Optional[int], hint: Optional[str]):
+        if value is None:
+            return
+        if hint == "low" and (self.lower is None or value > self.lower):
+            self.lower = value
+        elif hint == "high" and (self.upper is None or value < self.upper):
+            self.upper = value
+
+    def check(self, answer: str) -> Optional[str]:
+        """Returns why the answer is known to be wrong, or None if it is worth submitting."""
+        answer = answer.strip()
+        if answer in self.rejected:
+            return f"answer {answer} was already rejected"
+        value = _as_int(answer)
+        if value is not None:
+            if self.lower is not None and value <= self.lower:
+                return f"answer {answer} is too low: {self.lower} was already too low"
+            if self.upper is not None and value >= self.upper:
+                return f"answer {answer} is too high: {self.upper} was already too high"
+        return None
+
+    def record_rejection(self, answer: str, hint: Optional[str]):
+        answer = answer.strip()
+        # Read-merge-write, so a rejection recorded by another run since this ledger was read is kept
+        with cache_lock(os.path.dirname(os.path.abspath(self.path))):
+            self._load()
+            if answer not in self.rejected:
+                self.rejected.append(answer)
+            self._narrow(_as_int(answer), hint)
+            self._save()
+
+    def describe(self) -> str:
+        bounds = []
+        if self.lower is not None:
+            bounds.append(f"> {self.lower}")
+        if self.upper is not None:
+            bounds.append(f"< {self.upper}")
+        return f"Known wrong answers: {', '.join(self.rejected) or '-'}; correct answer must be {' and '.join(bounds) or 'anything else'}."
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"rejected": self.rejected, "lower": self.lower, "upper": self.upper}, f, indent=2)
+        os.replace(tmp_path, self.path)
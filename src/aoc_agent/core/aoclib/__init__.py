@@ -0,0 +1,45 @@
+"""
+aoclib: a versioned helper library for generated solutions (parsing, grids, BFS, Dijkstra,
+union-find, interval merging), shipped as one source pack per language and linked by the runners.
+The Python pack adds NumPy grid and interval primitives, compiled with numba when it is installed.
+
+Set AOC_HELPER_LIB=0 to run solutions without it.
+"""
+import os
+from typing import Optional
+
+AOCLIB_VERSION = "1.1.0"
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+SOURCES = {
+    "python": os.path.join(_ROOT, "python", "aoclib.py"),
+    "kotlin": os.path.join(_ROOT, "kotlin", "AocLib.kt"),
+    "csharp": os.path.join(_ROOT, "csharp", "AocLib.cs"),
+}
+
+USAGE = {
+    "python": "`import aoclib`: read_input, ints, lines, blocks, grid, np_grid, find, "
+              "DIRS4/DIRS8, neighbors4/8, bfs, dijkstra, UnionFind, merge_intervals, njit (numba.njit if installed); "
+              "NumPy arrays: grid_bfs, grid_dijkstra (numba-compiled if installed), count_neighbors, merge_intervals_np",
+    "kotlin": "`import aoclib.*`: readInput, String.ints/longs/blocks/toGrid, Grid, Pos with neighbors4/8, "
+              "DIRS4/DIRS8, bfs, dijkstra, UnionFind, mergeIntervals",
+    "csharp": "`using AocLib;`: Aoc.ReadInput/Ints/Longs/Blocks/Bfs/Dijkstra/MergeIntervals, Aoc.Dirs4/Dirs8, "
+              "Grid, Pos with Neighbors4/8, UnionFind<T>",
+}
+
+
+def enabled() -> bool:
+    return os.environ.get("AOC_HELPER_LIB", "1").lower() not in ("0", "false", "no")
+
+
+def source_path(lang: str) -> Optional[str]:
+    """Path of the source pack for the language, or None if the library is disabled or not available for it."""
+    return SOURCES.get(lang) if enabled() else None
+
+
+def describe(lang: str) -> str:
+    """The line runners append to their version info so the model knows the library exists."""
+    if source_path(lang) is None:
+        return ""
+    return f"Helper library aoclib {AOCLIB_VERSION} is available, use it instead of re-implementing the basics: {USAGE[lang]}"
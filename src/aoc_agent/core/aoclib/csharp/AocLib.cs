@@ -0,0 +1,155 @@
+// aoclib: helpers for Advent of Code solutions. Use with `using AocLib;`.
+using System.Text.RegularExpressions;
+
+namespace AocLib;
+
+public readonly record struct Pos(int R, int C)
+{
+    public static Pos operator +(Pos a, Pos b) => new(a.R + b.R, a.C + b.C);
+    public IEnumerable<Pos> Neighbors4()
+    {
+        var self = this;
+        return Aoc.Dirs4.Select(d => self + d);
+    }
+
+    public IEnumerable<Pos> Neighbors8()
+    {
+        var self = this;
+        return Aoc.Dirs8.Select(d => self + d);
+    }
+}
+
+public sealed class Grid
+{
+    public readonly string[] Rows;
+    public int Height => Rows.Length;
+    public int Width => Rows.Length == 0 ? 0 : Rows[0].Length;
+
+    public Grid(string text) =>
+        Rows = text.Split('\n').Select(r => r.TrimEnd('\r')).Where(r => r.Length > 0).ToArray();
+
+    public bool Contains(Pos p) => p.R >= 0 && p.R < Rows.Length && p.C >= 0 && p.C < Rows[p.R].Length;
+    public char this[Pos p] => Rows[p.R][p.C];
+    public char? GetOrNull(Pos p) => Contains(p) ? this[p] : null;
+
+    public IEnumerable<Pos> Positions()
+    {
+        for (var r = 0; r < Rows.Length; r++)
+            for (var c = 0; c < Rows[r].Length; c++)
+                yield return new Pos(r, c);
+    }
+
+    public List<Pos> Find(char ch) => Positions().Where(p => this[p] == ch).ToList();
+}
+
+public static partial class Aoc
+{
+    public const string Version = "1.1.0";
+
+    public static readonly Pos[] Dirs4 = { new(-1, 0), new(0, 1), new(1, 0), new(0, -1) };
+    public static readonly Pos[] Dirs8 = Dirs4.Concat(new Pos[] { new(-1, -1), new(-1, 1), new(1, 1), new(1, -1) }).ToArray();
+
+    // A dash is a minus sign only when it does not follow a word character: "2-4" is a range
+    [GeneratedRegex(@"(?:(?<!\w)-)?\d+")]
+    private static partial Regex IntRegex();
+
+    public static string ReadInput(string path = "input.txt") => File.ReadAllText(path).TrimEnd('\n', '\r');
+
+    public static List<long> Longs(string text) => IntRegex().Matches(text).Select(m => long.Parse(m.Value)).ToList();
+
+    public static List<int> Ints(string text) => IntRegex().Matches(text).Select(m => int.Parse(m.Value)).ToList();
+
+    public static List<string> Blocks(string text) =>
+        Regex.Split(text.Replace("\r\n", "\n"), "\n\n").Where(b => !string.IsNullOrWhiteSpace(b)).ToList();
+
+    /// <summary>Breadth-first distances from start; stops once a node satisfying goal is reached (it is included).</summary>
+    public static Dictionary<T, int> Bfs<T>(T start, Func<T, IEnumerable<T>> neighbors, Func<T, bool>? goal = null) where T : notnull
+    {
+        var dist = new Dictionary<T, int> { [start] = 0 };
+        var queue = new Queue<T>();
+        queue.Enqueue(start);
+        while (queue.Count > 0)
+        {
+            var node = queue.Dequeue();
+            if (goal != null && goal(node)) break;
+            foreach (var next in neighbors(node))
+            {
+                if (dist.TryAdd(next, dist[node] + 1)) queue.Enqueue(next);
+            }
+        }
+        return dist;
+    }
+
+    /// <summary>Shortest distances from start; edges(node) yields (neighbor, cost). Stops when a goal node is dequeued.</summary>
+    public static Dictionary<T, long> Dijkstra<T>(T start, Func<T, IEnumerable<(T Node, long Cost)>> edges, Func<T, bool>? goal = null) where T : notnull
+    {
+        var dist = new Dictionary<T, long> { [start] = 0 };
+        var heap = new PriorityQueue<T, long>();
+        heap.Enqueue(start, 0);
+        while (heap.TryDequeue(out var node, out var d))
+        {
+            if (d > dist[node]) continue;
+            if (goal != null && goal(node)) break;
+            foreach (var (next, cost) in edges(node))
+            {
+                var nd = d + cost;
+                if (!dist.TryGetValue(next, out var old) || nd < old)
+                {
+                    dist[next] = nd;
+                    heap.Enqueue(next, nd);
+                }
+            }
+        }
+        return dist;
+    }
+
+    /// <summary>Merges inclusive [Lo, Hi] intervals; with touching = true adjacent intervals are merged too.</summary>
+    public static List<(long Lo, long Hi)> MergeIntervals(IEnumerable<(long Lo, long Hi)> intervals, bool touching = true)
+    {
+        var gap = touching ? 1 : 0;
+        var merged = new List<(long Lo, long Hi)>();
+        foreach (var (lo, hi) in intervals.OrderBy(i => i.Lo))
+        {
+            if (merged.Count > 0 && lo <= merged[^1].Hi + gap)
+                merged[^1] = (merged[^1].Lo, Math.Max(merged[^1].Hi, hi));
+            else
+                merged.Add((lo, hi));
+        }
+        return merged;
+    }
+}
+
+/// <summary>Disjoint sets over arbitrary items, with path compression and union by size.</summary>
+public sealed class UnionFind<T> where T : notnull
+{
+    private readonly Dictionary<T, T> _parent = new();
+    private readonly Dictionary<T, int> _size = new();
+
+    public T Find(T item)
+    {
+        if (_parent.TryAdd(item, item)) _size[item] = 1;
+        var root = item;
+        while (!_parent[root].Equals(root)) root = _parent[root];
+        while (!item.Equals(root))
+        {
+            var next = _parent[item];
+            _parent[item] = root;
+            item = next;
+        }
+        return root;
+    }
+
+    /// <summary>Merges the sets of a and b; returns false if they were already joined.</summary>
+    public bool Union(T a, T b)
+    {
+        var ra = Find(a);
+        var rb = Find(b);
+        if (ra.Equals(rb)) return false;
+        if (_size[ra] < _size[rb]) (ra, rb) = (rb, ra);
+        _parent[rb] = ra;
+        _size[ra] += _size[rb];
+        return true;
+    }
+
+    public List<List<T>> Groups() => _parent.Keys.ToList().GroupBy(Find).Select(g => g.ToList()).ToList();
+}
@@ -0,0 +1,129 @@
+// aoclib: helpers for Advent of Code solutions. Use with `import aoclib.*`.
+package aoclib
+
+import java.io.File
+import java.util.ArrayDeque
+import java.util.PriorityQueue
+
+const val AOCLIB_VERSION = "1.1.0"
+
+data class Pos(val r: Int, val c: Int) {
+    operator fun plus(o: Pos) = Pos(r + o.r, c + o.c)
+    fun neighbors4(): List<Pos> = DIRS4.map { this + it }
+    fun neighbors8(): List<Pos> = DIRS8.map { this + it }
+}
+
+val DIRS4 = listOf(Pos(-1, 0), Pos(0, 1), Pos(1, 0), Pos(0, -1))
+val DIRS8 = DIRS4 + listOf(Pos(-1, -1), Pos(-1, 1), Pos(1, 1), Pos(1, -1))
+
+// A dash is a minus sign only when it does not follow a word character: "2-4" is a range
+private val INT_RE = Regex("(?:(?<!\\w)-)?\\d+")
+
+fun readInput(path: String = "input.txt"): String = File(path).readText().trimEnd('\n', '\r')
+
+fun String.ints(): List<Int> = INT_RE.findAll(this).map { it.value.toInt() }.toList()
+
+fun String.longs(): List<Long> = INT_RE.findAll(this).map { it.value.toLong() }.toList()
+
+fun String.blocks(): List<String> = split(Regex("\\r?\\n\\r?\\n")).filter { it.isNotBlank() }
+
+class Grid(val rows: List<String>) {
+    val height = rows.size
+    val width = if (rows.isEmpty()) 0 else rows[0].length
+    operator fun contains(p: Pos) = p.r in 0 until height && p.c in 0 until rows[p.r].length
+    operator fun get(p: Pos): Char = rows[p.r][p.c]
+    fun getOrNull(p: Pos): Char? = if (p in this) this[p] else null
+    fun positions(): Sequence<Pos> = sequence { for (r in 0 until height) for (c in 0 until rows[r].length) yield(Pos(r, c)) }
+    fun find(ch: Char): List<Pos> = positions().filter { this[it] == ch }.toList()
+}
+
+fun String.toGrid(): Grid = Grid(lines().filter { it.isNotEmpty() })
+
+/** Breadth-first distances from start; stops once a node satisfying goal is reached (it is included). */
+fun <T> bfs(start: T, neighbors: (T) -> Iterable<T>, goal: ((T) -> Boolean)? = null): Map<T, Int> {
+    val dist = hashMapOf(start to 0)
+    val queue = ArrayDeque<T>()
+    queue.add(start)
+    while (queue.isNotEmpty()) {
+        val node = queue.poll()
+        if (goal != null && goal(node)) break
+        val d = dist.getValue(node)
+        for (next in neighbors(node)) {
+            if (next !in dist) {
+                dist[next] = d + 1
+                queue.add(next)
+            }
+        }
+    }
+    return dist
+}
+
+/** Shortest distances from start; edges(node) returns (neighbor, cost) pairs. Stops when a goal node is popped. */
+fun <T> dijkstra(start: T, edges: (T) -> Iterable<Pair<T, Long>>, goal: ((T) -> Boolean)? = null): Map<T, Long> {
+    val dist = hashMapOf(start to 0L)
+    val heap = PriorityQueue<Pair<Long, T>>(compareBy { it.first })
+    heap.add(0L to start)
+    while (heap.isNotEmpty()) {
+        val (d, node) = heap.poll()
+        if (d > dist.getValue(node)) continue
+        if (goal != null && goal(node)) break
+        for ((next, cost) in edges(node)) {
+            val nd = d + cost
+            if (nd < (dist[next] ?: Long.MAX_VALUE)) {
+                dist[next] = nd
+                heap.add(nd to next)
+            }
+        }
+    }
+    return dist
+}
+
+/** Disjoint sets over arbitrary items, with path compression and union by size. */
+class UnionFind<T> {
+    private val parent = HashMap<T, T>()
+    private val size = HashMap<T, Int>()
+
+    fun find(item: T): T {
+        if (item !in parent) {
+            parent[item] = item
+            size[item] = 1
+        }
+        var root = item
+        while (parent.getValue(root) != root) root = parent.getValue(root)
+        var cur = item
+        while (cur != root) {
+            val next = parent.getValue(cur)
+            parent[cur] = root
+            cur = next
+        }
+        return root
+    }
+
+    /** Merges the sets of a and b; returns false if they were already joined. */
+    fun union(a: T, b: T): Boolean {
+        var ra = find(a)
+        var rb = find(b)
+        if (ra == rb) return false
+        if (size.getValue(ra) < size.getValue(rb)) ra = rb.also { rb = ra }
+        parent[rb] = ra
+        size[ra] = size.getValue(ra) + size.getValue(rb)
+        return true
+    }
+
+    fun groups(): Collection<List<T>> = parent.keys.groupBy { find(it) }.values
+}
+
+/** Merges inclusive [first, last] ranges; with touching = true adjacent ranges are merged too. */
+fun mergeIntervals(intervals: Iterable<LongRange>, touching: Boolean = true): List<LongRange> {
+    val gap = if (touching) 1 else 0
+    val merged = mutableListOf<LongRange>()
+    for (range in intervals.sortedBy { it.first }) {
+        val last = merged.lastOrNull()
+        if (last != null && range.first <= last.last + gap) {
+            merged[merged.size - 1] = last.first..maxOf(last.last, range.last)
+        } else {
+            merged.add(range)
+        }
+    }
+    return merged
+}
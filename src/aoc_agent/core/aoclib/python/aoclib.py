@@ -0,0 +1,283 @@
+"""
+aoclib: helpers for Advent of Code solutions.
+
+Parsing: read_input, ints, lines, blocks, grid, np_grid
+Grids: DIRS4, DIRS8, neighbors4, neighbors8, find
+Graphs: bfs, dijkstra, UnionFind
+Intervals: merge_intervals
+NumPy grids: grid_bfs, grid_dijkstra, count_neighbors
+NumPy intervals: merge_intervals_np
+Decorators: njit (numba.njit when numba is installed, a no-op otherwise)
+
+The NumPy helpers work on whole arrays (np_grid(text) == "#" gives a wall mask) and need NumPy;
+grid_dijkstra is compiled with numba when it is installed. Everything else is plain Python.
+"""
+import heapq
+import re
+from collections import deque
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+__version__ = "1.1.0"
+
+T = TypeVar("T", bound=Hashable)
+Pos = Tuple[int, int]
+
+DIRS4: List[Pos] = [(-1, 0), (0, 1), (1, 0), (0, -1)]
+DIRS8: List[Pos] = DIRS4 + [(-1, -1), (-1, 1), (1, 1), (1, -1)]
+
+# A dash is a minus sign only when it does not follow a word character: "2-4" is a range
+_INT_RE = re.compile(r"(?:(?<!\w)-)?\d+")
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit: returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda f: f
+
+
+def read_input(path: str = "input.txt") -> str:
+    """Reads the input without the trailing newline."""
+    with open(path) as f:
+        return f.read().rstrip("\n")
+
+
+def ints(text: str) -> List[int]:
+    """All integers in the text, including negative ones."""
+    return [int(x) for x in _INT_RE.findall(text)]
+
+
+def lines(text: str) -> List[str]:
+    return text.splitlines()
+
+
+def blocks(text: str) -> List[str]:
+    """Blank-line separated sections."""
+    return [b for b in text.split("\n\n") if b.strip()]
+
+
+def grid(text: str) -> Dict[Pos, str]:
+    """Character grid as {(row, col): char}; out-of-range lookups can use .get()."""
+    return {(r, c): ch for r, row in enumerate(text.splitlines()) for c, ch in enumerate(row)}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("this aoclib helper requires NumPy")
+
+
+def np_grid(text: str):
+    """Character grid as a 2D NumPy array of single characters (requires NumPy)."""
+    _require_numpy()
+    return np.array([list(row) for row in text.splitlines()])
+
+
+def find(g: Dict[Pos, str], ch: str) -> List[Pos]:
+    """Positions of a character in a grid()."""
+    return [p for p, v in g.items() if v == ch]
+
+
+def neighbors4(pos: Pos) -> Iterator[Pos]:
+    r, c = pos
+    for dr, dc in DIRS4:
+        yield r + dr, c + dc
+
+
+def neighbors8(pos: Pos) -> Iterator[Pos]:
+    r, c = pos
+    for dr, dc in DIRS8:
+        yield r + dr, c + dc
+
+
+def bfs(start: T, neighbors: Callable[[T], Iterable[T]], goal: Optional[Callable[[T], bool]] = None) -> Dict[T, int]:
+    """
+    Breadth-first distances from start. Stops as soon as a node satisfying goal is reached;
+    the returned dict then contains that node.
+    """
+    dist = {start: 0}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        if goal is not None and goal(node):
+            break
+        for nxt in neighbors(node):
+            if nxt not in dist:
+                dist[nxt] = dist[node] + 1
+                queue.append(nxt)
+    return dist
+
+
+def dijkstra(start: T, edges: Callable[[T], Iterable[Tuple[T, int]]], goal: Optional[Callable[[T], bool]] = None) -> Tuple[Dict[T, int], Dict[T, T]]:
+    """
+    Shortest distances and predecessors from start; edges(node) yields (neighbor, cost).
+    Stops when a node satisfying goal is popped.
+    """
+    dist = {start: 0}
+    prev: Dict[T, T] = {}
+    heap = [(0, 0, start)]
+    counter = 1  # tie breaker, nodes need not be comparable
+    while heap:
+        d, _, node = heapq.heappop(heap)
+        if d > dist.get(node, d):
+            continue
+        if goal is not None and goal(node):
+            break
+        for nxt, cost in edges(node):
+            nd = d + cost
+            if nd < dist.get(nxt, nd + 1):
+                dist[nxt] = nd
+                prev[nxt] = node
+                heapq.heappush(heap, (nd, counter, nxt))
+                counter += 1
+    return dist, prev
+
+
+class UnionFind:
+    """Disjoint sets over arbitrary hashable items, with path compression and union by size."""
+
+    def __init__(self, items: Iterable[Hashable] = ()):
+        self.parent: Dict[Hashable, Hashable] = {}
+        self.size: Dict[Hashable, int] = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item: Hashable):
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+
+    def find(self, item: Hashable) -> Hashable:
+        self.add(item)
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a: Hashable, b: Hashable) -> bool:
+        """Merges the sets of a and b; returns False if they were already joined."""
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return True
+
+    def groups(self) -> List[List[Hashable]]:
+        result: Dict[Hashable, List[Hashable]] = {}
+        for item in self.parent:
+            result.setdefault(self.find(item), []).append(item)
+        return list(result.values())
+
+
+def merge_intervals(intervals: Iterable[Sequence[int]], touching: bool = True) -> List[Tuple[int, int]]:
+    """
+    Merges inclusive [lo, hi] intervals. With touching=True adjacent intervals ([1, 2] and [3, 4]) are merged too.
+    """
+    merged: List[Tuple[int, int]] = []
+    gap = 1 if touching else 0
+    for lo, hi in sorted((i[0], i[1]) for i in intervals):
+        if merged and lo <= merged[-1][1] + gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def grid_bfs(passable, start: Pos):
+    """
+    4-connected BFS distances on a boolean grid of passable cells, as an int array (-1 = unreachable).
+    Expands the whole frontier per step with array shifts instead of one cell at a time.
+    """
+    _require_numpy()
+    passable = np.asarray(passable, dtype=bool)
+    dist = np.full(passable.shape, -1, dtype=np.int64)
+    dist[start] = 0
+    frontier = np.zeros_like(passable)
+    frontier[start] = True
+    step = 0
+    while frontier.any():
+        step += 1
+        reached = np.zeros_like(frontier)
+        reached[1:, :] |= frontier[:-1, :]
+        reached[:-1, :] |= frontier[1:, :]
+        reached[:, 1:] |= frontier[:, :-1]
+        reached[:, :-1] |= frontier[:, 1:]
+        reached &= passable & (dist < 0)
+        dist[reached] = step
+        frontier = reached
+    return dist
+
+
+@njit(cache=False)
+def _grid_dijkstra(costs, start_row, start_col):
+    rows, cols = costs.shape
+    dist = np.full((rows, cols), -1, dtype=np.int64)
+    done = np.zeros((rows, cols), dtype=np.bool_)
+    dist[start_row, start_col] = 0
+    heap = [(np.int64(0), np.int64(start_row), np.int64(start_col))]
+    while heap:
+        d, r, c = heapq.heappop(heap)
+        if done[r, c]:
+            continue
+        done[r, c] = True
+        for dr, dc in ((-1, 0), (0, 1), (1, 0), (0, -1)):
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < rows and 0 <= nc < cols and costs[nr, nc] >= 0 and not done[nr, nc]:
+                nd = d + costs[nr, nc]
+                if dist[nr, nc] < 0 or nd < dist[nr, nc]:
+                    dist[nr, nc] = nd
+                    heapq.heappush(heap, (nd, nr, nc))
+    return dist
+
+
+def grid_dijkstra(costs, start: Pos):
+    """
+    4-connected shortest distances on an int grid where entering a cell costs costs[r, c]
+    (negative = wall), as an int array (-1 = unreachable). Compiled with numba when installed.
+    """
+    _require_numpy()
+    return _grid_dijkstra(np.asarray(costs, dtype=np.int64), start[0], start[1])
+
+
+def count_neighbors(mask, diagonal: bool = True):
+    """Number of True neighbors of every cell of a boolean grid (8 with diagonal, else 4), e.g. for cellular automata."""
+    _require_numpy()
+    mask = np.asarray(mask, dtype=np.int64)
+    padded = np.pad(mask, 1)
+    rows, cols = mask.shape
+    counts = np.zeros_like(mask)
+    for dr, dc in (DIRS8 if diagonal else DIRS4):
+        counts += padded[1 + dr:1 + dr + rows, 1 + dc:1 + dc + cols]
+    return counts
+
+
+def merge_intervals_np(starts, ends, touching: bool = True):
+    """
+    Vectorized merge_intervals for many inclusive [start, end] intervals given as two arrays;
+    returns the merged (starts, ends) arrays, sorted.
+    """
+    _require_numpy()
+    starts, ends = np.asarray(starts), np.asarray(ends)
+    if starts.size == 0:
+        return starts.copy(), ends.copy()
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    # Furthest end seen so far: an interval opens a new group when it starts beyond it
+    reach = np.maximum.accumulate(ends)
+    opens = np.empty(starts.size, dtype=bool)
+    opens[0] = True
+    opens[1:] = starts[1:] > reach[:-1] + (1 if touching else 0)
+    first = np.flatnonzero(opens)
+    last = np.append(first[1:] - 1, starts.size - 1)
+    return starts[first], reach[last]
@@ -0,0 +1,94 @@
+import math
+from typing import List, Literal, Optional, Tuple
+
+ShrinkStrategy = Literal["auto", "lines", "grid", "records"]
+
+# Shares of the full input the solution is timed on.
+FRACTIONS = [1 / 32, 1 / 16, 1 / 8, 1 / 4]
+# Seconds one scaled-down run may take, and all of them together: a run that needs more is not worth waiting for.
+RUN_BUDGET = 5.0
+TOTAL_BUDGET = 15.0
+# Runs faster than this are dominated by startup and measurement noise.
+MIN_SIGNIFICANT_TIME = 0.05
+
+
+def detect_strategy(text: str) -> str:
+    """Picks how to shrink an input: sub-grids for grids, whole records for blank-line separated blocks, else lines."""
+    lines = text.splitlines()
+    blocks = [b for b in text.split("\n\n") if b.strip()]
+    if len(blocks) > 4:
+        return "records"
+    if len(lines) > 1 and len({len(line) for line in lines}) == 1 and " " not in text:
+        return "grid"
+    return "lines"
+
+
+def input_size(text: str, strategy: str) -> int:
+    """Size of an input in the unit the strategy shrinks: lines, grid cells or records."""
+    lines = text.splitlines()
+    if strategy == "grid":
+        return len(lines) * (len(lines[0]) if lines else 0)
+    if strategy == "records":
+        return len([b for b in text.split("\n\n") if b.strip()])
+    return len(lines)
+
+
+def shrink_input(text: str, strategy: str, fraction: float) -> str:
+    """Returns roughly `fraction` of the input, keeping its structure (a top-left sub-grid, the first records or lines)."""
+    lines = text.splitlines()
+    if strategy == "grid":
+        scale = math.sqrt(fraction)
+        rows = max(1, round(len(lines) * scale))
+        cols = max(1, round(len(lines[0]) * scale)) if lines else 0
+        return "\n".join(line[:cols] for line in lines[:rows]) + "\n"
+    if strategy == "records":
+        blocks = [b.strip("\n") for b in text.split("\n\n") if b.strip()]
+        return "\n\n".join(blocks[:max(1, round(len(blocks) * fraction))]) + "\n"
+    return "\n".join(lines[:max(1, round(len(lines) * fraction))]) + "\n"
+
+
+def _linear_fit(xs: List[float], ys: List[float]) -> Tuple[float, float, float]:
+    """Least squares y = a + b*x; returns (a, b, residual sum of squares)."""
+    n = len(xs)
+    mean_x, mean_y = sum(xs) / n, sum(ys) / n
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    b = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x if var_x else 0.0
+    a = mean_y - b * mean_x
+    return a, b, sum((y - a - b * x) ** 2 for x, y in zip(xs, ys))
+
+
+def _complexity_label(exponent: float) -> str:
+    if exponent < 0.3:
+        return "O(1) in the input size (time is dominated by constant work)"
+    if exponent < 1.3:
+        return "about O(n) or O(n log n)"
+    if exponent < 2.3:
+        return "about O(n^2)"
+    if exponent < 3.3:
+        return "about O(n^3)"
+    return f"about O(n^{exponent:.1f}) or worse"
+
+
+def estimate_growth(points: List[Tuple[int, float]], full_size: int) -> Optional[Tuple[str, float]]:
+    """
+    Fits run time against input size and projects the run time on the full input.
+
+    Both a power law (log t = a + k log n) and an exponential (log t = a + b n) are fitted on the
+    measurements above the noise floor; returns (description, projected seconds) or None
+    when there are not enough significant measurements.
+    """
+    significant = [(n, t) for n, t in points if t >= MIN_SIGNIFICANT_TIME and n > 0]
+    if len({n for n, _ in significant}) < 2:
+        return None
+    log_ts = [math.log(t) for _, t in significant]
+
+    a, k, power_rss = _linear_fit([math.log(n) for n, _ in significant], log_ts)
+    description = _complexity_label(k)
+    projected = math.exp(a + k * math.log(full_size))
+
+    if len(significant) >= 3 and k > 3:
+        ea, eb, exp_rss = _linear_fit([float(n) for n, _ in significant], log_ts)
+        if exp_rss < power_rss / 2:
+            description = "exponential in the input size"
+            projected = math.exp(min(ea + eb * full_size, 700.0))
+    return f"{description}, fitted exponent {k:.2f}", projected
@@ -1,5 +1,7 @@
 import re
-from typing import List, Optional
+from html import unescape
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
 
 
 def extract_task_articles(html: str) -> List[str]:
@@ -28,6 +30,15 @@ def parse_submission_message(html: str) -> Optional[str]:
     return None
 
 
+def parse_answer_hint(text: str) -> Optional[str]:
+    """Returns 'high' or 'low' if the submission response says the answer is too high/too low."""
+    if "too high" in text:
+        return "high"
+    if "too low" in text:
+        return "low"
+    return None
+
+
 def parse_wait_time(text: str) -> int:
     """
     Parses the 'You have ... left to wait' message to get the wait time in seconds.
@@ -49,3 +60,179 @@ def parse_wait_time(text: str) -> int:
 
         return minutes * 60 + seconds
     return 0
+
+
+def _strip_tags(html: str) -> str:
+    return unescape(re.sub(r'<[^>]+>', '', html))
+
+
+def _example_blocks(article: str) -> List[Tuple[int, str]]:
+    """(end offset, text) of every example input block in the article."""
+    blocks = []
+    for match in re.finditer(r'<pre><code>(.*?)</code></pre>', article, re.DOTALL):
+        preceding = article[:match.start()]
+        paragraphs = re.findall(r'<p>(.*?)</p>', preceding, re.DOTALL)
+        if not paragraphs or "example" not in paragraphs[-1].lower():
+            continue
+        text = _strip_tags(match.group(1))
+        if "\n" in text.strip():
+            blocks.append((match.end(), text))
+    return blocks
+
+
+def extract_example_inputs(article: str) -> List[str]:
+    """
+    Extracts example inputs from a task statement article:
+    multi-line <pre><code> blocks introduced by a paragraph mentioning an example.
+    """
+    return [text for _, text in _example_blocks(article)]
+
+
+# The answer cannot contain tags, so a match never spans several <code> elements
+_ANSWER_RE = re.compile(r'<code><em>([^<]*)</em></code>|<em><code>([^<]*)</code></em>')
+
+
+def _last_answer(article: str) -> Optional[re.Match]:
+    matches = list(_ANSWER_RE.finditer(article))
+    return matches[-1] if matches else None
+
+
+def extract_example_answer(article: str) -> Optional[str]:
+    """
+    Extracts the expected example answer: the last emphasized code (<code><em>42</em></code>)
+    in the article, which is where AoC states "... the answer is 42".
+    """
+    match = _last_answer(article)
+    if match is None:
+        return None
+    return unescape(match.group(1) or match.group(2)).strip()
+
+
+def extract_example_tests(articles: List[str]) -> List[dict]:
+    """
+    Builds example tests [{"part", "input", "expected"}] from the statement articles.
+    The expected answer is paired with the last example shown before it; part 2 usually
+    reuses the example input of part 1.
+    """
+    tests = []
+    last_input: Optional[str] = None
+    for i, article in enumerate(articles[:2]):
+        blocks = _example_blocks(article)
+        answer = _last_answer(article)
+        example_input = last_input
+        if answer is not None:
+            preceding = [text for end, text in blocks if end <= answer.start()]
+            if preceding:
+                example_input = preceding[-1]
+        expected = extract_example_answer(article)
+        if example_input is not None and expected:
+            tests.append({"part": i + 1, "input": example_input, "expected": expected})
+        last_input = example_input
+    return tests
+
+
+class _MarkdownConverter(HTMLParser):
+    """Single-pass converter of AoC statement HTML into compact Markdown."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        # (text, verbatim) segments; verbatim ones are <pre> blocks and are not normalized later
+        self.segments: List[Tuple[str, bool]] = []
+        self.out: List[str] = []
+        self.in_pre = False
+        self.code_buffer: Optional[List[str]] = None
+        self.code_emphasized = False
+        self.lists: List[str] = []
+
+    def _emit(self, text: str):
+        if self.code_buffer is not None:
+            self.code_buffer.append(text)
+        else:
+            self.out.append(text)
+
+    def _flush(self, verbatim: bool):
+        self.segments.append(("".join(self.out), verbatim))
+        self.out = []
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        if tag == "pre":
+            self.out.append("\n\n")
+            self._flush(False)
+            self.in_pre = True
+            self.out.append("```\n")
+        elif self.in_pre:
+            return
+        elif tag in ("h1", "h2", "h3"):
+            self.out.append("\n\n" + "#" * int(tag[1]) + " ")
+        elif tag == "p":
+            self.out.append("\n\n")
+        elif tag in ("ul", "ol"):
+            self.lists.append(tag)
+            self.out.append("\n")
+        elif tag == "li":
+            indent = "  " * (len(self.lists) - 1)
+            marker = "1." if self.lists and self.lists[-1] == "ol" else "-"
+            self.out.append(f"\n{indent}{marker} ")
+        elif tag == "br":
+            self._emit("\n")
+        elif tag == "code":
+            self.code_buffer = []
+            self.code_emphasized = False
+        elif tag == "em":
+            if self.code_buffer is not None:
+                self.code_emphasized = True
+            else:
+                self.out.append("**")
+
+    def handle_endtag(self, tag: str):
+        if tag == "pre":
+            text = "".join(self.out)
+            self.out = [text if text.endswith("\n") else text + "\n", "```"]
+            self._flush(True)
+            self.in_pre = False
+            self.out.append("\n\n")
+        elif self.in_pre:
+            return
+        elif tag in ("h1", "h2", "h3", "p"):
+            self.out.append("\n\n")
+        elif tag in ("ul", "ol"):
+            if self.lists:
+                self.lists.pop()
+            self.out.append("\n\n")
+        elif tag == "code" and self.code_buffer is not None:
+            text = "".join(self.code_buffer).strip()
+            self.code_buffer = None
+            code = f"`{text}`" if "`" not in text else f"`` {text} ``"
+            self.out.append(f"**{code}**" if self.code_emphasized else code)
+        elif tag == "em" and self.code_buffer is None:
+            self.out.append("**")
+
+    def handle_data(self, data: str):
+        if self.in_pre:
+            self.out.append(data)
+            return
+        text = re.sub(r"\s+", " ", data)
+        # Whitespace from the HTML source is dropped at line starts, so only list indentation remains there
+        previous = self.out[-1] if self.out else ""
+        if self.code_buffer is None and (not previous or previous[-1] in " \n"):
+            text = text.lstrip(" ")
+        self._emit(text)
+
+    def markdown(self) -> str:
+        self._flush(False)
+        parts = []
+        for text, verbatim in self.segments:
+            if not verbatim:
+                # Trailing whitespace only: leading spaces are the indentation of nested list items
+                text = re.sub(r"[ \t]+\n", "\n", text)
+                text = re.sub(r"\n{3,}", "\n\n", text)
+            parts.append(text)
+        return "".join(parts).strip() + "\n"
+
+
+def html_to_markdown(html: str) -> str:
+    """Converts a task statement article into compact Markdown, keeping example blocks verbatim."""
+    converter = _MarkdownConverter()
+    converter.feed(html)
+    converter.close()
+    return converter.markdown()
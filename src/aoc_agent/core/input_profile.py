@@ -0,0 +1,89 @@
+import re
+from collections import Counter
+from typing import List
+
+SEPARATORS = [" -> ", " | ", ": ", ", ", ",", " = ", "=", "-", ":", ";", " "]
+# A dash is a minus sign only when it does not follow a word character ("1-3" is a range)
+NUMBER_RE = re.compile(r"(?:(?<!\w)-)?\d+")
+MAX_SECTIONS = 3
+
+
+def _split_sections(lines: List[str]) -> List[List[str]]:
+    sections: List[List[str]] = []
+    current: List[str] = []
+    for line in lines:
+        if line.strip():
+            current.append(line)
+        elif current:
+            sections.append(current)
+            current = []
+    if current:
+        sections.append(current)
+    return sections
+
+
+def _format_histogram(counter: Counter, limit: int = 20) -> str:
+    items = [f"{ch!r}:{n}" for ch, n in counter.most_common(limit)]
+    more = f" (+{len(counter) - limit} more)" if len(counter) > limit else ""
+    return " ".join(items) + more
+
+
+def _profile_section(lines: List[str]) -> List[str]:
+    out = []
+    lengths = [len(line) for line in lines]
+    distinct = sorted(set(lengths))
+    out.append(f"lines: {len(lines)}")
+    if len(distinct) <= 5:
+        out.append(f"line lengths: {', '.join(map(str, distinct))}")
+    else:
+        out.append(f"line lengths: min {min(lengths)}, max {max(lengths)}, avg {sum(lengths) / len(lengths):.1f}, {len(distinct)} distinct")
+
+    chars = Counter("".join(lines))
+    if len(lines) > 1 and len(distinct) == 1 and " " not in chars:
+        out.append(f"grid: {lengths[0]} columns x {len(lines)} rows")
+        out.append(f"grid chars: {_format_histogram(chars)}")
+        positions = {ch: divmod(i, lengths[0]) for i, ch in enumerate("".join(lines)) if chars[ch] == 1}
+        if positions:
+            out.append("unique cells (row, col): " + ", ".join(f"{ch!r}@{rc}" for ch, rc in sorted(positions.items())))
+    else:
+        out.append(f"chars: {_format_histogram(chars)}")
+
+    numbers_per_line = [NUMBER_RE.findall(line) for line in lines]
+    numbers = [int(n) for ns in numbers_per_line for n in ns]
+    if numbers:
+        counts = [len(ns) for ns in numbers_per_line]
+        out.append(f"numbers: {len(numbers)} total, {min(counts)}..{max(counts)} per line, range {min(numbers)}..{max(numbers)}, "
+                   f"max digits {max(len(str(abs(n))) for n in numbers)}{', has negatives' if min(numbers) < 0 else ''}")
+
+    seps = []
+    for sep in SEPARATORS:
+        n = sum(1 for line in lines if sep in line)
+        if n:
+            seps.append(f"{sep!r} in {n} lines")
+    if seps:
+        out.append("separators: " + "; ".join(seps[:6]))
+
+    out.append("first lines:")
+    for line in lines[:3]:
+        out.append("  " + (line if len(line) <= 120 else line[:120] + "..."))
+    return out
+
+
+def profile_input(text: str) -> str:
+    """Builds a short human-readable profile of a puzzle input."""
+    lines = text.splitlines()
+    sections = _split_sections(lines)
+    out = [
+        f"size: {len(text)} bytes, {len(lines)} lines, {len(lines) - sum(len(s) for s in sections)} blank lines",
+        f"sections (separated by blank lines): {len(sections)}",
+    ]
+    if not sections:
+        return "\n".join(out + ["input is empty"])
+    if len(sections) > MAX_SECTIONS:
+        sizes = [len(s) for s in sections]
+        out.append(f"section sizes: min {min(sizes)}, max {max(sizes)} lines; profiling the first {MAX_SECTIONS}")
+    for i, section in enumerate(sections[:MAX_SECTIONS], start=1):
+        if len(sections) > 1:
+            out.append(f"\n## section {i}")
+        out.extend(_profile_section(section))
+    return "\n".join(out)
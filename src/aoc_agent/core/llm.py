@@ -1,11 +1,9 @@
-from typing import List, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_ollama import ChatOllama
+from typing import List, Any, Optional, Sequence
 from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage, SystemMessage, ToolMessage
 from langchain_core.outputs import LLMResult
 from aoc_agent.agent.context import AgentContext
+from .llm_routing import RoutingPolicy, RoutedChatModel
 
 class TokenCollector(BaseCallbackHandler):
     def __init__(self, context: AgentContext):
@@ -18,14 +16,87 @@ class TokenCollector(BaseCallbackHandler):
                     usage = gen.message.usage_metadata
                     if usage:
                         self.context.output_tokens += usage.get('output_tokens', 0)
+                        self.context.input_tokens += usage.get('input_tokens', 0)
+                        details = usage.get('input_token_details') or {}
+                        self.context.cache_read_tokens += details.get('cache_read', 0) or 0
+                        self.context.cache_creation_tokens += details.get('cache_creation', 0) or 0
 
 
-def create_llm(model_name: str, tools: List[Any]):
+# Provider SDKs are heavy to import, so each one is loaded only when a model of that provider is requested.
+def create_chat_model(model_name: str, prompt_cache_key: Optional[str] = None):
     if "gpt" in model_name or "o1" in model_name:
-        return ChatOpenAI(model=model_name).bind_tools(tools, tool_choice="any")
+        from langchain_openai import ChatOpenAI
+        # OpenAI caches prompt prefixes automatically; the key routes runs sharing a prefix to the same cache.
+        extra_body = {"prompt_cache_key": prompt_cache_key} if prompt_cache_key else None
+        return ChatOpenAI(model=model_name, extra_body=extra_body)
     elif "claude" in model_name:
-        return ChatAnthropic(model=model_name).bind_tools(tools, tool_choice="any")
+        from langchain_anthropic import ChatAnthropic
+        return ChatAnthropic(model=model_name)
     elif "gemini" in model_name:
-        return ChatGoogleGenerativeAI(model=model_name).bind_tools(tools, tool_config={'function_calling_config': {'mode': 'ANY'}})
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(model=model_name)
     else:
-        return ChatOllama(model=model_name).bind_tools(tools)
+        from langchain_ollama import ChatOllama
+        return ChatOllama(model=model_name)
+
+
+def bind_provider_tools(model_name: str, model: Any, tools: Sequence[Any]):
+    if "gpt" in model_name or "o1" in model_name or "claude" in model_name:
+        return model.bind_tools(tools, tool_choice="any")
+    elif "gemini" in model_name:
+        return model.bind_tools(tools, tool_config={'function_calling_config': {'mode': 'ANY'}})
+    else:
+        return model.bind_tools(tools)
+
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def _with_cache_control(message: BaseMessage) -> BaseMessage:
+    content = message.content
+    if isinstance(content, str):
+        blocks: List[Any] = [{"type": "text", "text": content}]
+    else:
+        blocks = [b if isinstance(b, dict) else {"type": "text", "text": b} for b in content]
+    if not blocks:
+        return message
+    blocks[-1] = {**blocks[-1], "cache_control": CACHE_CONTROL}
+    return message.model_copy(update={"content": blocks})
+
+
+def mark_cache_breakpoints(model_name: str, messages: List[BaseMessage]) -> List[BaseMessage]:
+    """
+    Marks the stable prompt prefix as cacheable for providers that need explicit markers.
+
+    Only Anthropic needs them: breakpoints go on the system prompt (which also covers the tool
+    definitions preceding it), on fetched task statements and on the last message, so each step
+    re-reads the previous step's prefix from cache. Anthropic allows at most 4 breakpoints.
+    OpenAI and Gemini cache stable prefixes implicitly and get the messages unchanged.
+    """
+    if "claude" not in model_name or not messages:
+        return messages
+
+    marked = set()
+    for i, message in enumerate(messages):
+        if isinstance(message, SystemMessage):
+            marked.add(i)
+            break
+    statements = [i for i, m in enumerate(messages) if isinstance(m, ToolMessage) and m.name == "get_task_statement"]
+    marked.update(statements[-2:])
+    marked.add(len(messages) - 1)
+
+    return [_with_cache_control(m) if i in marked else m for i, m in enumerate(messages)]
+
+
+def create_llm(model_name: str, tools: List[Any], policy: Optional[RoutingPolicy] = None,
+               prompt_cache_key: Optional[str] = None):
+    policy = policy or RoutingPolicy()
+    model_names = [model_name] + [m for m in policy.fallback_models if m != model_name]
+    router = RoutedChatModel(
+        models=[create_chat_model(m, prompt_cache_key) for m in model_names],
+        model_names=model_names,
+        policy=policy,
+        tool_binder=bind_provider_tools,
+        message_preparer=mark_cache_breakpoints,
+    )
+    return router.bind_tools(tools)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable
+from pydantic import Field
+from rich import print
+
+
+@dataclass
+class RoutingPolicy:
+    """How a chat model call is routed: timeouts, retries, hedging, concurrency and fallbacks."""
+    timeout: float = 300.0
+    max_retries: int = 4
+    backoff_base: float = 2.0
+    backoff_max: float = 60.0
+    # Send a duplicate request if the first one has not answered after this many seconds (None disables hedging).
+    hedge_after: Optional[float] = None
+    # Max in-flight requests per model, shared by every run in this process.
+    max_concurrency: int = 4
+    # Models tried in order when the primary one keeps failing.
+    fallback_models: List[str] = field(default_factory=list)
+
+
+_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_semaphores_lock = threading.Lock()
+
+
+def model_semaphore(model_name: str, max_concurrency: int) -> threading.BoundedSemaphore:
+    with _semaphores_lock:
+        semaphore = _semaphores.get(model_name)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(max(1, max_concurrency))
+            _semaphores[model_name] = semaphore
+        return semaphore
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """True for rate limits (429), server errors (5xx) and timeouts, whatever the provider SDK."""
+    if isinstance(error, TimeoutError):
+        return True
+    for status in (
+        getattr(error, "status_code", None),
+        getattr(error, "code", None),
+        getattr(getattr(error, "response", None), "status_code", None),
+    ):
+        if isinstance(status, int) and (status == 429 or 500 <= status < 600):
+            return True
+    name = type(error).__name__
+    return any(marker in name for marker in ("RateLimit", "Timeout", "ResourceExhausted", "ServiceUnavailable", "InternalServerError", "Overloaded"))
+
+
+class RoutedChatModel(BaseChatModel):
+    """
+    Chat model that routes each call over a primary model and its fallbacks.
+
+    Every call is bounded by `policy.timeout`, retried with exponential backoff on retryable errors,
+    optionally hedged with a duplicate request, and throttled by a per-model semaphore.
+    Any BaseChatModel can be routed, so the policy can be exercised with a local fake model.
+    """
+
+    models: List[Any]
+    model_names: List[str]
+    policy: RoutingPolicy = Field(default_factory=RoutingPolicy)
+    tool_binder: Optional[Callable[[str, Any, Sequence[Any]], Runnable]] = None
+    # Provider-specific rewrite of the messages before they are sent (e.g. prompt caching markers).
+    message_preparer: Optional[Callable[[str, List[BaseMessage]], List[BaseMessage]]] = None
+    bound: Optional[List[Any]] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed-chat-model"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> RoutedChatModel:
+        # Each provider needs its own tool_choice flavour, so binding is delegated per model.
+        if self.tool_binder is None:
+            bound = [model.bind_tools(tools, **kwargs) for model in self.models]
+        else:
+            bound = [self.tool_binder(name, model, tools) for name, model in zip(self.model_names, self.models)]
+        return self.model_copy(update={"bound": bound})
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        runnables = self.bound if self.bound is not None else self.models
+        last_error: Optional[BaseException] = None
+        for name, runnable in zip(self.model_names, runnables):
+            try:
+                message = self._call_with_retries(name, runnable, messages, stop, kwargs)
+                return ChatResult(generations=[ChatGeneration(message=message)])
+            except Exception as e:
+                last_error = e
+                print(f"[yellow]Model {name} failed: {e}[/yellow]")
+        assert last_error is not None
+        raise last_error
+
+    def _call_with_retries(self, name: str, runnable: Any, messages: List[BaseMessage],
+                           stop: Optional[List[str]], kwargs: Dict[str, Any]) -> AIMessage:
+        policy = self.policy
+        if self.message_preparer is not None:
+            messages = self.message_preparer(name, messages)
+        attempt = 0
+        while True:
+            try:
+                return self._call_hedged(name, runnable, messages, stop, kwargs)
+            except Exception as e:
+                if attempt >= policy.max_retries or not is_retryable_error(e):
+                    raise
+                delay = min(policy.backoff_max, policy.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+                print(f"[yellow]Model {name}: {type(e).__name__}, retrying in {delay:.1f}s ({attempt + 1}/{policy.max_retries})[/yellow]")
+                time.sleep(delay)
+                attempt += 1
+
+    def _call_hedged(self, name: str, runnable: Any, messages: List[BaseMessage],
+                     stop: Optional[List[str]], kwargs: Dict[str, Any]) -> AIMessage:
+        policy = self.policy
+        semaphore = model_semaphore(name, policy.max_concurrency)
+        deadline = time.monotonic() + policy.timeout
+        # Set once this call has returned or given up: workers still waiting for a slot must not send a request.
+        abandoned = threading.Event()
+
+        def call() -> AIMessage:
+            if not semaphore.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                raise TimeoutError(f"Model {name}: no free request slot within {policy.timeout}s")
+            try:
+                if abandoned.is_set() or time.monotonic() >= deadline:
+                    raise TimeoutError(f"Model {name}: request abandoned before it was sent")
+                # Inner calls get no callbacks: usage is reported once, by this model's own run.
+                return runnable.invoke(messages, config={"callbacks": []}, stop=stop, **kwargs)
+            finally:
+                semaphore.release()
+
+        executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            pending: set[Future] = {executor.submit(call)}
+            if policy.hedge_after is not None:
+                done, _ = wait(pending, timeout=min(policy.hedge_after, policy.timeout))
+                if not done:
+                    print(f"[yellow]Model {name}: no answer after {policy.hedge_after}s, sending hedged request[/yellow]")
+                    pending.add(executor.submit(call))
+
+            error: Optional[BaseException] = None
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        return future.result()
+                    error = future.exception()
+            if pending or error is None:
+                raise TimeoutError(f"Model {name} did not answer within {policy.timeout}s")
+            raise error
+        finally:
+            # Requests already sent are left to finish in the background; the others are never sent.
+            abandoned.set()
+            executor.shutdown(wait=False, cancel_futures=True)
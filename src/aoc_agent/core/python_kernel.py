@@ -0,0 +1,142 @@
+"""
+A long-lived Python process that executes code cells in a persistent namespace.
+
+The parent side (PythonKernel) talks to a child started from this very file
+(`python python_kernel.py`), so the child needs nothing but the standard library.
+Requests and responses are JSON lines; responses carry a marker prefix so that
+anything the cell writes straight to the process stdout cannot be mistaken for one.
+"""
+import ast
+import io
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Dict, Optional
+
+MARKER = "__AOC_KERNEL_RESPONSE__"
+
+
+class KernelTimeout(Exception):
+    pass
+
+
+class PythonKernel:
+    def __init__(self, working_dir: str, memory_limit_mb: int = 2048, env: Optional[Dict[str, str]] = None):
+        self.working_dir = working_dir
+        self.memory_limit_mb = memory_limit_mb
+        self.env = env
+        self._process: Optional[subprocess.Popen] = None
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+
+    def _start(self):
+        self._lines = queue.Queue()
+        self._process = subprocess.Popen(
+            [sys.executable, "-u", os.path.abspath(__file__), str(self.memory_limit_mb)],
+            cwd=self.working_dir,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            env=self.env,
+        )
+        threading.Thread(target=self._pump, args=(self._process, self._lines), daemon=True).start()
+
+    @staticmethod
+    def _pump(process: subprocess.Popen, lines: "queue.Queue[Optional[str]]"):
+        assert process.stdout is not None
+        for line in process.stdout:
+            lines.put(line)
+        lines.put(None)
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def execute(self, code: str, timeout: float) -> dict:
+        """
+        Executes a cell and returns {"stdout", "stderr", "error"}.
+        On timeout the kernel is killed (its state is lost) and KernelTimeout is raised
+        with whatever the cell printed directly to the process output.
+        """
+        if not self.alive:
+            self._start()
+        assert self._process is not None and self._process.stdin is not None
+        self._process.stdin.write(json.dumps({"code": code}) + "\n")
+        self._process.stdin.flush()
+
+        raw_output = []
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                line = self._lines.get(timeout=max(0.0, remaining))
+            except queue.Empty:
+                self.shutdown()
+                raise KernelTimeout("".join(raw_output))
+            if line is None:
+                self.shutdown()
+                return {"stdout": "".join(raw_output), "stderr": "", "error": "Kernel died (out of memory or crashed). State is lost."}
+            if line.startswith(MARKER):
+                response = json.loads(line[len(MARKER):])
+                response["stdout"] = "".join(raw_output) + response["stdout"]
+                return response
+            raw_output.append(line)
+
+    def shutdown(self):
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.wait()
+            self._process = None
+
+
+def _limit_memory(limit_mb: int):
+    try:
+        import resource
+    except ImportError:  # Windows
+        return
+    limit = limit_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _run_cell(code: str, namespace: dict) -> dict:
+    stdout, stderr = io.StringIO(), io.StringIO()
+    error = None
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            tree = ast.parse(code, mode="exec")
+            # Like a notebook: the value of a trailing expression is printed
+            last_expr = tree.body.pop() if tree.body and isinstance(tree.body[-1], ast.Expr) else None
+            exec(compile(tree, "<cell>", "exec"), namespace)
+            if last_expr is not None:
+                value = eval(compile(ast.Expression(last_expr.value), "<cell>", "eval"), namespace)
+                if value is not None:
+                    print(repr(value))
+        except BaseException:
+            error = traceback.format_exc()
+    return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "error": error}
+
+
+def _serve():
+    # Started as a script, sys.path[0] is this package directory, whose modules (e.g. the aoclib
+    # registry) would shadow the solution's imports. Cells import like a solution run in the workspace.
+    sys.path[0] = os.getcwd()
+    _limit_memory(int(sys.argv[1]))
+    namespace: dict = {"__name__": "__main__"}
+    real_stdout = sys.stdout
+    for line in sys.stdin:
+        request = json.loads(line)
+        response = _run_cell(request["code"], namespace)
+        real_stdout.write(MARKER + json.dumps(response) + "\n")
+        real_stdout.flush()
+
+
+if __name__ == "__main__":
+    _serve()
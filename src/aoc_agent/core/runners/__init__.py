@@ -1,16 +1,62 @@
-from typing import Dict, Optional
+import os
+from importlib.metadata import entry_points
+from typing import Callable, Dict, List, Optional, cast
 from .base import CodeRunner
 from .python import PythonRunner
 from .kotlin import KotlinRunner
-from .csharp import CSharpRunner
+from .csharp import CSHARP_MODES, CSharpRunner, CSharpMode
 from .lean4 import Lean4Runner
 
-_runners: Dict[str, CodeRunner] = {
-    "python": PythonRunner(),
-    "kotlin": KotlinRunner(),
-    "csharp": CSharpRunner(),
-    "lean4": Lean4Runner()
+# Third-party packages can add languages by exposing a CodeRunner factory in this entry point group.
+ENTRY_POINT_GROUP = "aoc_agent.runners"
+
+
+def _csharp_runner() -> CodeRunner:
+    mode = os.environ.get("AOC_CSHARP_MODE", "jit")
+    # The mode goes into the build flags and the build cache key, so a typo must not pass silently
+    if mode not in CSHARP_MODES:
+        raise ValueError(f"AOC_CSHARP_MODE={mode!r} is not a C# mode, expected one of: {', '.join(CSHARP_MODES)}")
+    return CSharpRunner(cast(CSharpMode, mode))
+
+
+_factories: Dict[str, Callable[[], CodeRunner]] = {
+    "python": lambda: PythonRunner(os.environ.get("AOC_PYTHON_INTERPRETER") or None,
+                                   os.environ.get("AOC_PYTHON_PYPY_FALLBACK", "").lower() in ("1", "true", "yes")),
+    "kotlin": KotlinRunner,
+    "csharp": _csharp_runner,
+    "lean4": Lean4Runner,
 }
+_runners: Dict[str, CodeRunner] = {}
+_entry_points_loaded = False
+
+
+def register_runner(lang: str, factory: Callable[[], CodeRunner]) -> None:
+    _factories[lang] = factory
+    _runners.pop(lang, None)
+
+
+def _load_entry_points() -> None:
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        if ep.name not in _factories:
+            _factories[ep.name] = lambda ep=ep: ep.load()()
+
+
+def available_languages() -> List[str]:
+    _load_entry_points()
+    return list(_factories)
+
 
 def get_runner(lang: str) -> Optional[CodeRunner]:
-    return _runners.get(lang)
+    """Returns the runner for the language, constructing it on first use."""
+    runner = _runners.get(lang)
+    if runner is None:
+        _load_entry_points()
+        factory = _factories.get(lang)
+        if factory is None:
+            return None
+        runner = _runners[lang] = factory()
+    return runner
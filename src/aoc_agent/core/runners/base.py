@@ -1,16 +1,134 @@
 from abc import ABC, abstractmethod
+import json
+import os
+import shutil
 import subprocess
-from typing import Any
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from .process import ProgressWatchdog
+
+PROBES_FILE = "probes.json"
+_probes_lock = threading.Lock()
+_cache_locks: Dict[str, threading.Lock] = {}
+_cache_locks_guard = threading.Lock()
+
+
+def runner_cache_dir(*parts: str) -> str:
+    """Persistent directory for toolchain caches shared by all runs (builds, templates, archives)."""
+    path = os.path.abspath(os.path.join("data", "cache", *parts))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+@contextmanager
+def cache_lock(directory: str) -> Iterator[None]:
+    """
+    Exclusive lock on a shared cache directory, held across threads and aoc-agent processes
+    (concurrent sweeps share data/cache). Without fcntl (Windows) only threads are serialized.
+    """
+    path = os.path.join(directory, ".lock")
+    with _cache_locks_guard:
+        thread_lock = _cache_locks.setdefault(path, threading.Lock())
+    with thread_lock:
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        os.makedirs(directory, exist_ok=True)
+        with open(path, "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _load_probes(path: str) -> Dict[str, str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def cached_probe(executable: str, name: str, probe: Callable[[], str]) -> str:
+    """
+    Returns probe() for a toolchain executable, cached on disk across runs.
+
+    The cache key is the resolved executable path plus its mtime, so upgrading or switching
+    the toolchain invalidates it. Missing executables are never cached.
+    """
+    resolved = shutil.which(executable)
+    if not resolved:
+        return probe()
+    resolved = os.path.realpath(resolved)
+    key = f"{name}:{resolved}:{os.path.getmtime(resolved)}"
+    path = os.path.join(runner_cache_dir(), PROBES_FILE)
+    with _probes_lock:
+        cached = _load_probes(path).get(key)
+    if cached is not None:
+        return cached
+
+    value = probe()
+    with _probes_lock:
+        probes = _load_probes(path)
+        probes[key] = value
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(probes, f, indent=2)
+        os.replace(tmp_path, path)
+    return value
+
+
+def clear_probe_cache():
+    path = os.path.join(runner_cache_dir(), PROBES_FILE)
+    with _probes_lock:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def attach_timings(result: subprocess.CompletedProcess, **timings: float) -> subprocess.CompletedProcess:
+    """
+    Attaches a breakdown of the execution time (e.g. compile/startup/compute seconds) to a result.
+    The toolbox stores it in the coderun result.json.
+    """
+    setattr(result, "timings", {name: round(value, 3) for name, value in timings.items()})
+    return result
+
+
+def format_hotspots(costs: Counter, unit: str, limit: int = 15) -> str:
+    """Formats the top entries of {location: self cost} as a share of the total."""
+    total = sum(costs.values())
+    if not total:
+        return "No samples were collected."
+    lines = []
+    for location, value in costs.most_common(limit):
+        lines.append(f"{100 * value / total:5.1f}%  {value:>8.0f} {unit}  {location}")
+    return "\n".join(lines)
+
 
 class CodeRunner(ABC):
+    # Toolchain executables the runner relies on
+    executables: List[str] = []
+
+    def check(self) -> Dict[str, Optional[str]]:
+        """Resolves the toolchain executables; None marks a missing one."""
+        return {exe: shutil.which(exe) for exe in self.executables}
+
     @abstractmethod
-    def run(self, working_dir: str, code_filename: str) -> subprocess.CompletedProcess:
+    def run(self, working_dir: str, code_filename: str, watchdog: Optional["ProgressWatchdog"] = None) -> subprocess.CompletedProcess:
         """
         Runs the solution code in the specified working directory.
         
         Args:
             working_dir: The directory where the code should be executed.
             code_filename: The name of the source code file to execute (must exist in working_dir).
+            watchdog: Observes the live output of the solution and may stop it early (EarlyTermination).
 
         Returns:
             subprocess.CompletedProcess: The result of the execution.
@@ -23,3 +141,17 @@ class CodeRunner(ABC):
         Returns information about the language version and standard library.
         """
         pass
+
+    def rerun_after_timeout(self, working_dir: str, code_filename: str) -> Optional[subprocess.CompletedProcess]:
+        """
+        Reruns a solution whose run hit the time limit in a faster setup (e.g. another interpreter).
+        Returns None when the runner has no such setup; the timeout then stands.
+        """
+        return None
+
+    def profile(self, working_dir: str, code_filename: str, budget: float) -> Optional[str]:
+        """
+        Runs the solution under a profiler for at most `budget` seconds and returns a hotspot report.
+        Returns None when the language has no profiler support.
+        """
+        return None
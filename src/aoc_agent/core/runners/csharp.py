@@ -1,24 +1,21 @@
+import hashlib
+import json
 import os
+import platform
 import shutil
 import subprocess
-from pathlib import Path
-from typing import Any
-from .base import CodeRunner
+import sys
+import time
+from collections import Counter
+from typing import Literal, Optional, get_args
+from .. import aoclib
+from .base import CodeRunner, attach_timings, cache_lock, cached_probe, format_hotspots, runner_cache_dir
+from .process import ProgressWatchdog, run_process
 
-class CSharpRunner(CodeRunner):
-    def get_version_info(self) -> str:
-        try:
-            res = subprocess.run(["dotnet", "--version"], capture_output=True, text=True)
-            version = res.stdout.strip()
-            return f"Dotnet {version}; TargetFramework: net9.0"
-        except Exception:
-            return "Unknown Dotnet version"
-
-    def run(self, working_dir: str, code_filename: str) -> subprocess.CompletedProcess:
-        project_filename = Path(code_filename).stem + ".csproj"
-        project_path = os.path.join(working_dir, project_filename)
+CSharpMode = Literal["jit", "r2r", "aot"]
+CSHARP_MODES = get_args(CSharpMode)
 
-        csproj_content = f"""<Project Sdk="Microsoft.NET.Sdk">
+CSPROJ_CONTENT = """<Project Sdk="Microsoft.NET.Sdk">
   <PropertyGroup>
     <OutputType>Exe</OutputType>
     <TargetFramework>net9.0</TargetFramework>
@@ -26,28 +23,220 @@ class CSharpRunner(CodeRunner):
     <Nullable>enable</Nullable>
     <EnableDefaultCompileItems>false</EnableDefaultCompileItems>
     <WarningLevel>0</WarningLevel>
+    <AssemblyName>Solution</AssemblyName>
+    <InvariantGlobalization>true</InvariantGlobalization>
   </PropertyGroup>
   <ItemGroup>
-    <Compile Include="{code_filename}" />
+    <Compile Include="Program.cs" />
+    <Compile Include="AocLib.cs" Condition="Exists('AocLib.cs')" />
   </ItemGroup>
 </Project>"""
 
-        with open(project_path, "w", encoding="utf-8") as f:
-            f.write(csproj_content)
+EXE_SUFFIX = ".exe" if os.name == "nt" else ""
+
+
+def _runtime_identifier() -> str:
+    os_part = {"win32": "win", "darwin": "osx"}.get(sys.platform, "linux")
+    arch = "arm64" if platform.machine().lower() in ("arm64", "aarch64") else "x64"
+    return f"{os_part}-{arch}"
+
+
+class CSharpRunner(CodeRunner):
+    """
+    Builds solutions in Release into a persistent, restored-once template project and runs the output.
+
+    mode="jit" runs the built dll with `dotnet exec`, "r2r" publishes it ReadyToRun-precompiled,
+    "aot" publishes a NativeAOT executable. Builds are cached by source hash.
+    """
+
+    executables = ["dotnet"]
+
+    def __init__(self, mode: CSharpMode = "jit"):
+        self.mode = mode
+        self._version: Optional[str] = None
+
+    def get_version_info(self) -> str:
+        helper = aoclib.describe("csharp")
+        version = cached_probe("dotnet", "version", self._probe_version)
+        return f"{version}\n{helper}" if helper else version
+
+    def _probe_version(self) -> str:
+        try:
+            res = subprocess.run(["dotnet", "--version"], capture_output=True, text=True)
+            version = res.stdout.strip()
+            return f"Dotnet {version}; TargetFramework: net9.0; Configuration: Release"
+        except Exception:
+            return "Unknown Dotnet version"
+
+    def run(self, working_dir: str, code_filename: str, watchdog: Optional[ProgressWatchdog] = None) -> subprocess.CompletedProcess:
+        compile_start = time.time()
+        build = self._build(working_dir, code_filename)
+        compile_time = time.time() - compile_start
+        if isinstance(build, subprocess.CompletedProcess):
+            return attach_timings(build, compile=compile_time)
+
+        cmd = [build] if self.mode == "aot" else ["dotnet", "exec", build]
+        run_start = time.time()
+        result = run_process(cmd, cwd=working_dir, timeout=60, watchdog=watchdog)
+        return attach_timings(result, compile=compile_time, compute=time.time() - run_start)
+
+    def profile(self, working_dir: str, code_filename: str, budget: float) -> Optional[str]:
+        if not shutil.which("dotnet-trace"):
+            return "dotnet-trace is not installed (dotnet tool install --global dotnet-trace), profiling is not available."
+        build = self._build(working_dir, code_filename)
+        if isinstance(build, subprocess.CompletedProcess):
+            return build.stderr
 
+        cmd = [build] if self.mode == "aot" else ["dotnet", "exec", build]
+        trace = os.path.join(working_dir, "profile.nettrace")
+        speedscope = os.path.splitext(trace)[0] + ".speedscope.json"
+        start = time.time()
         try:
-            return subprocess.run(
-                ["dotnet", "run", "--project", project_filename],
+            subprocess.run(
+                ["dotnet-trace", "collect", "--format", "Speedscope", "-o", trace,
+                 "--duration", time.strftime("00:%H:%M:%S", time.gmtime(budget)), "--", *cmd],
                 cwd=working_dir,
                 capture_output=True,
                 text=True,
-                timeout=60
+                timeout=budget + 30
             )
+        except subprocess.TimeoutExpired:
+            pass
+        duration = time.time() - start
+        try:
+            with open(speedscope, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return "dotnet-trace produced no trace."
         finally:
-            bin_dir = os.path.join(working_dir, "bin")
-            if os.path.exists(bin_dir):
-                shutil.rmtree(bin_dir, ignore_errors=True)
-            
-            obj_dir = os.path.join(working_dir, "obj")
-            if os.path.exists(obj_dir):
-                shutil.rmtree(obj_dir, ignore_errors=True)
+            for path in (trace, speedscope):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        # Evented profiles per thread: the frame on top of the stack between two events owns that time.
+        frames = data["shared"]["frames"]
+        self_time: Counter = Counter()
+        for profile in data.get("profiles", []):
+            if profile.get("type") != "evented":
+                continue
+            stack: list = []
+            last = profile.get("startValue", 0)
+            for event in profile["events"]:
+                if stack:
+                    self_time[frames[stack[-1]]["name"]] += event["at"] - last
+                last = event["at"]
+                if event["type"] == "O":
+                    stack.append(event["frame"])
+                elif stack:
+                    stack.pop()
+        return f"dotnet-trace, {duration:.1f}s wall time, self time by method:\n{format_hotspots(self_time, 'ms')}"
+
+    def _build(self, working_dir: str, code_filename: str):
+        """Returns the path of the built dll/executable, or the failed build process."""
+        with open(os.path.join(working_dir, code_filename), "rb") as f:
+            source = f.read()
+        if self._version is None:
+            self._version = self.get_version_info()
+        # The helper library is compiled into the build, so its version and state are part of the key too
+        helper = aoclib.AOCLIB_VERSION if aoclib.source_path("csharp") else "off"
+        digest = hashlib.sha256(source + f"{self._version};{self.mode};aoclib={helper}".encode()).hexdigest()[:16]
+
+        cache_dir = runner_cache_dir("csharp", self.mode)
+        out_dir = os.path.join(cache_dir, "builds", digest)
+        target = os.path.join(out_dir, ("Solution" + EXE_SUFFIX) if self.mode == "aot" else "Solution.dll")
+        if os.path.exists(target):
+            return target
+
+        template = os.path.join(cache_dir, "template")
+        # The template is shared by every aoc-agent process, so it is locked across processes
+        with cache_lock(template):
+            # Another process may have built the same source while this one waited
+            if os.path.exists(target):
+                return target
+            restore_result = self._restore(template)
+            if restore_result is not None:
+                return restore_result
+
+            self._sync_template(template)
+            with open(os.path.join(template, "Program.cs"), "wb") as f:
+                f.write(source)
+
+            # Built into a staging directory and renamed, because the cache is checked without the lock
+            staging_dir = out_dir + ".tmp"
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            if self.mode == "jit":
+                cmd = ["dotnet", "build", "-c", "Release", "--no-restore", "-o", staging_dir]
+            else:
+                cmd = ["dotnet", "publish", "-c", "Release", "--no-restore", "-r", _runtime_identifier(), "-o", staging_dir,
+                       *self._publish_properties()]
+            build_result = subprocess.run(
+                cmd,
+                cwd=template,
+                capture_output=True,
+                text=True,
+                timeout=120
+            )
+            staged_target = os.path.join(staging_dir, os.path.basename(target))
+            if build_result.returncode != 0 or not os.path.exists(staged_target):
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                # dotnet reports compiler errors on stdout
+                build_result.stderr = f"Compilation failed:\n{build_result.stderr}\n{build_result.stdout}"
+                build_result.stdout = ""
+                build_result.returncode = build_result.returncode or 1
+                return build_result
+            shutil.rmtree(out_dir, ignore_errors=True)
+            os.replace(staging_dir, out_dir)
+        return target
+
+    @staticmethod
+    def _sync_template(template: str):
+        """Brings a template restored by an older version up to date and links the aoclib source pack if enabled."""
+        csproj = os.path.join(template, "Solution.csproj")
+        with open(csproj, "r", encoding="utf-8") as f:
+            current = f.read()
+        if current != CSPROJ_CONTENT:
+            with open(csproj, "w", encoding="utf-8") as f:
+                f.write(CSPROJ_CONTENT)
+
+        helper_path = os.path.join(template, "AocLib.cs")
+        source = aoclib.source_path("csharp")
+        if source is None:
+            if os.path.exists(helper_path):
+                os.remove(helper_path)
+        else:
+            shutil.copy(source, helper_path)
+
+    def _publish_properties(self) -> list:
+        if self.mode == "r2r":
+            return ["--self-contained", "false", "-p:PublishReadyToRun=true"]
+        if self.mode == "aot":
+            return ["-p:PublishAot=true"]
+        return []
+
+    def _restore(self, template: str) -> Optional[subprocess.CompletedProcess]:
+        """Creates and restores the template project once; returns the failed process on error."""
+        marker = os.path.join(template, ".restored")
+        if os.path.exists(marker):
+            return None
+        os.makedirs(template, exist_ok=True)
+        with open(os.path.join(template, "Solution.csproj"), "w", encoding="utf-8") as f:
+            f.write(CSPROJ_CONTENT)
+        with open(os.path.join(template, "Program.cs"), "w", encoding="utf-8") as f:
+            f.write("")
+
+        cmd = ["dotnet", "restore"]
+        if self.mode != "jit":
+            cmd += ["-r", _runtime_identifier(), *[p for p in self._publish_properties() if p.startswith("-p:")]]
+        restore_result = subprocess.run(
+            cmd,
+            cwd=template,
+            capture_output=True,
+            text=True,
+            timeout=300
+        )
+        if restore_result.returncode != 0:
+            restore_result.stderr = f"Restore of the C# template project failed:\n{restore_result.stderr}\n{restore_result.stdout}"
+            return restore_result
+        with open(marker, "w") as f:
+            f.write(self.mode)
+        return None
@@ -1,11 +1,68 @@
 import os
 import glob
+import shlex
+import hashlib
+import json
+import shutil
 import subprocess
-from typing import Any
-from .base import CodeRunner
+import threading
+import time
+import zipfile
+from pathlib import Path
+from collections import Counter
+from typing import Any, List, Optional, Tuple
+from .. import aoclib
+from .base import CodeRunner, attach_timings, cache_lock, cached_probe, format_hotspots, runner_cache_dir
+from .process import ProgressWatchdog, run_process
+
+# Short-lived but compute-heavy programs: full tiered JIT, throughput GC, a pre-sized heap
+# and a deep stack for recursive solutions.
+JVM_FLAGS = ["-XX:+TieredCompilation", "-XX:+UseParallelGC", "-Xms256m", "-Xss512m", "-XX:-UsePerfData"]
+
+# Touches the parts of the stdlib AoC solutions typically use, so they end up in the CDS archive.
+WARMUP_SOURCE = """
+fun main(args: Array<String>) {
+    if (args.isNotEmpty()) return
+    val lines = "1,2\\n3,4\\n".lines().filter { it.isNotBlank() }
+    val nums = lines.flatMap { it.split(",").map(String::toInt) }
+    val grid = lines.map { it.toCharArray().toMutableList() }.toMutableList()
+    val seen = hashSetOf<Pair<Int, Int>>(0 to 0)
+    val queue = ArrayDeque(listOf(0 to 0))
+    val counts = nums.groupingBy { it % 2 }.eachCount().toSortedMap()
+    val re = Regex("(\\\\d+),(\\\\d+)").findAll(lines.joinToString("\\n")).map { it.groupValues }.toList()
+    val seq = generateSequence(1L) { it * 2 }.take(10).sum()
+    val text = buildString { append(nums.sorted()); append(counts); append(re); append(seq) }
+    println(text.length + grid.size + seen.size + queue.size + nums.sumOf { it.toLong() }.toInt())
+}
+"""
+
 
 class KotlinRunner(CodeRunner):
+    """
+    Compiles solutions with kotlinc and runs them on a JVM tuned for short runs.
+
+    The Kotlin stdlib is kept out of the solution jar and loaded from an AppCDS archive
+    built once per toolchain (locked across processes), which removes most of the class loading cost at startup.
+    Without a usable stdlib/archive the runner falls back to a fat jar and `java -jar`.
+    """
+
+    executables = ["kotlinc", "java"]
+
+    def __init__(self):
+        self._cds_lock = threading.Lock()
+        self._cds: Optional[dict] = None
+        self._cds_failed = False
+        self._aoclib_failed = False
+
     def get_version_info(self) -> str:
+        helper = aoclib.describe("kotlin")
+        return f"{self._toolchain_version()}\n{helper}" if helper else self._toolchain_version()
+
+    def _toolchain_version(self) -> str:
+        # kotlinc -version starts a JVM and takes seconds, so the answer is cached per toolchain.
+        return cached_probe("kotlinc", "version", self._probe_version)
+
+    def _probe_version(self) -> str:
         try:
             # kotlinc writes version to stderr
             res = subprocess.run(["kotlinc", "-version"], capture_output=True, text=True, shell=True)
@@ -16,37 +73,193 @@ class KotlinRunner(CodeRunner):
         except Exception:
             return "Unknown Kotlin version"
 
-    def run(self, working_dir: str, code_filename: str) -> subprocess.CompletedProcess:
-        jar_filename = os.path.splitext(code_filename)[0] + ".jar"
-
+    def run(self, working_dir: str, code_filename: str, watchdog: Optional[ProgressWatchdog] = None) -> subprocess.CompletedProcess:
+        cds = self._prepare_cds()
         try:
-            # Compile
-            compile_cmd = f"kotlinc {code_filename} -include-runtime -d {jar_filename}"
-            compile_result = subprocess.run(
-                compile_cmd,
-                cwd=working_dir,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-
+            compile_result, compile_time = self._compile(working_dir, code_filename, cds)
             if compile_result.returncode != 0:
-                # Prepend compilation failure message to stderr so the caller can see it
-                compile_result.stderr = f"Compilation failed:\n{compile_result.stderr}\n{compile_result.stdout}"
-                return compile_result
+                return attach_timings(compile_result, compile=compile_time)
 
             # Run
-            return subprocess.run(
-                ["java", "-jar", jar_filename],
-                cwd=working_dir,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            run_start = time.time()
+            result = run_process(self._java_command(working_dir, code_filename, cds), cwd=working_dir, timeout=60, watchdog=watchdog)
+            run_time = time.time() - run_start
+            # Startup is the measured time of an empty program with the same JVM setup.
+            startup = cds["startup"] if cds else 0.0
+            return attach_timings(result, compile=compile_time, startup=min(startup, run_time), compute=max(0.0, run_time - startup))
+        finally:
+            self._remove_jars(working_dir)
+
+    def profile(self, working_dir: str, code_filename: str, budget: float) -> Optional[str]:
+        cds = self._prepare_cds()
+        recording = os.path.join(working_dir, "profile.jfr")
+        try:
+            compile_result, _ = self._compile(working_dir, code_filename, cds)
+            if compile_result.returncode != 0:
+                return compile_result.stderr
+            java, *args = self._java_command(working_dir, code_filename, cds)
+            jfr_flag = f"-XX:StartFlightRecording=duration={int(budget)}s,filename={recording},settings=profile,dumponexit=true"
+            start = time.time()
+            try:
+                subprocess.run([java, jfr_flag, *args], cwd=working_dir, capture_output=True, text=True, timeout=budget + 10)
+            except subprocess.TimeoutExpired:
+                pass
+            duration = time.time() - start
+            if not os.path.exists(recording):
+                return "JFR produced no recording."
+            printed = subprocess.run(["jfr", "print", "--events", "jdk.ExecutionSample", recording],
+                                     capture_output=True, text=True, timeout=60)
         finally:
-            for jar_file in glob.glob(os.path.join(working_dir, "*.jar")):
-                try:
-                    os.remove(jar_file)
-                except OSError:
-                    pass
+            self._remove_jars(working_dir)
+            if os.path.exists(recording):
+                os.remove(recording)
+
+        # The first frame after "stackTrace = [" is the method that was executing.
+        samples: Counter = Counter()
+        lines = printed.stdout.splitlines()
+        for i, line in enumerate(lines[:-1]):
+            if line.strip() == "stackTrace = [":
+                samples[lines[i + 1].strip()] += 1
+        return f"JFR, {duration:.1f}s wall time, self samples by method and line:\n{format_hotspots(samples, 'samples')}"
+
+    def _compile(self, working_dir: str, code_filename: str, cds: Optional[dict]) -> Tuple[subprocess.CompletedProcess, float]:
+        jar_filename = os.path.splitext(code_filename)[0] + ".jar"
+        compile_start = time.time()
+        runtime_flag = "" if cds else " -include-runtime"
+        helper_jar = self._aoclib_jar()
+        classpath_flag = f" -cp {shlex.quote(helper_jar)}" if helper_jar else ""
+        compile_cmd = f"kotlinc {code_filename}{runtime_flag}{classpath_flag} -d {jar_filename}"
+        compile_result = subprocess.run(
+            compile_cmd,
+            cwd=working_dir,
+            shell=True,
+            capture_output=True,
+            text=True,
+            timeout=60
+        )
+        compile_time = time.time() - compile_start
+
+        if compile_result.returncode != 0:
+            # Prepend compilation failure message to stderr so the caller can see it
+            compile_result.stderr = f"Compilation failed:\n{compile_result.stderr}\n{compile_result.stdout}"
+        return compile_result, compile_time
+
+    def _java_command(self, working_dir: str, code_filename: str, cds: Optional[dict]) -> List[str]:
+        jar_filename = os.path.splitext(code_filename)[0] + ".jar"
+        helper_jar = self._aoclib_jar()
+        if not cds and not helper_jar:
+            return ["java", *JVM_FLAGS, "-jar", jar_filename]
+        main_class = self._main_class(os.path.join(working_dir, jar_filename), code_filename)
+        # The CDS archive covers the stdlib only, so it has to stay first on the classpath.
+        classpath = os.pathsep.join(filter(None, [cds["stdlib"] if cds else None, jar_filename, helper_jar]))
+        share_flags = [f"-XX:SharedArchiveFile={cds['archive']}", "-Xshare:auto"] if cds else []
+        return ["java", *JVM_FLAGS, *share_flags, "-cp", classpath, main_class]
+
+    def _aoclib_jar(self) -> Optional[str]:
+        """The aoclib helper library compiled once per library and toolchain version, None if disabled or broken."""
+        source = aoclib.source_path("kotlin")
+        if source is None or self._aoclib_failed:
+            return None
+        key = hashlib.sha256(f"{self._toolchain_version()};{aoclib.AOCLIB_VERSION}".encode()).hexdigest()[:12]
+        cache_dir = runner_cache_dir("kotlin", "aoclib")
+        jar = os.path.join(cache_dir, f"aoclib-{key}.jar")
+        if os.path.exists(jar):
+            return jar
+        # Shared by every aoc-agent process: compiled under the cache lock and published by rename
+        with cache_lock(cache_dir):
+            if not os.path.exists(jar):
+                res = subprocess.run(["kotlinc", source, "-d", jar + ".tmp.jar"], capture_output=True, text=True,
+                                     timeout=300, shell=os.name == "nt")
+                if res.returncode != 0:
+                    print(f"Kotlin aoclib could not be compiled, solutions run without it: {res.stderr.strip()}")
+                    self._aoclib_failed = True
+                    return None
+                os.replace(jar + ".tmp.jar", jar)
+        return jar
+
+    @staticmethod
+    def _remove_jars(working_dir: str):
+        for jar_file in glob.glob(os.path.join(working_dir, "*.jar")):
+            try:
+                os.remove(jar_file)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _main_class(jar_path: str, code_filename: str) -> str:
+        try:
+            with zipfile.ZipFile(jar_path) as jar:
+                manifest = jar.read("META-INF/MANIFEST.MF").decode("utf-8")
+            for line in manifest.splitlines():
+                if line.startswith("Main-Class:"):
+                    return line.split(":", 1)[1].strip()
+        except (KeyError, OSError, zipfile.BadZipFile):
+            pass
+        stem = Path(code_filename).stem
+        return stem[:1].upper() + stem[1:] + "Kt"
+
+    def _prepare_cds(self) -> Optional[dict]:
+        """Returns {stdlib, archive, startup} for the current toolchain, building the archive on first use."""
+        if self._cds or self._cds_failed:
+            return self._cds
+        with self._cds_lock:
+            if self._cds or self._cds_failed:
+                return self._cds
+            try:
+                self._cds = self._build_cds()
+            except Exception as e:
+                print(f"Kotlin CDS archive is not available, using fat jars: {e}")
+                self._cds_failed = True
+            return self._cds
+
+    def _build_cds(self) -> dict:
+        key = hashlib.sha256(self._toolchain_version().encode()).hexdigest()[:12]
+        cache_dir = runner_cache_dir("kotlin", key)
+        info_path = os.path.join(cache_dir, "cds.json")
+        if os.path.exists(info_path):
+            with open(info_path, "r") as f:
+                return json.load(f)
+        with cache_lock(cache_dir):
+            # Another process may have built the archive while this one waited
+            if os.path.exists(info_path):
+                with open(info_path, "r") as f:
+                    return json.load(f)
+            return self._dump_cds(cache_dir, info_path)
+
+    def _dump_cds(self, cache_dir: str, info_path: str) -> dict:
+        kotlinc = shutil.which("kotlinc")
+        if not kotlinc:
+            raise RuntimeError("kotlinc not found")
+        stdlib_src = Path(kotlinc).resolve().parent.parent / "lib" / "kotlin-stdlib.jar"
+        stdlib = os.path.join(cache_dir, "kotlin-stdlib.jar")
+        # The archive records the stdlib path, so the jar takes its final name before the dump
+        shutil.copy2(stdlib_src, stdlib + ".tmp")
+        os.replace(stdlib + ".tmp", stdlib)
+
+        def check(cmd: Any, **kwargs: Any):
+            res = subprocess.run(cmd, cwd=cache_dir, capture_output=True, text=True, timeout=120, **kwargs)
+            if res.returncode != 0:
+                raise RuntimeError(f"{cmd} failed: {res.stderr.strip()}")
+
+        with open(os.path.join(cache_dir, "Warmup.kt"), "w") as f:
+            f.write(WARMUP_SOURCE)
+        check("kotlinc Warmup.kt -d warmup.jar", shell=True)
+        warmup_cp = os.pathsep.join([stdlib, "warmup.jar"])
+        check(["java", "-Xshare:off", "-XX:DumpLoadedClassList=classes.lst", "-cp", warmup_cp, "WarmupKt"])
+        # The archive classpath must be a prefix of the runtime one, so only the stdlib is archived.
+        archive = os.path.join(cache_dir, "kotlin-stdlib.jsa")
+        check(["java", "-Xshare:dump", "-XX:SharedClassListFile=classes.lst", f"-XX:SharedArchiveFile={archive}.tmp", "-cp", stdlib])
+        os.replace(archive + ".tmp", archive)
+
+        startups = []
+        for _ in range(3):
+            start = time.time()
+            check(["java", *JVM_FLAGS, f"-XX:SharedArchiveFile={archive}", "-Xshare:auto", "-cp", warmup_cp, "WarmupKt", "--noop"])
+            startups.append(time.time() - start)
+
+        cds = {"stdlib": stdlib, "archive": archive, "startup": min(startups)}
+        # Written last and atomically: its presence means the archive is complete
+        with open(info_path + ".tmp", "w") as f:
+            json.dump(cds, f, indent=2)
+        os.replace(info_path + ".tmp", info_path)
+        return cds
@@ -1,10 +1,41 @@
-import subprocess
+import hashlib
 import os
-from typing import Any
-from .base import CodeRunner
+import shutil
+import subprocess
+from typing import Any, Optional
+from .base import CodeRunner, cache_lock, cached_probe, runner_cache_dir
+from .process import ProgressWatchdog, run_process
+
+LAKEFILE = """name = "solution"
+defaultTargets = ["solution"]
+
+[[lean_exe]]
+name = "solution"
+root = "Main"
+"""
+
+EXE_SUFFIX = ".exe" if os.name == "nt" else ""
+
 
 class Lean4Runner(CodeRunner):
+    """
+    Compiles solutions to native executables with Lake and the C backend.
+
+    Builds happen in one persistent Lake workspace, locked across processes, and the executables
+    are cached by source hash, so rerunning an unchanged file costs nothing. Falls back to the interpreter (`lean --run`)
+    when native compilation is disabled or Lake is not available.
+    """
+
+    executables = ["lean", "lake"]
+
+    def __init__(self, native: bool = True):
+        self.native = native
+        self._version: Optional[str] = None
+
     def get_version_info(self) -> str:
+        return cached_probe("lean", "version", self._probe_version)
+
+    def _probe_version(self) -> str:
         try:
             res = subprocess.run(["lean", "--version"], capture_output=True, text=True)
             return res.stdout.strip()
@@ -13,11 +44,54 @@ class Lean4Runner(CodeRunner):
         except Exception as e:
             return f"Error getting Lean version: {e}"
 
-    def run(self, working_dir: str, code_filename: str) -> subprocess.CompletedProcess:
-        return subprocess.run(
-            ["lean", "--run", code_filename],
-            cwd=working_dir,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+    def run(self, working_dir: str, code_filename: str, watchdog: Optional[ProgressWatchdog] = None) -> subprocess.CompletedProcess:
+        if self.native and shutil.which("lake"):
+            build = self._build(working_dir, code_filename)
+            if isinstance(build, subprocess.CompletedProcess):
+                return build
+            return run_process([build], cwd=working_dir, timeout=60, watchdog=watchdog)
+
+        return run_process(["lean", "--run", code_filename], cwd=working_dir, timeout=60, watchdog=watchdog)
+
+    def _build(self, working_dir: str, code_filename: str) -> Any:
+        """Returns the path of the native executable, or the failed build process."""
+        with open(os.path.join(working_dir, code_filename), "rb") as f:
+            source = f.read()
+        if self._version is None:
+            self._version = self.get_version_info()
+        # The toolchain version is part of the key: an upgrade must not reuse old binaries.
+        digest = hashlib.sha256(source + self._version.encode()).hexdigest()[:16]
+        cache_dir = runner_cache_dir("lean4")
+        exe_path = os.path.join(cache_dir, "bin", digest + EXE_SUFFIX)
+        if os.path.exists(exe_path):
+            return exe_path
+
+        workspace = os.path.join(cache_dir, "workspace")
+        with cache_lock(workspace):
+            # Another process may have built the same source while this one waited
+            if os.path.exists(exe_path):
+                return exe_path
+            os.makedirs(workspace, exist_ok=True)
+            lakefile = os.path.join(workspace, "lakefile.toml")
+            if not os.path.exists(lakefile):
+                with open(lakefile, "w", encoding="utf-8") as f:
+                    f.write(LAKEFILE)
+            with open(os.path.join(workspace, "Main.lean"), "wb") as f:
+                f.write(source)
+
+            build_result = subprocess.run(
+                ["lake", "build"],
+                cwd=workspace,
+                capture_output=True,
+                text=True,
+                timeout=60
+            )
+            if build_result.returncode != 0:
+                build_result.stderr = f"Compilation failed:\n{build_result.stderr}\n{build_result.stdout}"
+                return build_result
+
+            os.makedirs(os.path.dirname(exe_path), exist_ok=True)
+            # Published atomically: the cache is checked without the lock
+            shutil.copy2(os.path.join(workspace, ".lake", "build", "bin", "solution" + EXE_SUFFIX), exe_path + ".tmp")
+            os.replace(exe_path + ".tmp", exe_path)
+        return exe_path
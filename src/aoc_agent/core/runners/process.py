@@ -0,0 +1,153 @@
+import queue
+import re
+import subprocess
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# "42%", "42.5 %" or "420/1000"
+PROGRESS_RE = re.compile(r"(\d+(?:\.\d+)?)\s*%|(\d+)\s*/\s*(\d+)")
+
+
+class EarlyTermination(subprocess.TimeoutExpired):
+    """Raised when a solution was killed before the time limit because it was not going to make it."""
+
+    def __init__(self, cmd: Any, elapsed: float, reason: str, output: str, stderr: str):
+        super().__init__(cmd, elapsed, output, stderr)
+        self.reason = reason
+
+
+class ProgressWatchdog:
+    """
+    Watches the live output of a solution and decides whether it is worth waiting for.
+
+    A run is stopped early when its progress reports (percentages or "done/total" counters)
+    project a finish beyond the time limit, or when no progress report came for stall_seconds
+    before the current phase reached its end. Programs that print nothing until the end are never stopped early,
+    unless a budget is given: then the run is stopped once it has taken that long.
+
+    A report with another total or a lower fraction than the previous one starts a new phase
+    (a second loop, or an unrelated "a/b" in debug output), which is projected on its own.
+    """
+
+    def __init__(self, time_limit: float = 60.0, stall_seconds: float = 20.0, min_elapsed: float = 5.0,
+                 on_output: Optional[Callable[[str, str], None]] = None, budget: Optional[float] = None):
+        self.time_limit = time_limit
+        self.budget = budget
+        self.stall_seconds = stall_seconds
+        self.min_elapsed = min_elapsed
+        self.on_output = on_output
+        # (elapsed, fraction) of the last report
+        self.progress: Optional[Tuple[float, float]] = None
+        self.progress_updates = 0
+        # Current phase: its total (None for percentages), when it started and whether it reached its end
+        self.total: Optional[int] = None
+        self.phase_start = 0.0
+        self.phase_done = False
+
+    def observe(self, elapsed: float, stream: str, text: str):
+        if self.on_output:
+            self.on_output(stream, text)
+        # Progress bars rewrite the line with \r, so every segment is a separate report
+        for segment in re.split(r"[\r\n]", text):
+            report = self._parse_progress(segment)
+            if report is None:
+                continue
+            fraction, total, done = report
+            if self.progress is None or total != self.total or fraction < self.progress[1]:
+                # The work since the previous report belongs to the new phase
+                self.phase_start = self.progress[0] if self.progress else 0.0
+                self.total = total
+                self.progress_updates = 0
+            # Any report, even a repeated value, shows that the run is still moving
+            self.progress = (elapsed, fraction)
+            self.progress_updates += 1
+            self.phase_done = done
+
+    @staticmethod
+    def _parse_progress(segment: str) -> Optional[Tuple[float, Optional[int], bool]]:
+        """(fraction, total, whether the phase reached its end) of a report, or None."""
+        matches = PROGRESS_RE.findall(segment)
+        if not matches:
+            return None
+        percent, done, total = matches[-1]
+        if percent:
+            fraction = float(percent) / 100
+            return (fraction, None, fraction >= 1) if fraction <= 1 else None
+        if not 0 < int(total) or int(done) > int(total):
+            return None
+        # Zero-indexed counters end at total - 1
+        return int(done) / int(total), int(total), int(done) >= int(total) - 1
+
+    def check(self, elapsed: float) -> Optional[str]:
+        """Returns the reason to stop the run now, or None."""
+        if self.budget is not None and elapsed > self.budget:
+            return f"it used up its {self.budget:.0f}s budget"
+        if elapsed < self.min_elapsed or self.progress is None or self.progress_updates < 2:
+            return None
+        # A phase that reached its end may be followed by silent computation until the time limit
+        if self.phase_done:
+            return None
+        at, fraction = self.progress
+        if fraction > 0:
+            projected = self.phase_start + (at - self.phase_start) / fraction
+            if projected > self.time_limit * 1.2:
+                return (f"progress was {fraction:.1%} after {at:.1f}s, projected finish after ~{projected:.0f}s "
+                        f"is beyond the {self.time_limit:.0f}s limit")
+        # Stalled: no progress report at all for a while (other output may go on)
+        if elapsed - at > self.stall_seconds:
+            return (f"progress stuck at {fraction:.1%} for {elapsed - at:.0f}s "
+                    f"(no report since {at:.1f}s)")
+        return None
+
+
+def run_process(cmd: List[str], cwd: str, timeout: float = 60, watchdog: Optional[ProgressWatchdog] = None,
+                env: Optional[Dict[str, str]] = None) -> subprocess.CompletedProcess:
+    """
+    Like subprocess.run(cmd, capture_output=True, text=True, timeout=timeout), but reads the output
+    while the process runs so the watchdog can stop it early (raising EarlyTermination).
+    """
+    watchdog = watchdog or ProgressWatchdog(time_limit=timeout)
+    process = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+    chunks: "queue.Queue[Tuple[str, Optional[bytes]]]" = queue.Queue()
+
+    def pump(stream: Any, name: str):
+        for chunk in iter(lambda: stream.read1(65536), b""):
+            chunks.put((name, chunk))
+        chunks.put((name, None))
+
+    for stream, name in ((process.stdout, "stdout"), (process.stderr, "stderr")):
+        threading.Thread(target=pump, args=(stream, name), daemon=True).start()
+
+    output = {"stdout": bytearray(), "stderr": bytearray()}
+
+    def collected(name: str) -> str:
+        return output[name].decode("utf-8", errors="replace")
+
+    def stop():
+        process.kill()
+        process.wait()
+
+    open_streams = 2
+    start = time.monotonic()
+    while open_streams:
+        elapsed = time.monotonic() - start
+        if elapsed > timeout:
+            stop()
+            raise subprocess.TimeoutExpired(cmd, timeout, collected("stdout"), collected("stderr"))
+        reason = watchdog.check(elapsed)
+        if reason:
+            stop()
+            raise EarlyTermination(cmd, elapsed, reason, collected("stdout"), collected("stderr"))
+        try:
+            name, chunk = chunks.get(timeout=0.25)
+        except queue.Empty:
+            continue
+        if chunk is None:
+            open_streams -= 1
+            continue
+        output[name] += chunk
+        watchdog.observe(elapsed, name, chunk.decode("utf-8", errors="replace"))
+
+    returncode = process.wait()
+    return subprocess.CompletedProcess(cmd, returncode, collected("stdout"), collected("stderr"))
@@ -1,18 +1,188 @@
 import os
+import platform
+import pstats
+import shutil
 import sys
 import subprocess
-from typing import Any
-from .base import CodeRunner
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+from .. import aoclib
+from .base import CodeRunner, cached_probe, format_hotspots
+from .process import ProgressWatchdog, run_process
+
+# Runs a script under cProfile and dumps the stats even when the budget interrupts it.
+PROFILE_SCRIPT = """
+import _thread, cProfile, runpy, sys, threading
+code_filename, stats_filename, budget = sys.argv[1], sys.argv[2], float(sys.argv[3])
+sys.argv = [code_filename]
+timer = threading.Timer(budget, _thread.interrupt_main)
+timer.daemon = True
+timer.start()
+profiler = cProfile.Profile()
+try:
+    profiler.runcall(runpy.run_path, code_filename, run_name="__main__")
+except KeyboardInterrupt:
+    print("Profiling budget exhausted, the run was interrupted", file=sys.stderr)
+finally:
+    timer.cancel()
+    profiler.dump_stats(stats_filename)
+"""
+
+
+# Prints e.g. "CPython 3.13.1 free-threaded" or "PyPy 3.10.14"
+IMPLEMENTATION_PROBE = ("import platform, sys; "
+                        "gil = getattr(sys, '_is_gil_enabled', lambda: True)(); "
+                        "print(platform.python_implementation(), platform.python_version(), '' if gil else 'free-threaded')")
+
+PYPY = "pypy3"
+
+
+def _implementation() -> str:
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    return " ".join([platform.python_implementation(), platform.python_version()] + ([] if gil else ["free-threaded"]))
+
 
 class PythonRunner(CodeRunner):
+    """
+    Runs solutions with a configurable interpreter: the agent's own (default), PyPy,
+    a free-threaded or JIT-enabled CPython build, given by name on PATH or by path.
+
+    With pypy_fallback a run_code run that times out under a non-PyPy interpreter is retried under PyPy;
+    example and complexity runs always use the configured interpreter.
+    Results carry the label of the interpreter that produced them in `result.interpreter`.
+    """
+
+    def __init__(self, interpreter: Optional[str] = None, pypy_fallback: bool = False):
+        self.interpreter = interpreter or sys.executable
+        self.pypy_fallback = pypy_fallback
+        self.executables = [self.interpreter]
+
     def get_version_info(self) -> str:
-        return f"Python {sys.version}"
-
-    def run(self, working_dir: str, code_filename: str) -> subprocess.CompletedProcess:
-        return subprocess.run(
-            [sys.executable, code_filename],
-            cwd=working_dir,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+        if self.interpreter == sys.executable:
+            info = f"Python {sys.version}"
+        else:
+            info = f"Python ({self.interpreter}) {self._label(self.interpreter)}"
+        if self._fallback_enabled():
+            info += f"; runs that time out are retried under {self._label(PYPY)}"
+        helper = aoclib.describe("python")
+        return f"{info}\n{helper}" if helper else info
+
+    @staticmethod
+    def solution_env() -> Optional[Dict[str, str]]:
+        """Environment of solution processes (and the python cell kernel): aoclib importable, None when it is disabled."""
+        source = aoclib.source_path("python")
+        if source is None:
+            return None
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.path.dirname(source), env.get("PYTHONPATH")]))
+        return env
+
+    def _label(self, interpreter: str) -> str:
+        if interpreter == sys.executable:
+            return _implementation()
+        return cached_probe(interpreter, "implementation", lambda: self._probe_implementation(interpreter))
+
+    @staticmethod
+    def _probe_implementation(interpreter: str) -> str:
+        try:
+            res = subprocess.run([interpreter, "-c", IMPLEMENTATION_PROBE], capture_output=True, text=True, timeout=30)
+            return res.stdout.strip() or f"Unknown Python ({interpreter})"
+        except Exception:
+            return f"Unknown Python ({interpreter})"
+
+    def _fallback_enabled(self) -> bool:
+        return self.pypy_fallback and not self._label(self.interpreter).startswith("PyPy") and shutil.which(PYPY) is not None
+
+    def run(self, working_dir: str, code_filename: str, watchdog: Optional[ProgressWatchdog] = None) -> subprocess.CompletedProcess:
+        return self._run_with(self.interpreter, working_dir, code_filename, watchdog)
+
+    def rerun_after_timeout(self, working_dir: str, code_filename: str) -> Optional[subprocess.CompletedProcess]:
+        if not self._fallback_enabled():
+            return None
+        print(f"Timed out under {self._label(self.interpreter)}, retrying under {self._label(PYPY)}")
+        result = self._run_with(PYPY, working_dir, code_filename, None)
+        setattr(result, "fallback", True)
+        return result
+
+    def _run_with(self, interpreter: str, working_dir: str, code_filename: str, watchdog: Optional[ProgressWatchdog]) -> subprocess.CompletedProcess:
+        result = run_process([interpreter, code_filename], cwd=working_dir, timeout=60, watchdog=watchdog, env=self.solution_env())
+        setattr(result, "interpreter", self._label(interpreter))
+        return result
+
+    def profile(self, working_dir: str, code_filename: str, budget: float) -> Optional[str]:
+        # py-spy samples lines and has no overhead on the solution; it needs ptrace, so cProfile is the fallback.
+        if shutil.which("py-spy"):
+            report = self._profile_py_spy(working_dir, code_filename, budget)
+            if report:
+                return report
+        return self._profile_cprofile(working_dir, code_filename, budget)
+
+    def _profile_py_spy(self, working_dir: str, code_filename: str, budget: float) -> Optional[str]:
+        out_path = os.path.join(working_dir, "py-spy.txt")
+        start = time.time()
+        try:
+            subprocess.run(
+                ["py-spy", "record", "--format", "raw", "-o", out_path, "-d", str(int(budget)), "-r", "200",
+                 "--", self.interpreter, code_filename],
+                cwd=working_dir,
+                capture_output=True,
+                text=True,
+                timeout=budget + 10,
+                env=self.solution_env()
+            )
+        except subprocess.TimeoutExpired:
+            pass
+        duration = time.time() - start
+        try:
+            with open(out_path, "r", encoding="utf-8") as f:
+                collapsed = f.read()
+        except OSError:
+            return None
+        finally:
+            if os.path.exists(out_path):
+                os.remove(out_path)
+
+        # Collapsed stacks: "frame;frame;leaf (file.py:12) <count>"; the leaf frame gets the self samples.
+        samples: Counter = Counter()
+        for line in collapsed.splitlines():
+            stack, _, count = line.rpartition(" ")
+            if stack and count.isdigit():
+                samples[stack.split(";")[-1]] += int(count)
+        if not samples:
+            return None
+        return f"py-spy, {duration:.1f}s wall time, self samples by line:\n{format_hotspots(samples, 'samples')}"
+
+    def _profile_cprofile(self, working_dir: str, code_filename: str, budget: float) -> str:
+        stats_path = os.path.join(working_dir, "profile.pstats")
+        start = time.time()
+        try:
+            result = subprocess.run(
+                [self.interpreter, "-c", PROFILE_SCRIPT, code_filename, stats_path, str(budget)],
+                cwd=working_dir,
+                capture_output=True,
+                text=True,
+                timeout=budget + 10,
+                env=self.solution_env()
+            )
+            stderr = result.stderr
+        except subprocess.TimeoutExpired as e:
+            # TimeoutExpired carries the raw bytes even with text=True
+            partial = e.stderr.decode("utf-8", errors="replace") if isinstance(e.stderr, bytes) else (e.stderr or "")
+            stderr = f"The run did not stop after the budget (stuck in native code?).\n{partial}"
+        duration = time.time() - start
+
+        if not os.path.exists(stats_path):
+            return f"cProfile produced no stats.\nstderr:\n{stderr}"
+        try:
+            stats: Any = pstats.Stats(stats_path).stats
+        finally:
+            os.remove(stats_path)
+
+        # stats: (file, line, function) -> (primitive calls, calls, self time, cumulative time, callers)
+        self_ms: Counter = Counter()
+        for (file, line, function), (_, calls, tottime, cumtime, _) in stats.items():
+            location = f"{function} ({os.path.basename(file)}:{line}), {calls} calls, {cumtime:.2f}s cumulative"
+            self_ms[location] = tottime * 1000
+        return (f"cProfile, {duration:.1f}s wall time, self time by function:\n{format_hotspots(self_ms, 'ms')}"
+                + (f"\nstderr:\n{stderr[-1000:]}" if stderr.strip() else ""))
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import aoc_agent
+
+# The CLI module must stay cheap to import: report-only and publish-only invocations never touch an LLM.
+IMPORT_BUDGET_SECONDS = 1.0
+HEAVY_MODULES = [
+    "langchain",
+    "langchain_core",
+    "langgraph",
+    "langchain_openai",
+    "langchain_anthropic",
+    "langchain_google_genai",
+    "langchain_google_vertexai",
+    "langchain_ollama",
+    "openai",
+    "anthropic",
+    "vertexai",
+    "google.genai",
+    "google.cloud.aiplatform",
+]
+
+
+def _import_times(module: str) -> dict:
+    """Runs `python -X importtime -c "import <module>"` and returns {module: cumulative seconds}."""
+    env = dict(os.environ)
+    package_root = str(Path(aoc_agent.__file__).resolve().parent.parent)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, env=env, timeout=60)
+    assert result.returncode == 0, result.stderr
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def test_cli_does_not_import_the_agent_stack():
+    imported = _import_times("aoc_agent.cli")
+    heavy = sorted(name for name in imported if any(name == m or name.startswith(m + ".") for m in HEAVY_MODULES))
+    assert not heavy, f"aoc_agent.cli imports {heavy}"
+
+
+def test_cli_import_time_budget():
+    imported = _import_times("aoc_agent.cli")
+    assert imported["aoc_agent.cli"] < IMPORT_BUDGET_SECONDS, \
+        f"importing aoc_agent.cli took {imported['aoc_agent.cli']:.2f}s (budget {IMPORT_BUDGET_SECONDS}s)"
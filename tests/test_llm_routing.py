@@ -0,0 +1,99 @@
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field
+
+from aoc_agent.core import llm_routing
+from aoc_agent.core.llm_routing import RoutedChatModel, RoutingPolicy
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class StubChatModel(BaseChatModel):
+    """Answers with `reply`; `behaviour(call_index)` may sleep or raise first."""
+
+    reply: str = "ok"
+    behaviour: Optional[Callable[[int], None]] = None
+    calls: List[float] = Field(default_factory=list)
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        index = len(self.calls)
+        self.calls.append(time.monotonic())
+        if self.behaviour is not None:
+            self.behaviour(index)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+
+@pytest.fixture(autouse=True)
+def fresh_semaphores(monkeypatch):
+    monkeypatch.setattr(llm_routing, "_semaphores", {})
+    # No backoff between retries
+    monkeypatch.setattr(llm_routing.random, "uniform", lambda a, b: 0.0)
+
+
+def route(models, names, **policy) -> RoutedChatModel:
+    return RoutedChatModel(models=models, model_names=names, policy=RoutingPolicy(**policy))
+
+
+def ask(model: RoutedChatModel) -> str:
+    return model.invoke([HumanMessage(content="hi")]).content
+
+
+def test_retries_retryable_errors():
+    def flaky(index: int):
+        if index < 2:
+            raise RateLimitError("slow down")
+
+    primary = StubChatModel(behaviour=flaky)
+    assert ask(route([primary], ["primary"], max_retries=3)) == "ok"
+    assert len(primary.calls) == 3
+
+
+def test_falls_back_after_non_retryable_error():
+    def broken(_: int):
+        raise ValueError("bad request")
+
+    primary = StubChatModel(behaviour=broken)
+    fallback = StubChatModel(reply="fallback")
+    assert ask(route([primary, fallback], ["primary", "fallback"])) == "fallback"
+    assert len(primary.calls) == 1 and len(fallback.calls) == 1
+
+
+def test_hedged_request_wins_over_slow_one():
+    def first_is_slow(index: int):
+        if index == 0:
+            time.sleep(1.0)
+
+    primary = StubChatModel(behaviour=first_is_slow)
+    start = time.monotonic()
+    assert ask(route([primary], ["primary"], hedge_after=0.1, timeout=5)) == "ok"
+    assert time.monotonic() - start < 0.8
+    assert len(primary.calls) == 2
+
+
+def test_abandoned_calls_never_reach_the_model():
+    release = threading.Event()
+
+    def hang(_: int):
+        release.wait(5)
+
+    # One slot, held by a hanging request: every retry and hedge times out waiting for it.
+    primary = StubChatModel(behaviour=hang)
+    model = route([primary], ["primary"], timeout=0.2, hedge_after=0.05, max_retries=2, max_concurrency=1)
+    with pytest.raises(TimeoutError):
+        ask(model)
+    release.set()
+    time.sleep(0.3)
+    assert len(primary.calls) == 1
@@ -0,0 +1,44 @@
+from aoc_agent.core.runners.process import ProgressWatchdog
+
+
+def feed(watchdog: ProgressWatchdog, reports):
+    for elapsed, text in reports:
+        watchdog.observe(elapsed, "stdout", text + "\n")
+
+
+def test_zero_indexed_counter_is_complete_at_last_index():
+    watchdog = ProgressWatchdog(time_limit=60)
+    feed(watchdog, [(i / 100, f"{i}/1000") for i in range(1000)])
+    # Silent work after the loop is not a stall
+    assert watchdog.check(40.0) is None
+
+
+def test_second_phase_restarts_progress():
+    watchdog = ProgressWatchdog(time_limit=60)
+    feed(watchdog, [(float(i), f"{i}/10") for i in range(1, 11)])
+    feed(watchdog, [(10.0 + i / 10, f"{i}/500") for i in range(1, 251)])
+    # 35s in: the second phase is half done after 25s of its own, so it finishes around 60s
+    assert watchdog.check(35.0) is None
+    assert watchdog.total == 500
+
+
+def test_repeated_report_resets_the_stall_timer():
+    watchdog = ProgressWatchdog(time_limit=600, stall_seconds=20)
+    feed(watchdog, [(1.0, "1/10"), (2.0, "2/10")] + [(float(t), "2/10") for t in range(3, 30)])
+    assert watchdog.check(35.0) is None
+
+
+def test_stall_and_slow_projection_are_still_detected():
+    watchdog = ProgressWatchdog(time_limit=60, stall_seconds=20)
+    feed(watchdog, [(1.0, "10%"), (2.0, "20%")])
+    assert "stuck" in watchdog.check(25.0)
+
+    slow = ProgressWatchdog(time_limit=60)
+    feed(slow, [(5.0, "1%"), (10.0, "2%")])
+    assert "projected" in slow.check(10.0)
+
+
+def test_stray_fraction_does_not_stop_the_run():
+    watchdog = ProgressWatchdog(time_limit=60)
+    feed(watchdog, [(1.0, "1/100"), (2.0, "2/100"), (3.0, "debug: ratio 3/4"), (4.0, "4/100")])
+    assert watchdog.check(6.0) is None
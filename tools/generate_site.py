@@ -5,6 +5,11 @@ from pathlib import Path
 import glob
 import re
 
+try:
+    from aoc_agent.agent.run_archive import RunArchive
+except ImportError:  # the package is not installed: archived runs are skipped
+    RunArchive = None
+
 def sanitize_filename(name):
     # Replace invalid characters with underscores
     # Allow alphanumeric, underscores, hyphens, dots
@@ -74,6 +79,7 @@ def generate_site():
     docs_dir.mkdir(parents=True, exist_ok=True)
     
     runs = []
+    archive = RunArchive() if RunArchive else None
     
     # 1. Scan for runs
     # Find all directories matching the pattern in the current working directory
@@ -97,6 +103,11 @@ def generate_site():
                 
             meta_file = run_dir / "metadata.json"
             report_file = run_dir / "final_report.md"
+
+            # Archived runs keep only metadata.json; their artifacts are extracted on demand
+            if archive and archive.is_archived(run_dir.name) and "final_report.md" in archive.files(run_dir.name):
+                run_dir = Path(archive.materialize(run_dir.name))
+                report_file = run_dir / "final_report.md"
             
             if meta_file.exists() and report_file.exists():
                 meta = load_metadata(meta_file)
@@ -335,6 +346,10 @@ def generate_site():
     if report_source.exists():
         try:
             shutil.copy(report_source, report_dest)
+            # Chart data and per-year pages the report loads on demand
+            assets_source = report_source.parent / "report_files"
+            if assets_source.exists():
+                shutil.copytree(assets_source, docs_dir / "report_files", dirs_exist_ok=True)
             has_report = True
             print(f"Included global report: {report_source}")
         except Exception as e: